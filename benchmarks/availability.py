@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Free-slot search latency against a large appointment table.
+
+Seeds a throwaway database with synthetic appointments, then times a week of
+free-slot search for every seeded location, once through tracker.availability
+(an index range plus bisect probes) and once the naive way (every busy
+appointment at the location, each candidate slot checked against all of them).
+
+    python benchmarks/availability.py --appointments 200000 --rounds 5
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "nhs_service_tracker.settings")
+django.setup()
+
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from tracker.availability import clinic_hours, free_slots
+from tracker.management.commands.seed_data import LOCATIONS
+from tracker.models import Appointment
+
+
+def naive_free_slots(location, first_day, days=7, duration=15):
+    busy = [
+        (start, start + timedelta(minutes=minutes))
+        for start, minutes in Appointment.objects.filter(
+            location=location, status__in=Appointment.BUSY_STATUSES
+        ).values_list("scheduled_for", "duration_minutes")
+    ]
+    opens, closes = clinic_hours()
+    length = timedelta(minutes=duration)
+    result = []
+    for index in range(days):
+        day = first_day + timedelta(days=index)
+        start = timezone.make_aware(datetime.combine(day, opens))
+        close = timezone.make_aware(datetime.combine(day, closes))
+        slots = []
+        while start + length <= close:
+            if all(end <= start or begin >= start + length for begin, end in busy):
+                slots.append(start)
+            start += timedelta(minutes=15)
+        result.append((day, slots))
+    return result
+
+
+def _time(search, rounds):
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for location in LOCATIONS:
+            search(location, timezone.localdate(), days=7)
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(timings), 2)
+
+
+def run(appointments=200_000, patients=5_000, rounds=5, naive=True):
+    old_name = connection.settings_dict["NAME"]
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == "sqlite":
+            connection.settings_dict["TEST"]["NAME"] = os.path.join(directory, "availability.sqlite3")
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            call_command(
+                "seed_data", patients=patients, appointments=appointments, days=365, seed=1, stdout=io.StringIO()
+            )
+            result = {
+                "appointments": appointments,
+                "locations": len(LOCATIONS),
+                "indexed_week_ms": _time(free_slots, rounds),
+            }
+            if naive:
+                result["naive_week_ms"] = _time(naive_free_slots, rounds)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--appointments", type=int, default=200_000, help="Appointments to seed.")
+    parser.add_argument("--patients", type=int, default=5_000, help="Patients to seed.")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed passes over all locations.")
+    parser.add_argument("--no-naive", action="store_true", help="Skip the naive baseline.")
+    args = parser.parse_args()
+    print(json.dumps(run(args.appointments, args.patients, args.rounds, naive=not args.no_naive), indent=2))
+
+
+if __name__ == "__main__":
+    main()
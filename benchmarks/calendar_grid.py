@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Occupancy grid and calendar page latency for a week across every location.
+
+Seeds a throwaway database with synthetic appointments, then times building
+the week's grid through tracker.occupancy (one range query bucketed into
+arrays), the same grid built from model instances into nested dicts, and the
+full /appointments/calendar/?view=week page. Run collectstatic first or set
+DEBUG=1.
+
+    python benchmarks/calendar_grid.py --appointments 200000 --rounds 20
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "nhs_service_tracker.settings")
+django.setup()
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from tracker.availability import clinic_hours
+from tracker.management.commands.seed_data import LOCATIONS
+from tracker.models import Appointment
+from tracker.occupancy import occupancy
+
+
+def model_grid(first_day, days=7):
+    opens, _ = clinic_hours()
+    grid = defaultdict(lambda: defaultdict(int))
+    start = timezone.make_aware(datetime.combine(first_day, datetime.min.time()))
+    appointments = Appointment.objects.filter(
+        status__in=Appointment.BUSY_STATUSES,
+        scheduled_for__gte=start,
+        scheduled_for__lt=start + timedelta(days=days),
+    )
+    for appointment in appointments:
+        moment = timezone.localtime(appointment.scheduled_for)
+        while moment < timezone.localtime(appointment.ends_at):
+            minutes = (moment.hour - opens.hour) * 60 + moment.minute - opens.minute
+            grid[appointment.location][moment.date(), minutes // 15] += 1
+            moment += timedelta(minutes=15)
+    return grid
+
+
+def _median_ms(action, rounds):
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        action()
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(timings), 2)
+
+
+def run(appointments=200_000, patients=5_000, rounds=20):
+    old_name = connection.settings_dict["NAME"]
+    monday = timezone.localdate() - timedelta(days=timezone.localdate().weekday())
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == "sqlite":
+            connection.settings_dict["TEST"]["NAME"] = os.path.join(directory, "calendar.sqlite3")
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            call_command(
+                "seed_data", patients=patients, appointments=appointments, days=365, seed=1, stdout=io.StringIO()
+            )
+            client = Client()
+            client.force_login(User.objects.create_user(username="calendar@example.nhs.uk"))
+            path = f"/appointments/calendar/?view=week&date={monday.isoformat()}"
+            with override_settings(CONDITIONAL_GET=False):
+                result = {
+                    "appointments": appointments,
+                    "locations": len(LOCATIONS),
+                    "array_grid_ms": _median_ms(lambda: occupancy(monday, 7), rounds),
+                    "model_dict_grid_ms": _median_ms(lambda: model_grid(monday, 7), rounds),
+                    "week_page_ms": _median_ms(lambda: client.get(path), rounds),
+                }
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--appointments", type=int, default=200_000, help="Appointments to seed.")
+    parser.add_argument("--patients", type=int, default=5_000, help="Patients to seed.")
+    parser.add_argument("--rounds", type=int, default=20, help="Timed repetitions of each measurement.")
+    args = parser.parse_args()
+    print(json.dumps(run(args.appointments, args.patients, args.rounds), indent=2))
+
+
+if __name__ == "__main__":
+    main()
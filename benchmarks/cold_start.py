@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-byte of a freshly started worker, with and without warm-up.
+
+Each run starts a new interpreter, imports nhs_service_tracker.wsgi the way
+gunicorn does and sends the first signed-in requests straight to the WSGI
+application. Boot time includes the warm-up when WORKER_WARMUP=1, so the two
+modes can be compared end to end. Uses a throwaway SQLite database and needs
+collected static files (python manage.py collectstatic).
+
+    python benchmarks/cold_start.py --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PATHS = ("/", "/patients/", "/appointments/", "/services/")
+
+
+def _setup():
+    import django
+
+    django.setup()
+    from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+    from django.contrib.auth.models import User
+    from django.contrib.sessions.backends.db import SessionStore
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+    user = User.objects.create_user(username="cold@example.nhs.uk", is_staff=True)
+    session = SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = "django.contrib.auth.backends.ModelBackend"
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.create()
+    print(session.session_key)
+
+
+def _request(application, path, cookie):
+    from wsgiref.util import setup_testing_defaults
+
+    environ = {"PATH_INFO": path, "HTTP_COOKIE": cookie}
+    setup_testing_defaults(environ)
+    status = []
+    started = time.perf_counter()
+    body = iter(application(environ, lambda code, headers, exc_info=None: status.append(code)))
+    next(body, b"")
+    first_byte = time.perf_counter() - started
+    for _ in body:
+        pass
+    if not status[0].startswith("200"):
+        raise RuntimeError(f"{path} returned {status[0]}")
+    return first_byte * 1000
+
+
+def _child():
+    started = time.perf_counter()
+    from nhs_service_tracker.wsgi import application
+
+    boot = (time.perf_counter() - started) * 1000
+    cookie = f"sessionid={os.environ['COLD_START_SESSION']}"
+    first = {path: round(_request(application, path, cookie), 2) for path in PATHS}
+    warm = {path: round(_request(application, path, cookie), 2) for path in PATHS}
+    print(json.dumps({"boot_ms": round(boot, 2), "first_byte_ms": first, "warm_first_byte_ms": warm}))
+
+
+def _run(args, env):
+    result = subprocess.run(
+        [sys.executable, __file__, *args], env=env, cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip().splitlines()[-1]
+
+
+def run(runs=10):
+    if not (ROOT / "staticfiles" / "staticfiles.json").exists():
+        raise SystemExit("Run python manage.py collectstatic first.")
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "nhs_service_tracker.settings",
+            "DATABASE_URL": f"sqlite:///{directory}/cold.sqlite3",
+            "DEBUG": "0",
+            "SECRET_KEY": "cold-start-benchmark",
+        }
+        env["COLD_START_SESSION"] = _run(["--setup"], env)
+        report = {}
+        for warmup in ("0", "1"):
+            samples = [json.loads(_run(["--child"], {**env, "WORKER_WARMUP": warmup})) for _ in range(runs)]
+            first_request = [sample["first_byte_ms"][PATHS[0]] for sample in samples]
+            report[f"WORKER_WARMUP={warmup}"] = {
+                "boot_ms": round(statistics.median(sample["boot_ms"] for sample in samples), 2),
+                "first_byte_ms": {
+                    path: round(statistics.median(sample["first_byte_ms"][path] for sample in samples), 2)
+                    for path in PATHS
+                },
+                "warm_first_byte_ms": {
+                    path: round(statistics.median(sample["warm_first_byte_ms"][path] for sample in samples), 2)
+                    for path in PATHS
+                },
+                "boot_plus_first_byte_ms": round(
+                    statistics.median(sample["boot_ms"] + ms for sample, ms in zip(samples, first_request)), 2
+                ),
+            }
+    return {"runs": runs, "paths": PATHS, "modes": report}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="Cold workers started per mode.")
+    parser.add_argument("--setup", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.setup or args.child:
+        sys.path.insert(0, str(ROOT))
+        _setup() if args.setup else _child()
+        return
+    print(json.dumps(run(args.runs), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Import time of a worker, module by module, from python -X importtime.
+
+Starts fresh interpreters that import nhs_service_tracker.wsgi (the module
+gunicorn loads) and reports the median cumulative time, the self time summed
+per top-level package and the slowest individual modules. With preload_app
+this cost is paid once by the gunicorn master instead of by every worker.
+
+    python benchmarks/import_time.py --runs 5 --top 15
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+def sample(module, env):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return modules
+
+
+def run(module="nhs_service_tracker.wsgi", runs=5, top=15):
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": "nhs_service_tracker.settings"}
+    samples = [sample(module, env) for _ in range(runs)]
+    names = set.intersection(*(set(modules) for modules in samples))
+
+    def median_ms(name, index):
+        return round(statistics.median(modules[name][index] for modules in samples) / 1000, 2)
+
+    packages = defaultdict(float)
+    for name in names:
+        packages[name.split(".")[0]] += median_ms(name, 0)
+    slowest = sorted(names, key=lambda name: median_ms(name, 0), reverse=True)[:top]
+    return {
+        "module": module,
+        "runs": runs,
+        "total_ms": median_ms(module, 1),
+        "modules_imported": len(names),
+        "by_package_ms": dict(sorted(((k, round(v, 2)) for k, v in packages.items()), key=lambda item: -item[1])[:top]),
+        "slowest_modules_ms": {name: {"self": median_ms(name, 0), "cumulative": median_ms(name, 1)} for name in slowest},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="nhs_service_tracker.wsgi", help="Module to import.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to sample.")
+    parser.add_argument("--top", type=int, default=15, help="Packages and modules to list.")
+    args = parser.parse_args()
+    print(json.dumps(run(args.module, args.runs, args.top), indent=2))
+
+
+if __name__ == "__main__":
+    main()
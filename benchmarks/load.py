@@ -0,0 +1,79 @@
+import random
+import statistics
+import threading
+import time
+
+from django.db import connection
+from django.test import Client
+
+
+def summarise(latencies, errors, elapsed):
+    summary = {
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+    }
+    if len(latencies) >= 2:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        summary.update(
+            mean_ms=round(statistics.fmean(latencies) * 1000, 2),
+            p50_ms=round(cuts[49] * 1000, 2),
+            p95_ms=round(cuts[94] * 1000, 2),
+            p99_ms=round(cuts[98] * 1000, 2),
+            max_ms=round(max(latencies) * 1000, 2),
+        )
+    return summary
+
+
+def run_load(scenario, context, user, threads=4, requests=200, warmup=10, seed=0):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    start = threading.Barrier(threads + 1)
+    shares = [requests // threads + (1 if index < requests % threads else 0) for index in range(threads)]
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        local_latencies = []
+        local_errors = 0
+        try:
+            try:
+                client = Client()
+                client.force_login(user)
+                for _ in range(warmup):
+                    scenario.warmup(client, context, rng)
+            except Exception:
+                start.abort()
+                raise
+            start.wait()
+            for _ in range(shares[index]):
+                began = time.perf_counter()
+                try:
+                    response = scenario(client, context, rng)
+                    if response.streaming:
+                        b"".join(response.streaming_content)
+                    failed = not scenario.succeeded(response)
+                except Exception:
+                    failed = True
+                local_latencies.append(time.perf_counter() - began)
+                local_errors += failed
+        finally:
+            connection.close()
+            with lock:
+                latencies.extend(local_latencies)
+                errors.append(local_errors)
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    try:
+        start.wait()
+    except threading.BrokenBarrierError:
+        for thread in workers:
+            thread.join()
+        raise RuntimeError(f"{scenario.name}: warm-up failed") from None
+    began = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return summarise(latencies, sum(errors), time.perf_counter() - began)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Sign-in throughput for the configured password hasher.
+
+Verifying the password dominates the cost of a login, so this measures
+check_password() against a hash made with the current settings, first on one
+thread and then on one thread per core. Try PASSWORD_HASHER and its cost
+variables, e.g.
+
+    PASSWORD_HASHER=scrypt python benchmarks/login_throughput.py --seconds 5
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "nhs_service_tracker.settings")
+django.setup()
+
+from django.contrib.auth.hashers import check_password, get_hasher, make_password
+
+PASSWORD = "ChangeMe123!"
+
+
+def _verify_until(deadline, encoded):
+    count = 0
+    while time.perf_counter() < deadline:
+        check_password(PASSWORD, encoded)
+        count += 1
+    return count
+
+
+def measure(threads, seconds, encoded):
+    started = time.perf_counter()
+    deadline = started + seconds
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        total = sum(pool.map(_verify_until, [deadline] * threads, [encoded] * threads))
+    return total / (time.perf_counter() - started)
+
+
+def run(seconds=3.0, threads=None):
+    cores = os.cpu_count() or 1
+    threads = threads or cores
+    hasher = get_hasher()
+    encoded = make_password(PASSWORD)
+    single = measure(1, seconds, encoded)
+    parallel = measure(threads, seconds, encoded)
+    return {
+        "hasher": hasher.algorithm,
+        "parameters": {
+            key: value
+            for key, value in hasher.safe_summary(encoded).items()
+            if key not in ("algorithm", "salt", "hash")
+        },
+        "cores": cores,
+        "threads": threads,
+        "logins_per_sec_single_thread": round(single, 1),
+        "logins_per_sec": round(parallel, 1),
+        "logins_per_sec_per_core": round(parallel / min(threads, cores), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=3.0, help="Duration of each measurement.")
+    parser.add_argument("--threads", type=int, help="Concurrent verifiers (default: one per core).")
+    args = parser.parse_args()
+    print(json.dumps(run(args.seconds, args.threads), indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
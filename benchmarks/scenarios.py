@@ -0,0 +1,215 @@
+import abc
+import itertools
+import threading
+from datetime import datetime, time, timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+
+from tracker.models import Appointment, Patient, Service
+from tracker.nhs import generate_nhs_numbers
+
+SEARCH_PREFIXES = ["smi", "pat", "jo", "wil", "hugh", "o'b", "emma", "ja"]
+
+
+class Scenario(abc.ABC):
+    name = None
+
+    def setup(self, context):
+        pass
+
+    @abc.abstractmethod
+    def __call__(self, client, context, rng):
+        """Send one request and return the response."""
+
+    def succeeded(self, response):
+        return response.status_code < 400
+
+    def warmup(self, client, context, rng):
+        return self(client, context, rng)
+
+
+class Get(Scenario):
+    def __init__(self, name, url_name, params=None, kwargs=None):
+        self.name = name
+        self.url_name = url_name
+        self.params = params or (lambda context, rng: {})
+        self.kwargs = kwargs or (lambda context, rng: {})
+
+    def __call__(self, client, context, rng):
+        return client.get(reverse(self.url_name, kwargs=self.kwargs(context, rng)), self.params(context, rng))
+
+
+class Post(Scenario):
+    def __init__(self, name, url_name, build, warmup_url, setup=None):
+        self.name = name
+        self.url_name = url_name
+        self.build = build
+        self.warmup_url = warmup_url
+        if setup is not None:
+            self.setup = setup
+
+    def __call__(self, client, context, rng):
+        kwargs, data = self.build(context, rng)
+        response = client.post(reverse(self.url_name, kwargs=kwargs), data)
+        # Nothing follows the redirect, so drop the flash message rather than let it pile up.
+        client.cookies.pop("messages", None)
+        return response
+
+    def succeeded(self, response):
+        # A rejected form is re-rendered with a 200, so only the redirect counts.
+        return response.status_code == 302
+
+    def warmup(self, client, context, rng):
+        return client.get(self.warmup_url(context, rng))
+
+
+def prepare_context(rng, requests):
+    patients = list(
+        Patient.objects.order_by("?").values("id", "nhs_number", "first_name", "last_name", "date_of_birth")[:1000]
+    )
+    existing = Patient.objects.values_list("nhs_number", flat=True).iterator(chunk_size=10_000)
+    return {
+        "lock": threading.Lock(),
+        "patients": patients,
+        "service_ids": list(Service.objects.values_list("id", flat=True)),
+        "appointment_ids": list(Appointment.objects.order_by("?").values_list("id", flat=True)[:1000]),
+        "today": timezone.localdate().isoformat(),
+        "nhs_numbers": generate_nhs_numbers(rng, requests, exclude=existing),
+        "slots": itertools.count(),
+        "created": [],
+        "deletable": [],
+    }
+
+
+def _patient_form(patient, rng):
+    return {
+        "nhs_number": patient["nhs_number"],
+        "first_name": patient["first_name"],
+        "last_name": patient["last_name"],
+        "date_of_birth": patient["date_of_birth"],
+        "status": rng.choice(["active", "inactive"]),
+        "priority": rng.choice(["low", "medium", "high", "urgent"]),
+    }
+
+
+def _create_patient(context, rng):
+    with context["lock"]:
+        nhs_number = context["nhs_numbers"].pop()
+        context["created"].append(nhs_number)
+    patient = {
+        "nhs_number": nhs_number,
+        "first_name": "Bench",
+        "last_name": rng.choice(["Smith", "Patel", "Jones", "Evans"]),
+        "date_of_birth": "1980-01-01",
+    }
+    return {}, _patient_form(patient, rng)
+
+
+def _update_patient(context, rng):
+    patient = rng.choice(context["patients"])
+    return {"pk": patient["id"]}, _patient_form(patient, rng)
+
+
+def _free_slot(context):
+    # Every booking gets its own half hour, past the seeded window, so none of
+    # them is rejected as a clash and every write is a real one.
+    with context["lock"]:
+        slot = next(context["slots"])
+    day = timezone.localdate() + timedelta(days=120 + slot // 18)
+    return datetime.combine(day, time(9)) + timedelta(minutes=30 * (slot % 18))
+
+
+def _appointment_form(context, rng):
+    return {
+        "patient": rng.choice(context["patients"])["id"],
+        "service": rng.choice(context["service_ids"]),
+        "scheduled_for": _free_slot(context).strftime("%Y-%m-%dT%H:%M"),
+        "location": "Clinic A",
+        "status": "scheduled",
+    }
+
+
+def _create_appointment(context, rng):
+    return {}, _appointment_form(context, rng)
+
+
+def _update_appointment(context, rng):
+    return {"pk": rng.choice(context["appointment_ids"])}, _appointment_form(context, rng)
+
+
+def _find_created_patients(context):
+    context["deletable"] = list(
+        Patient.objects.filter(nhs_number__in=context["created"]).values_list("id", flat=True)
+    )
+    # Run on its own, the scenario seeds its own patients with the unused numbers.
+    while context["nhs_numbers"]:
+        patient = Patient.objects.create(
+            nhs_number=context["nhs_numbers"].pop(),
+            first_name="Bench",
+            last_name="Delete",
+            date_of_birth="1980-01-01",
+        )
+        context["deletable"].append(patient.pk)
+
+
+def _delete_patient(context, rng):
+    with context["lock"]:
+        return {"pk": context["deletable"].pop()}, {}
+
+
+def _random_patient(context, rng):
+    return {"pk": rng.choice(context["patients"])["id"]}
+
+
+def _search(context, rng):
+    return {"q": rng.choice(SEARCH_PREFIXES)}
+
+
+SCENARIOS = [
+    Get("dashboard", "dashboard"),
+    Get("patients_list", "patients_list"),
+    Get("patients_list_search", "patients_list", params=_search),
+    Get("patients_detail", "patients_detail", kwargs=_random_patient),
+    Get("appointments_list", "appointments_list"),
+    Get(
+        "appointments_list_filtered",
+        "appointments_list",
+        params=lambda context, rng: {"status": "scheduled", "date_from": context["today"]},
+    ),
+    Get("lookup_patients", "lookup_patients", params=_search),
+    Post(
+        "patients_create",
+        "patients_create",
+        _create_patient,
+        warmup_url=lambda context, rng: reverse("patients_create"),
+    ),
+    Post(
+        "patients_update",
+        "patients_edit",
+        _update_patient,
+        warmup_url=lambda context, rng: reverse("patients_edit", kwargs=_random_patient(context, rng)),
+    ),
+    Post(
+        "appointments_create",
+        "appointments_create",
+        _create_appointment,
+        warmup_url=lambda context, rng: reverse("appointments_create"),
+    ),
+    Post(
+        "appointments_update",
+        "appointments_edit",
+        _update_appointment,
+        warmup_url=lambda context, rng: reverse(
+            "appointments_edit", kwargs={"pk": rng.choice(context["appointment_ids"])}
+        ),
+    ),
+    # Deletes the patients created above, or patients of its own when run alone.
+    Post(
+        "patients_delete",
+        "patients_delete",
+        _delete_patient,
+        warmup_url=lambda context, rng: reverse("patients_delete", kwargs=_random_patient(context, rng)),
+        setup=_find_created_patients,
+    ),
+]
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Database round-trips spent on sessions and flash messages per request.
+
+Signs in once per strategy, then replays a short browsing session (dashboard,
+lists, a patient, adding a service and the redirect that shows its message)
+and counts the queries that touch django_session. Runs against a throwaway
+database; run collectstatic first or set DEBUG=1.
+
+    python benchmarks/session_roundtrips.py --rounds 20
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "nhs_service_tracker.settings")
+django.setup()
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from tracker.models import Patient
+
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+MESSAGE_STORAGES = {
+    "session": "django.contrib.messages.storage.session.SessionStorage",
+    "cookie": "django.contrib.messages.storage.cookie.CookieStorage",
+}
+STRATEGIES = [("db", "session"), ("db", "cookie"), ("cached_db", "cookie"), ("signed_cookies", "cookie")]
+
+
+def _requests(client, patient, label, rounds):
+    for index in range(rounds):
+        yield lambda: client.get("/")
+        yield lambda: client.get("/patients/")
+        yield lambda: client.get(f"/patients/{patient.pk}/")
+        yield lambda: client.get("/appointments/")
+        yield lambda: client.post("/services/add/", {"name": f"{label} {index}"})
+        yield lambda: client.get("/services/")
+
+
+def measure(user, patient, session, messages, rounds):
+    caches["sessions"].clear()
+    with override_settings(SESSION_ENGINE=SESSION_ENGINES[session], MESSAGE_STORAGE=MESSAGE_STORAGES[messages]):
+        client = Client()
+        client.force_login(user)
+        reads = writes = total = requests = 0
+        for send in _requests(client, patient, f"{session}-{messages}", rounds):
+            with CaptureQueriesContext(connection) as queries:
+                response = send()
+            if response.status_code >= 400:
+                raise RuntimeError(f"{response.status_code} from {response.request['PATH_INFO']}")
+            requests += 1
+            total += len(queries)
+            for query in queries:
+                if "django_session" in query["sql"]:
+                    if query["sql"].lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE")):
+                        writes += 1
+                    else:
+                        reads += 1
+    return {
+        "sessions": session,
+        "messages": messages,
+        "requests": requests,
+        "session_reads": reads,
+        "session_writes": writes,
+        "session_queries_per_request": round((reads + writes) / requests, 2),
+        "queries_per_request": round(total / requests, 2),
+    }
+
+
+def run(rounds=20):
+    old_name = connection.settings_dict["NAME"]
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == "sqlite":
+            connection.settings_dict["TEST"]["NAME"] = os.path.join(directory, "sessions.sqlite3")
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            user = User.objects.create_user(username="sessions@example.nhs.uk", is_staff=True)
+            patient = Patient.objects.create(
+                nhs_number="9434765919", first_name="Ada", last_name="Lovelace", date_of_birth=date(1980, 1, 1)
+            )
+            results = [measure(user, patient, session, messages, rounds) for session, messages in STRATEGIES]
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+    baseline = results[0]["session_queries_per_request"]
+    for result in results:
+        result["saved_per_request"] = round(baseline - result["session_queries_per_request"], 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20, help="Times the browsing session is replayed.")
+    args = parser.parse_args()
+    print(json.dumps(run(args.rounds), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import gc
+import os
+
+wsgi_app = "nhs_service_tracker.wsgi:application"
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# Workers are left to gunicorn, which reads WEB_CONCURRENCY (set per dyno size on
+# Heroku) and otherwise runs one; cpu_count() sees the host's CPUs, not the
+# container's share. More than one thread switches the sync worker to gthread.
+threads = int(os.environ.get("GUNICORN_THREADS", "1"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+
+# Recycle workers to cap slow leaks; the jitter keeps them from restarting together.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+# Import Django, the settings, the URLconf and the compiled templates (see
+# tracker/warmup.py) once in the master; workers fork with all of it in memory.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+
+if preload_app:
+    # A collection in a worker writes to every object it scans, which copies the
+    # master's pages. Collect nothing while the app loads, move everything that
+    # survived into the permanent generation just before forking, then let each
+    # worker collect its own garbage as usual.
+    gc.disable()
+
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        from django.db import connections
+
+        # Workers must open their own database connections rather than share the master's socket.
+        connections.close_all()
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    gc.enable()
@@ -2,5 +2,21 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "nhs_service_tracker.settings")
+os.environ.setdefault("ASYNC_VIEWS", "1")
+os.environ.setdefault("AUTH_HASH_OFFLOAD", "1")
+# Each async request runs its sync work on its own thread, so persistent
+# connections pile up rather than being reused; use DB_POOL under ASGI instead.
+os.environ.setdefault("DB_CONN_MAX_AGE", "0")
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+from tracker.warmup import warm_up  # noqa: E402
+
+from .database import log_database_config  # noqa: E402
+
+log_database_config()
+# Runs before the server hands the application any traffic.
+if settings.WORKER_WARMUP:
+    warm_up()
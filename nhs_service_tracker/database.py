@@ -0,0 +1,49 @@
+import logging
+
+import django
+import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger("tracker.database")
+
+
+def database_settings(environ, default):
+    pool = environ.get("DB_POOL", "0") == "1"
+    # A pool hands out its own long-lived connections, so Django must not hold one too.
+    conn_max_age = 0 if pool else int(environ.get("DB_CONN_MAX_AGE", "60"))
+    config = dj_database_url.parse(
+        environ.get("DATABASE_URL", default),
+        conn_max_age=conn_max_age,
+        conn_health_checks=environ.get("DB_CONN_HEALTH_CHECKS", "1") == "1",
+    )
+    if pool:
+        if config["ENGINE"] != "django.db.backends.postgresql":
+            raise ImproperlyConfigured("DB_POOL is only supported with PostgreSQL.")
+        if django.VERSION < (5, 1):
+            raise ImproperlyConfigured("DB_POOL needs Django 5.1+ for native psycopg pooling.")
+        config.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": int(environ.get("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(environ.get("DB_POOL_MAX_SIZE", "10")),
+            "timeout": int(environ.get("DB_POOL_TIMEOUT", "30")),
+        }
+    return config
+
+
+def describe_database(config):
+    pool = config.get("OPTIONS", {}).get("pool")
+    if pool:
+        pooling = f"pool min={pool['min_size']} max={pool['max_size']} timeout={pool['timeout']}s"
+    elif config.get("CONN_MAX_AGE") is None:
+        pooling = "persistent connections (no max age)"
+    elif config.get("CONN_MAX_AGE"):
+        pooling = f"persistent connections for {config['CONN_MAX_AGE']}s"
+    else:
+        pooling = "new connection per request"
+    health_checks = "on" if config.get("CONN_HEALTH_CHECKS") else "off"
+    return f"{config['ENGINE'].rsplit('.', 1)[-1]}: {pooling}, health checks {health_checks}"
+
+
+def log_database_config():
+    from django.conf import settings
+
+    logger.info("Database connections: %s", describe_database(settings.DATABASES["default"]))
@@ -1,13 +1,19 @@
 from pathlib import Path
+import importlib.util
 import os
 import sys
-import dj_database_url
-from dotenv import load_dotenv
 from django.core.exceptions import ImproperlyConfigured
 
+from .database import database_settings
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-load_dotenv(BASE_DIR / "env")
+# Only local checkouts have an env file; deployments set real environment
+# variables, so python-dotenv is not even imported there.
+if (BASE_DIR / "env").exists():
+    from dotenv import load_dotenv
+
+    load_dotenv(BASE_DIR / "env")
 
 DEBUG = os.environ.get("DEBUG", "0") == "1"
 SECRET_KEY = os.environ.get("SECRET_KEY")
@@ -33,6 +39,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "tracker.middleware.QueryMetricsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -43,12 +50,24 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "nhs_service_tracker.urls"
 
+# Each template is compiled once per process by the cached loader, and
+# tracker/warmup.py does it before the first request. runserver's autoreloader
+# clears the cache when a template changes, so DEBUG needs no separate profile.
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
-        "APP_DIRS": True,
         "OPTIONS": {
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                )
+            ],
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
@@ -62,9 +81,144 @@ TEMPLATES = [
 WSGI_APPLICATION = "nhs_service_tracker.wsgi.application"
 ASGI_APPLICATION = "nhs_service_tracker.asgi.application"
 
+# DB_CONN_MAX_AGE, DB_CONN_HEALTH_CHECKS and DB_POOL* tune connection reuse; see database.py.
 DATABASES = {
-    "default": dj_database_url.config(default=f"sqlite:///{BASE_DIR / 'nhs_tracker.db'}")
+    "default": database_settings(os.environ, default=f"sqlite:///{BASE_DIR / 'nhs_tracker.db'}")
+}
+
+_CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+}
+
+
+def _cache_settings(prefix, default, locations, timeout):
+    backend = os.environ.get(f"{prefix}_CACHE_BACKEND", default)
+    if backend not in _CACHE_BACKENDS:
+        raise ImproperlyConfigured(f"{prefix}_CACHE_BACKEND must be one of: {', '.join(_CACHE_BACKENDS)}.")
+    if backend == "redis" and importlib.util.find_spec("redis") is None:
+        raise ImproperlyConfigured(f"{prefix}_CACHE_BACKEND=redis requires the redis package.")
+    config = {
+        "BACKEND": _CACHE_BACKENDS[backend],
+        "LOCATION": os.environ.get(f"{prefix}_CACHE_LOCATION", locations.get(backend, "redis://127.0.0.1:6379/1")),
+        "TIMEOUT": timeout,
+    }
+    if backend != "redis":
+        config["OPTIONS"] = {"MAX_ENTRIES": int(os.environ.get(f"{prefix}_CACHE_MAX_ENTRIES", "20000"))}
+    return config
+
+
+FRAGMENT_CACHE_TTL = int(os.environ.get("FRAGMENT_CACHE_TTL", "3600"))
+
+# Rendered list rows and patient detail bodies, and cached_db sessions, live in
+# their own caches so they can be moved to disk or Redis without touching the
+# default cache. The default cache holds the dashboard figures and autocomplete
+# results; a locmem copy is private to each worker, so an edit clears it only in
+# the worker that made it.
+CACHES = {
+    "default": _cache_settings(
+        "DEFAULT",
+        "locmem",
+        {"locmem": "nhs-service-tracker", "file": str(BASE_DIR / ".default-cache")},
+        300,
+    ),
+    "fragments": _cache_settings(
+        "FRAGMENT",
+        "locmem",
+        {"locmem": "nhs-service-tracker-fragments", "file": str(BASE_DIR / ".fragment-cache")},
+        FRAGMENT_CACHE_TTL,
+    ),
+    "sessions": _cache_settings(
+        "SESSION",
+        "locmem",
+        {"locmem": "nhs-service-tracker-sessions", "file": str(BASE_DIR / ".session-cache")},
+        None,
+    ),
+}
+
+# Every signed-in request loads the session. cached_db reads it from the
+# "sessions" cache and writes only when it changes; signed_cookies keeps it in
+# the browser and never touches the database. The session cache must be shared
+# by every host, or a signed-out session stays valid in another host's copy, so
+# cached_db is the default only on Redis and needs Redis outside DEBUG.
+_SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+_SHARED_SESSION_CACHE = CACHES["sessions"]["BACKEND"] == _CACHE_BACKENDS["redis"]
+SESSION_BACKEND = os.environ.get("SESSION_BACKEND", "cached_db" if _SHARED_SESSION_CACHE else "db")
+if SESSION_BACKEND not in _SESSION_ENGINES:
+    raise ImproperlyConfigured(f"SESSION_BACKEND must be one of: {', '.join(_SESSION_ENGINES)}.")
+if SESSION_BACKEND == "cached_db" and not (_SHARED_SESSION_CACHE or DEBUG):
+    raise ImproperlyConfigured("SESSION_BACKEND=cached_db requires SESSION_CACHE_BACKEND=redis unless DEBUG=1.")
+SESSION_ENGINE = _SESSION_ENGINES[SESSION_BACKEND]
+SESSION_CACHE_ALIAS = "sessions"
+SESSION_SAVE_EVERY_REQUEST = False
+
+# Flash messages ride in a signed cookie so adding and showing one costs no session write.
+_MESSAGE_STORAGES = {
+    "cookie": "django.contrib.messages.storage.cookie.CookieStorage",
+    "session": "django.contrib.messages.storage.session.SessionStorage",
+    "fallback": "django.contrib.messages.storage.fallback.FallbackStorage",
+}
+MESSAGE_BACKEND = os.environ.get("MESSAGE_BACKEND", "cookie")
+if MESSAGE_BACKEND not in _MESSAGE_STORAGES:
+    raise ImproperlyConfigured(f"MESSAGE_BACKEND must be one of: {', '.join(_MESSAGE_STORAGES)}.")
+MESSAGE_STORAGE = _MESSAGE_STORAGES[MESSAGE_BACKEND]
+
+DASHBOARD_CACHE_TTL = int(os.environ.get("DASHBOARD_CACHE_TTL", "30"))
+LIST_PAGE_SIZE = int(os.environ.get("LIST_PAGE_SIZE", "50"))
+# The dashboard and lists answer 304 Not Modified while nothing they show has changed;
+# time-dependent pages are re-rendered at least once per window (seconds).
+CONDITIONAL_GET = os.environ.get("CONDITIONAL_GET", "1") == "1"
+CONDITIONAL_GET_WINDOW = int(os.environ.get("CONDITIONAL_GET_WINDOW", "60"))
+STREAM_CHUNK_SIZE = int(os.environ.get("STREAM_CHUNK_SIZE", "500"))
+
+# "auto" picks SQLite FTS5 or PostgreSQL tsvector from the active database.
+PATIENT_SEARCH_BACKEND = os.environ.get("PATIENT_SEARCH_BACKEND", "auto")
+PATIENT_SEARCH_LIMIT = int(os.environ.get("PATIENT_SEARCH_LIMIT", "100"))
+LOOKUP_LIMIT = int(os.environ.get("LOOKUP_LIMIT", "10"))
+LOOKUP_CACHE_TTL = int(os.environ.get("LOOKUP_CACHE_TTL", "300"))
+
+# Bookable clinic hours in local time, and the grid free slots are offered on.
+CLINIC_OPENS = os.environ.get("CLINIC_OPENS", "09:00")
+CLINIC_CLOSES = os.environ.get("CLINIC_CLOSES", "18:00")
+APPOINTMENT_SLOT_MINUTES = int(os.environ.get("APPOINTMENT_SLOT_MINUTES", "15"))
+AVAILABILITY_MAX_DAYS = int(os.environ.get("AVAILABILITY_MAX_DAYS", "14"))
+
+# New passwords use PASSWORD_HASHER; the others stay listed so existing hashes
+# still verify and are upgraded on the next successful login.
+_PASSWORD_HASHERS = {
+    "pbkdf2": "tracker.hashers.TunedPBKDF2PasswordHasher",
+    "argon2": "tracker.hashers.TunedArgon2PasswordHasher",
+    "scrypt": "tracker.hashers.TunedScryptPasswordHasher",
 }
+PASSWORD_HASHER = os.environ.get("PASSWORD_HASHER", "pbkdf2")
+if PASSWORD_HASHER not in _PASSWORD_HASHERS:
+    raise ImproperlyConfigured(f"PASSWORD_HASHER must be one of: {', '.join(_PASSWORD_HASHERS)}.")
+if PASSWORD_HASHER == "argon2" and importlib.util.find_spec("argon2") is None:
+    raise ImproperlyConfigured("PASSWORD_HASHER=argon2 requires the argon2-cffi package.")
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+]
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get("PASSWORD_PBKDF2_ITERATIONS", "720000"))
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.environ.get("PASSWORD_SCRYPT_WORK_FACTOR", "16384"))
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get("PASSWORD_ARGON2_TIME_COST", "2"))
+PASSWORD_ARGON2_MEMORY_COST = int(os.environ.get("PASSWORD_ARGON2_MEMORY_COST", "102400"))
+PASSWORD_ARGON2_PARALLELISM = int(os.environ.get("PASSWORD_ARGON2_PARALLELISM", "8"))
+
+# wsgi.py and asgi.py compile the templates and build the URL resolver at startup.
+WORKER_WARMUP = os.environ.get("WORKER_WARMUP", "1") == "1"
+
+# asgi.py turns this on so the read-heavy pages are served by async views.
+ASYNC_VIEWS = os.environ.get("ASYNC_VIEWS", "0") == "1"
+
+# asgi.py also turns the offload on: sign-in hashing then runs on a bounded thread
+# pool instead of the event loop or the shared sync thread.
+AUTH_HASH_OFFLOAD = os.environ.get("AUTH_HASH_OFFLOAD", "0") == "1"
+AUTH_HASH_WORKERS = int(os.environ.get("AUTH_HASH_WORKERS", str(os.cpu_count() or 1)))
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -81,6 +235,31 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Requests slower than SLOW_REQUEST_MS are logged with their SQL fingerprints.
+SLOW_REQUEST_MS = int(os.environ.get("SLOW_REQUEST_MS", "500"))
+SLOW_REQUEST_LOG = os.environ.get("SLOW_REQUEST_LOG", str(BASE_DIR / "slow_requests.log"))
+# Prometheus scrapers send "Authorization: Bearer <token>"; staff can also view /metrics/ when signed in.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+        "slow_requests": {
+            "class": "logging.handlers.RotatingFileHandler",
+            "filename": SLOW_REQUEST_LOG,
+            "maxBytes": 10 * 1024 * 1024,
+            "backupCount": 5,
+            "delay": True,
+        },
+    },
+    "loggers": {
+        "tracker": {"handlers": ["console"], "level": os.environ.get("TRACKER_LOG_LEVEL", "INFO")},
+        "tracker.slow_requests": {"handlers": ["slow_requests"], "level": "WARNING", "propagate": False},
+    },
+}
+
 LANGUAGE_CODE = "en-gb"
 TIME_ZONE = "Europe/London"
 USE_I18N = True
@@ -4,3 +4,14 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "nhs_service_tracker.settings")
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+
+from tracker.warmup import warm_up  # noqa: E402
+
+from .database import log_database_config  # noqa: E402
+
+log_database_config()
+# Runs before the server hands the application any traffic.
+if settings.WORKER_WARMUP:
+    warm_up()
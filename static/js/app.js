@@ -1 +1,216 @@
-// Placeholder for interactive enhancements.
+// Autocomplete for fields rendered by tracker.forms.AutocompleteWidget, and the
+// free-slot picker on the appointment form.
+(function () {
+  "use strict";
+
+  var DEBOUNCE_MS = 150;
+
+  function setupAutocomplete(input) {
+    var hidden = document.getElementById(input.dataset.autocompleteTarget);
+    var list = document.getElementById(input.getAttribute("aria-controls"));
+    var url = input.dataset.autocompleteUrl;
+    var cache = new Map();
+    var results = [];
+    var active = -1;
+    var timer = null;
+    var pending = null;
+
+    function close() {
+      list.hidden = true;
+      input.setAttribute("aria-expanded", "false");
+      input.removeAttribute("aria-activedescendant");
+      active = -1;
+    }
+
+    function highlight(index) {
+      var items = list.children;
+      if (active >= 0 && items[active]) {
+        items[active].classList.remove("active");
+        items[active].setAttribute("aria-selected", "false");
+      }
+      active = index;
+      if (active >= 0 && items[active]) {
+        items[active].classList.add("active");
+        items[active].setAttribute("aria-selected", "true");
+        input.setAttribute("aria-activedescendant", items[active].id);
+      }
+    }
+
+    function choose(index) {
+      var result = results[index];
+      if (!result) {
+        return;
+      }
+      hidden.value = result.id;
+      input.value = result.label;
+      close();
+    }
+
+    function show(items) {
+      results = items;
+      list.textContent = "";
+      items.forEach(function (item, index) {
+        var option = document.createElement("li");
+        option.id = list.id + "_" + index;
+        option.setAttribute("role", "option");
+        option.textContent = item.label;
+        option.addEventListener("mousedown", function (event) {
+          event.preventDefault();
+          choose(index);
+        });
+        list.appendChild(option);
+      });
+      if (!items.length) {
+        var empty = document.createElement("li");
+        empty.className = "empty";
+        empty.textContent = "No matches";
+        list.appendChild(empty);
+      }
+      list.hidden = false;
+      input.setAttribute("aria-expanded", "true");
+      active = -1;
+    }
+
+    function search(query) {
+      if (cache.has(query)) {
+        show(cache.get(query));
+        return;
+      }
+      if (pending) {
+        pending.abort();
+      }
+      pending = new AbortController();
+      fetch(url + "?q=" + encodeURIComponent(query), {
+        credentials: "same-origin",
+        headers: { Accept: "application/json" },
+        signal: pending.signal,
+      })
+        .then(function (response) {
+          return response.ok ? response.json() : { results: [] };
+        })
+        .then(function (data) {
+          cache.set(query, data.results);
+          if (input.value.trim() === query) {
+            show(data.results);
+          }
+        })
+        .catch(function () {});
+    }
+
+    input.addEventListener("input", function () {
+      hidden.value = "";
+      clearTimeout(timer);
+      var query = input.value.trim();
+      timer = setTimeout(function () {
+        search(query);
+      }, DEBOUNCE_MS);
+    });
+
+    input.addEventListener("focus", function () {
+      if (!hidden.value) {
+        search(input.value.trim());
+      }
+    });
+
+    input.addEventListener("keydown", function (event) {
+      if (list.hidden) {
+        return;
+      }
+      if (event.key === "ArrowDown") {
+        event.preventDefault();
+        highlight(Math.min(active + 1, results.length - 1));
+      } else if (event.key === "ArrowUp") {
+        event.preventDefault();
+        highlight(Math.max(active - 1, 0));
+      } else if (event.key === "Enter" && active >= 0) {
+        event.preventDefault();
+        choose(active);
+      } else if (event.key === "Escape") {
+        close();
+      }
+    });
+
+    input.addEventListener("blur", close);
+  }
+
+  function setupAvailability(panel) {
+    var form = panel.closest("form");
+    var when = form.elements.scheduled_for;
+    var list = panel.querySelector(".availability-slots");
+    var pending = null;
+
+    function show(data) {
+      list.textContent = "";
+      data.days.forEach(function (day) {
+        day.slots.forEach(function (slot) {
+          var item = document.createElement("li");
+          var button = document.createElement("button");
+          button.type = "button";
+          button.textContent = slot.label;
+          button.addEventListener("click", function () {
+            when.value = slot.value;
+          });
+          item.appendChild(button);
+          list.appendChild(item);
+        });
+      });
+      if (!list.children.length) {
+        var empty = document.createElement("li");
+        empty.className = "empty";
+        empty.textContent = "No free slots on this day";
+        list.appendChild(empty);
+      }
+      panel.hidden = false;
+    }
+
+    function refresh() {
+      var place = form.elements.location.value.trim();
+      if (!place) {
+        panel.hidden = true;
+        return;
+      }
+      var params = new URLSearchParams({ location: place });
+      if (when.value) {
+        params.set("date", when.value.slice(0, 10));
+      }
+      if (form.elements.duration_minutes.value) {
+        params.set("duration", form.elements.duration_minutes.value);
+      }
+      if (form.elements.patient.value) {
+        params.set("patient", form.elements.patient.value);
+      }
+      if (panel.dataset.exclude) {
+        params.set("exclude", panel.dataset.exclude);
+      }
+      if (pending) {
+        pending.abort();
+      }
+      pending = new AbortController();
+      fetch(panel.dataset.availabilityUrl + "?" + params, {
+        credentials: "same-origin",
+        headers: { Accept: "application/json" },
+        signal: pending.signal,
+      })
+        .then(function (response) {
+          return response.ok ? response.json() : null;
+        })
+        .then(function (data) {
+          if (data) {
+            show(data);
+          }
+        })
+        .catch(function () {});
+    }
+
+    ["location", "scheduled_for", "duration_minutes"].forEach(function (name) {
+      form.elements[name].addEventListener("change", refresh);
+    });
+    document.getElementById(form.elements.patient.id + "_search").addEventListener("blur", refresh);
+    refresh();
+  }
+
+  document.addEventListener("DOMContentLoaded", function () {
+    document.querySelectorAll("[data-autocomplete-url]").forEach(setupAutocomplete);
+    document.querySelectorAll("[data-availability-url]").forEach(setupAvailability);
+  });
+})();
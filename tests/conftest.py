@@ -1,5 +1,11 @@
+from datetime import date, timedelta
+
 import pytest
 from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.utils import timezone
+
+from tracker.models import Appointment, Patient, Service
 
 
 def pytest_configure(config):
@@ -11,6 +17,13 @@ def _staticfiles_storage(settings):
     settings.STATICFILES_STORAGE = "django.contrib.staticfiles.storage.StaticFilesStorage"
 
 
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    for cache in caches.all():
+        cache.clear()
+    yield
+
+
 @pytest.fixture()
 def user(db):
     return User.objects.create_user(
@@ -20,3 +33,22 @@ def user(db):
         first_name="Admin",
         last_name="User",
     )
+
+
+@pytest.fixture()
+def signed_in(client, user):
+    client.force_login(user)
+    return client
+
+
+@pytest.fixture()
+def appointment(db):
+    patient = Patient.objects.create(
+        nhs_number="9434765919", first_name="Ada", last_name="Lovelace", date_of_birth=date(1980, 1, 1)
+    )
+    return Appointment.objects.create(
+        patient=patient,
+        service=Service.objects.create(name="Cardiology"),
+        scheduled_for=timezone.now() + timedelta(days=2),
+        location="Room 101",
+    )
@@ -0,0 +1,73 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from django.utils import timezone
+
+from tracker.models import Appointment, Patient, Service
+
+
+@pytest.fixture()
+def appointments(db):
+    service = Service.objects.create(name="Radiology")
+    other_service = Service.objects.create(name="Physiotherapy")
+    patient = Patient.objects.create(
+        nhs_number="9430000301", first_name="Rhys", last_name="Evans", date_of_birth=date(1970, 3, 3)
+    )
+    start = timezone.make_aware(datetime(2030, 5, 1, 9, 0))
+    return [
+        Appointment.objects.create(
+            patient=patient,
+            service=service if day % 2 == 0 else other_service,
+            scheduled_for=start + timedelta(days=day),
+            location="Clinic A",
+            status="scheduled" if day < 4 else "completed",
+        )
+        for day in range(6)
+    ]
+
+
+def test_appointments_list_filters(signed_in, appointments):
+    rv = signed_in.get(
+        "/appointments/",
+        {"date_from": "2030-05-02", "date_to": "2030-05-05", "status": "scheduled"},
+    )
+    assert [a.pk for a in rv.context["page"]] == [appointments[3].pk, appointments[2].pk, appointments[1].pk]
+
+    rv = signed_in.get("/appointments/", {"service": appointments[0].service_id})
+    assert {a.pk for a in rv.context["page"]} == {appointments[0].pk, appointments[2].pk, appointments[4].pk}
+
+
+def test_appointments_list_keyset_pages_keep_filters(signed_in, appointments, settings):
+    settings.LIST_PAGE_SIZE = 2
+    rv = signed_in.get("/appointments/", {"status": "scheduled"})
+    page = rv.context["page"]
+    assert [a.pk for a in page] == [appointments[3].pk, appointments[2].pk]
+    assert b"status=scheduled&amp;cursor=" in rv.content
+
+    rv = signed_in.get("/appointments/", {"status": "scheduled", "cursor": page.next_cursor})
+    assert [a.pk for a in rv.context["page"]] == [appointments[1].pk, appointments[0].pk]
+    assert not rv.context["page"].has_next
+
+
+def test_appointments_list_streaming(signed_in, appointments, settings):
+    settings.STREAM_CHUNK_SIZE = 2
+    rv = signed_in.get("/appointments/", {"stream": "1", "status": "completed"})
+    assert rv.streaming
+    body = b"".join(rv.streaming_content).decode()
+    assert body.count("<tr>") == 3
+    assert "Rhys Evans" in body
+    assert body.rstrip().endswith("</html>")
+
+
+def test_appointments_list_rejects_inverted_range(signed_in, appointments):
+    rv = signed_in.get("/appointments/", {"date_from": "2030-05-05", "date_to": "2030-05-01"})
+    assert rv.context["filters"].errors
+    assert len(rv.context["page"]) == 0
+    assert b"The start date must be on or before the end date." in rv.content
+
+
+def test_appointments_list_streams_nothing_for_invalid_filters(signed_in, appointments):
+    rv = signed_in.get("/appointments/", {"stream": "1", "service": "999999"})
+    body = b"".join(rv.streaming_content).decode()
+    assert "No appointments found." in body
+    assert "Rhys Evans" not in body
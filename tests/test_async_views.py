@@ -0,0 +1,109 @@
+import importlib
+from datetime import date, datetime, timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import clear_url_caches
+from django.utils import timezone
+
+import nhs_service_tracker.urls
+import tracker.urls
+from tracker import views
+from tracker.models import Appointment, Patient, Service
+
+
+def _reload_urls():
+    importlib.reload(tracker.urls)
+    importlib.reload(nhs_service_tracker.urls)
+    clear_url_caches()
+
+
+@pytest.fixture()
+def async_views(settings):
+    settings.ASYNC_VIEWS = True
+    _reload_urls()
+    yield
+    settings.ASYNC_VIEWS = False
+    _reload_urls()
+
+
+@pytest.fixture()
+def records(db):
+    service = Service.objects.create(name="Radiology")
+    patient = Patient.objects.create(
+        nhs_number="9430000601", first_name="Nia", last_name="Hughes", date_of_birth=date(1982, 2, 2)
+    )
+    start = timezone.now() + timedelta(hours=2)
+    for hour in range(3):
+        Appointment.objects.create(
+            patient=patient,
+            service=service,
+            scheduled_for=start + timedelta(hours=hour),
+            location="Clinic A",
+        )
+    return patient
+
+
+def test_async_views_are_routed(async_views, signed_in, records):
+    for path, view in [
+        ("/", views.dashboard_async),
+        ("/patients/", views.patients_list_async),
+        (f"/patients/{records.pk}/", views.patients_detail_async),
+        ("/appointments/", views.appointments_list_async),
+    ]:
+        rv = signed_in.get(path)
+        assert rv.status_code == 200
+        assert rv.resolver_match.func is view
+
+
+def test_async_views_require_login(async_views, client, db):
+    rv = client.get("/patients/")
+    assert rv.status_code == 302
+    assert rv["Location"] == "/login/?next=/patients/"
+
+
+def test_async_views_match_sync_output(signed_in, records, settings):
+    settings.LIST_PAGE_SIZE = 2
+    paths = ["/", "/patients/", f"/patients/{records.pk}/", "/appointments/?status=scheduled"]
+    sync_pages = [signed_in.get(path) for path in paths]
+
+    settings.ASYNC_VIEWS = True
+    _reload_urls()
+    try:
+        async_pages = [signed_in.get(path) for path in paths]
+    finally:
+        settings.ASYNC_VIEWS = False
+        _reload_urls()
+
+    for sync_page, async_page in zip(sync_pages, async_pages):
+        assert async_page.status_code == 200
+        sync_body = sync_page.content.decode()
+        async_body = async_page.content.decode()
+        assert async_body.count("<tr") == sync_body.count("<tr")
+    assert async_pages[0].context["today_appointments"] == sync_pages[0].context["today_appointments"]
+    assert async_pages[3].context["page"].next_cursor == sync_pages[3].context["page"].next_cursor
+
+
+def test_async_detail_404(async_views, signed_in, db):
+    assert signed_in.get("/patients/999999/").status_code == 404
+
+
+def test_async_appointments_stream(async_views, signed_in, records, settings):
+    settings.STREAM_CHUNK_SIZE = 2
+    rv = signed_in.get("/appointments/", {"stream": "1"})
+    assert rv.streaming
+
+    async def consume():
+        return b"".join([chunk async for chunk in rv.streaming_content])
+
+    body = async_to_sync(consume)().decode()
+    assert body.count("Hughes") == 3
+    assert body.rstrip().endswith("</html>")
+
+
+def test_async_views_answer_conditional_gets(async_views, signed_in, records, settings):
+    settings.CONDITIONAL_GET_WINDOW = 10**9
+    for path in ("/", "/patients/", "/appointments/"):
+        first = signed_in.get(path)
+        assert first.status_code == 200
+        assert signed_in.get(path, HTTP_IF_NONE_MATCH=first["ETag"]).status_code == 304
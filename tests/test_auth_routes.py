@@ -29,3 +29,38 @@ def test_register_and_login(client):
 def test_skip_link_present(client):
     rv = client.get("/login/")
     assert b"Skip to content" in rv.content
+
+
+@pytest.mark.django_db
+def test_login_checks_schema_once_until_database_error(client, user, monkeypatch):
+    from django.contrib.auth.backends import ModelBackend
+    from django.db import OperationalError, connection
+
+    from tracker import views
+
+    monkeypatch.setitem(views._auth_schema, "ready", False)
+    calls = []
+    table_names = connection.introspection.table_names
+    monkeypatch.setattr(
+        connection.introspection, "table_names", lambda *a, **kw: calls.append(1) or table_names(*a, **kw)
+    )
+    credentials = {"username": "admin@example.nhs.uk", "password": "ChangeMe123!"}
+
+    for _ in range(3):
+        rv = client.post("/login/", data=credentials)
+        assert rv.status_code == 302
+        client.logout()
+    assert len(calls) == 1
+
+    authenticate = ModelBackend.authenticate
+
+    def broken(*args, **kwargs):
+        raise OperationalError("no such table: auth_user")
+
+    monkeypatch.setattr(ModelBackend, "authenticate", broken)
+    rv = client.post("/login/", data=credentials, follow=True)
+    assert b"Database is not ready" in rv.content
+
+    monkeypatch.setattr(ModelBackend, "authenticate", authenticate)
+    assert client.post("/login/", data=credentials).status_code == 302
+    assert len(calls) == 2
@@ -0,0 +1,235 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from tracker.availability import Booking, Timeline, bookings, free_slots
+from tracker.forms import AppointmentForm
+from tracker.models import Appointment, BookingLock, Patient, Service
+
+DAY = date(2030, 1, 7)
+
+
+def at(hour, minute=0, day=DAY):
+    return timezone.make_aware(datetime(day.year, day.month, day.day, hour, minute))
+
+
+@pytest.fixture()
+def booking(db):
+    service = Service.objects.create(name="Radiology")
+    patients = [
+        Patient.objects.create(
+            nhs_number=f"94300007{i:02d}", first_name="Pat", last_name=f"Slot{i}", date_of_birth=date(1980, 1, 1)
+        )
+        for i in range(2)
+    ]
+
+    def book(patient, start, minutes=15, location="Clinic A", status="scheduled"):
+        return Appointment.objects.create(
+            patient=patients[patient],
+            service=service,
+            scheduled_for=start,
+            duration_minutes=minutes,
+            location=location,
+            status=status,
+        )
+
+    book.patients = patients
+    book.service = service
+    return book
+
+
+def labels(slots):
+    return [f"{slot:%H:%M}" for slot in slots]
+
+
+def test_timeline_merges_and_probes_intervals():
+    origin = at(0)
+    busy = [(at(10), at(11)), (at(10, 30), at(12)), (at(14), at(14, 15))]
+    timeline = Timeline(origin, [Booking(None, None, "Clinic A", start, end) for start, end in busy])
+    hour = 3600
+    assert timeline.starts == [10 * hour, 14 * hour]
+    assert timeline.ends == [12 * hour, 14 * hour + 900]
+    assert timeline.is_free(9 * hour, 10 * hour)
+    assert not timeline.is_free(9 * hour, 10 * hour + 1)
+    assert not timeline.is_free(11 * hour, 11 * hour + 900)
+    assert timeline.is_free(12 * hour, 14 * hour)
+    assert not timeline.is_free(13 * hour, 15 * hour)
+    assert timeline.is_free(14 * hour + 900, 18 * hour)
+
+
+def test_free_slots_skip_busy_time_within_clinic_hours(booking, settings):
+    settings.CLINIC_OPENS = "09:00"
+    settings.CLINIC_CLOSES = "11:00"
+    booking(0, at(9, 15), minutes=30)
+    booking(0, at(10), status="cancelled")
+    booking(1, at(10, 30), location="Clinic B")
+
+    [(day, slots)] = free_slots("Clinic A", DAY, duration=15, now=at(0))
+    assert day == DAY
+    assert labels(slots) == ["09:00", "09:45", "10:00", "10:15", "10:30", "10:45"]
+
+    [(_, slots)] = free_slots("Clinic A", DAY, duration=30, now=at(0))
+    assert labels(slots) == ["09:45", "10:00", "10:15", "10:30"]
+
+
+def test_free_slots_see_long_appointments_that_start_before_the_window(booking, settings):
+    settings.CLINIC_OPENS = "09:00"
+    settings.CLINIC_CLOSES = "11:00"
+    booking(0, at(22, day=DAY - timedelta(days=1)), minutes=12 * 60)
+
+    [(_, slots)] = free_slots("Clinic A", DAY, now=at(0))
+    assert labels(slots)[0] == "10:00"
+
+
+def test_free_slots_respect_the_patient_and_the_clock(booking, settings):
+    settings.CLINIC_OPENS = "09:00"
+    settings.CLINIC_CLOSES = "10:00"
+    booking(0, at(9), location="Clinic B")
+    later = DAY + timedelta(days=1)
+    booking(1, at(9, day=later))
+
+    days = free_slots("Clinic A", DAY, days=2, patient=booking.patients[0].pk, now=at(9, 20))
+    assert [(day, labels(slots)) for day, slots in days] == [
+        (DAY, ["09:30", "09:45"]),
+        (later, ["09:15", "09:30", "09:45"]),
+    ]
+
+
+def test_free_slot_search_is_one_indexed_query(booking, django_assert_num_queries):
+    for day in range(7):
+        booking(day % 2, at(9, day=DAY + timedelta(days=day)))
+    with django_assert_num_queries(1):
+        free_slots("Clinic A", DAY, days=7, patient=booking.patients[0].pk, now=at(0))
+
+
+def test_bookings_exclude_the_edited_appointment(booking):
+    first = booking(0, at(9), minutes=60)
+    second = booking(1, at(9, 30))
+    found = bookings(at(9, 45), at(10), location="Clinic A")
+    assert [item.pk for item in found] == [first.pk]
+    assert bookings(at(9, 45), at(10), location="Clinic A", exclude=first.pk) == []
+    assert [item.pk for item in bookings(at(9, 30), at(9, 40), location="Clinic A")] == [first.pk, second.pk]
+
+
+def _post(client, booking, patient, when, location="Clinic A", **extra):
+    data = {
+        "patient": booking.patients[patient].pk,
+        "service": booking.service.pk,
+        "scheduled_for": when,
+        "location": location,
+        "status": "scheduled",
+        "duration_minutes": "30",
+        **extra,
+    }
+    return client.post("/appointments/add/", data)
+
+
+def test_form_rejects_double_bookings(signed_in, booking):
+    booking(0, at(9), minutes=30)
+
+    rv = _post(signed_in, booking, 1, "2030-01-07T09:15")
+    assert rv.status_code == 200
+    assert rv.context["form"].errors["location"] == ["Clinic A is already booked from 09:00 to 09:30."]
+
+    rv = _post(signed_in, booking, 0, "2030-01-07T08:45", location="Clinic B")
+    assert rv.context["form"].errors["patient"] == ["The patient already has an appointment from 09:00 to 09:30."]
+
+    assert _post(signed_in, booking, 1, "2030-01-07T09:30").status_code == 302
+    assert _post(signed_in, booking, 0, "2030-01-07T09:00", status="cancelled").status_code == 302
+    assert Appointment.objects.count() == 3
+
+
+def test_saving_rechecks_clashes_booked_after_validation(booking):
+    data = {
+        "patient": booking.patients[1].pk,
+        "service": booking.service.pk,
+        "scheduled_for": "2030-01-07T09:15",
+        "duration_minutes": "30",
+        "location": "Clinic A",
+        "status": "scheduled",
+    }
+    form = AppointmentForm(data)
+    assert form.is_valid()
+    booking(0, at(9), minutes=30)
+
+    assert form.save_booking() is None
+    assert form.errors["location"] == ["Clinic A is already booked from 09:00 to 09:30."]
+    assert Appointment.objects.count() == 1
+
+    form = AppointmentForm({**data, "scheduled_for": "2030-01-07T09:30"})
+    assert form.is_valid()
+    assert form.save_booking().pk
+
+
+def test_saving_locks_the_location_and_patient_before_checking(booking):
+    form = AppointmentForm(
+        {
+            "patient": booking.patients[0].pk,
+            "service": booking.service.pk,
+            "scheduled_for": "2030-01-07T10:00",
+            "duration_minutes": "15",
+            "location": "Clinic B",
+            "status": "scheduled",
+        }
+    )
+    assert form.is_valid()
+    with CaptureQueriesContext(connection) as queries:
+        assert form.save_booking().pk
+    statements = [query["sql"] for query in queries]
+    locks = [i for i, sql in enumerate(statements) if sql.startswith(("UPDATE", "INSERT")) and "bookinglock" in sql]
+    check = next(i for i, sql in enumerate(statements) if sql.startswith("SELECT") and "tracker_appointment" in sql)
+    assert locks and max(locks) < check
+    assert set(BookingLock.objects.values_list("key", flat=True)) == {
+        "location:Clinic B",
+        f"patient:{booking.patients[0].pk}",
+    }
+
+
+def test_editing_keeps_existing_overlaps_unless_the_booking_moves(signed_in, booking):
+    booking(0, at(9), minutes=30)
+    overlapping = booking(1, at(9, 15))
+    data = {
+        "patient": booking.patients[1].pk,
+        "service": booking.service.pk,
+        "scheduled_for": "2030-01-07T09:15",
+        "duration_minutes": "15",
+        "location": "Clinic A",
+        "status": "scheduled",
+        "notes": "Bring letter",
+    }
+    assert signed_in.post(f"/appointments/{overlapping.pk}/edit/", data).status_code == 302
+
+    rv = signed_in.post(f"/appointments/{overlapping.pk}/edit/", {**data, "duration_minutes": "45"})
+    assert "location" in rv.context["form"].errors
+
+
+def test_availability_endpoint(signed_in, booking, settings):
+    settings.CLINIC_OPENS = "09:00"
+    settings.CLINIC_CLOSES = "10:00"
+    booking(0, at(9, 15), minutes=30)
+
+    rv = signed_in.get("/appointments/availability/", {"location": "Clinic A", "date": "2030-01-07"})
+    assert rv.json() == {
+        "location": "Clinic A",
+        "duration": 15,
+        "days": [
+            {
+                "date": "2030-01-07",
+                "slots": [
+                    {"value": "2030-01-07T09:00", "label": "09:00"},
+                    {"value": "2030-01-07T09:45", "label": "09:45"},
+                ],
+            }
+        ],
+    }
+    assert signed_in.get("/appointments/availability/", {"date": "2030-01-07"}).status_code == 400
+    settings.AVAILABILITY_MAX_DAYS = 7
+    rv = signed_in.get("/appointments/availability/", {"location": "Clinic A", "days": "8"})
+    assert rv.status_code == 400
+
+
+def test_availability_endpoint_requires_login(client, db):
+    assert client.get("/appointments/availability/", {"location": "Clinic A"}).status_code == 302
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.http import HttpResponse, HttpResponseRedirect
+
+from benchmarks.load import summarise
+from benchmarks.scenarios import SCENARIOS, Scenario
+from tracker.models import Patient
+
+
+def test_summarise_reports_percentiles_and_throughput():
+    summary = summarise([index / 1000 for index in range(1, 101)], errors=0, elapsed=2.0)
+
+    assert summary["requests"] == 100
+    assert summary["throughput_rps"] == 50.0
+    assert summary["p50_ms"] == pytest.approx(50.5)
+    assert summary["p95_ms"] == pytest.approx(95.05)
+    assert summary["p99_ms"] == pytest.approx(99.01)
+    assert summary["max_ms"] == 100.0
+
+
+def test_incomplete_scenarios_fail_when_built():
+    class Incomplete(Scenario):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_benchmarks_writes_a_json_report(tmp_path):
+    output = tmp_path / "report.json"
+
+    call_command(
+        "run_benchmarks",
+        sizes="20",
+        appointments_per_patient=2,
+        threads=1,
+        requests=4,
+        warmup=1,
+        scenario=["dashboard", "patients_list", "patients_create", "patients_delete"],
+        use_current_db=True,
+        output=str(output),
+    )
+
+    report = json.loads(output.read_text())
+    (run,) = report["runs"]
+    assert run["patients"] == 20
+    assert set(run["scenarios"]) == {"dashboard", "patients_list", "patients_create", "patients_delete"}
+    for summary in run["scenarios"].values():
+        assert summary["requests"] == 4
+        assert summary["errors"] == 0
+        assert summary["p95_ms"] > 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_benchmarks_tops_the_current_database_up_to_each_size(tmp_path):
+    output = tmp_path / "report.json"
+    options = dict(appointments_per_patient=2, threads=1, requests=2, warmup=0, scenario=["dashboard"])
+
+    call_command("run_benchmarks", sizes="5,25", use_current_db=True, output=str(output), **options)
+
+    runs = json.loads(output.read_text())["runs"]
+    assert [(run["patients"], run["appointments"]) for run in runs] == [(5, 10), (25, 50)]
+    assert Patient.objects.count() == 25
+    with pytest.raises(CommandError, match="more than 5"):
+        call_command("run_benchmarks", sizes="5", use_current_db=True, output=str(output), **options)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_write_scenarios_only_count_redirects_as_success(tmp_path):
+    output = tmp_path / "report.json"
+    scenarios = ["appointments_create", "appointments_update", "patients_delete"]
+
+    call_command(
+        "run_benchmarks",
+        sizes="20",
+        appointments_per_patient=2,
+        threads=1,
+        requests=6,
+        warmup=1,
+        scenario=scenarios,
+        use_current_db=True,
+        output=str(output),
+    )
+
+    (run,) = json.loads(output.read_text())["runs"]
+    assert {name: summary["errors"] for name, summary in run["scenarios"].items()} == dict.fromkeys(scenarios, 0)
+    post = next(scenario for scenario in SCENARIOS if scenario.name == "appointments_create")
+    assert not post.succeeded(HttpResponse("form errors"))
+    assert post.succeeded(HttpResponseRedirect("/appointments/"))
@@ -0,0 +1,106 @@
+import time
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from django.utils import timezone
+
+from tracker import conditional
+from tracker.models import Appointment, Patient, Service
+from tracker.occupancy import occupancy
+
+MONDAY = date(2030, 1, 7)
+
+
+def at(hour, minute=0, day=MONDAY):
+    return timezone.make_aware(datetime(day.year, day.month, day.day, hour, minute))
+
+
+@pytest.fixture()
+def book(db, settings):
+    settings.CLINIC_OPENS = "09:00"
+    settings.CLINIC_CLOSES = "11:00"
+    patient = Patient.objects.create(
+        nhs_number="9430000800", first_name="Cal", last_name="Endar", date_of_birth=date(1980, 1, 1)
+    )
+    service = Service.objects.create(name="Radiology")
+
+    def book(start, minutes=15, location="Clinic A", status="scheduled"):
+        return Appointment.objects.create(
+            patient=patient,
+            service=service,
+            scheduled_for=start,
+            duration_minutes=minutes,
+            location=location,
+            status=status,
+        )
+
+    return book
+
+
+def test_grid_buckets_busy_appointments_per_location(book, django_assert_num_queries):
+    book(at(9), minutes=30)
+    book(at(9, 15))
+    book(at(10, 50), minutes=60)
+    book(at(9), location="Clinic B", status="completed")
+    book(at(10), location="Clinic B", status="cancelled")
+    book(at(22, day=MONDAY - timedelta(days=1)), minutes=11 * 60 + 30, location="Ward 3")
+    book(at(9, day=MONDAY + timedelta(days=1)))
+
+    with django_assert_num_queries(1):
+        grid = occupancy(MONDAY)
+    assert grid.slot_labels()[:3] == ["09:00", "09:15", "09:30"]
+    assert len(grid.slot_labels()) == 8
+    assert [(location, cells.tolist()) for location, cells in grid.day(0)] == [
+        ("Clinic A", [1, 2, 0, 0, 0, 0, 0, 1]),
+        ("Clinic B", [1, 0, 0, 0, 0, 0, 0, 0]),
+        ("Ward 3", [1, 1, 0, 0, 0, 0, 0, 0]),
+    ]
+
+
+def test_week_grid_and_location_filter(book):
+    book(at(9, day=MONDAY + timedelta(days=2)))
+    book(at(9), location="Clinic B")
+
+    grid = occupancy(MONDAY, 7, locations=["Clinic A", "Room 101"])
+    assert grid.locations() == ["Clinic A", "Room 101"]
+    days = grid.as_dict()["days"]
+    assert [day["date"] for day in days] == [(MONDAY + timedelta(days=i)).isoformat() for i in range(7)]
+    assert days[2]["locations"]["Clinic A"][0] == 1
+    assert sum(sum(cells) for day in days for cells in day["locations"].values()) == 1
+
+
+def test_calendar_page_and_json(signed_in, book):
+    book(at(9), minutes=30)
+    book(at(9, 15))
+
+    rv = signed_in.get("/appointments/calendar/", {"date": "2030-01-09", "view": "week", "format": "json"})
+    data = rv.json()
+    assert data["start"] == MONDAY.isoformat()
+    assert data["slot_minutes"] == 15
+    assert data["days"][0]["locations"] == {"Clinic A": [1, 2, 0, 0, 0, 0, 0, 0]}
+
+    rv = signed_in.get("/appointments/calendar/", {"date": "2030-01-07"})
+    assert rv.status_code == 200
+    assert "ETag" in rv
+    content = rv.content.decode()
+    assert '<th scope="row">Clinic A</th><td class="booked"></td><td class="clash">2</td><td></td>' in content
+    assert "?date=2030-01-06&amp;view=day" in content
+    assert "?date=2030-01-08&amp;view=day" in content
+
+
+def test_calendar_for_today_is_re_rendered_the_next_day(signed_in, book, settings, monkeypatch):
+    settings.CONDITIONAL_GET_WINDOW = 60
+    now = time.time()
+    monkeypatch.setattr(conditional, "time", SimpleNamespace(time=lambda: now))
+    first = signed_in.get("/appointments/calendar/")
+    assert signed_in.get("/appointments/calendar/", HTTP_IF_NONE_MATCH=first["ETag"]).status_code == 304
+
+    now += 24 * 60 * 60
+    assert signed_in.get("/appointments/calendar/", HTTP_IF_NONE_MATCH=first["ETag"]).status_code == 200
+
+
+def test_calendar_rejects_bad_queries_and_anonymous_users(client, signed_in, db):
+    assert signed_in.get("/appointments/calendar/", {"view": "month"}).status_code == 400
+    client.logout()
+    assert client.get("/appointments/calendar/").status_code == 302
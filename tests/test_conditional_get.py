@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from tracker.models import Appointment, Patient, Service, TableVersion
+
+
+@pytest.fixture(autouse=True)
+def _wide_window(settings):
+    # Keep the dashboard and patient list out of a window rollover mid-test.
+    settings.CONDITIONAL_GET_WINDOW = 10**9
+
+
+@pytest.mark.parametrize("path", ["/", "/patients/", "/appointments/"])
+def test_unchanged_pages_answer_not_modified(signed_in, appointment, path, django_assert_num_queries):
+    first = signed_in.get(path)
+    assert first.status_code == 200
+    assert first["ETag"].startswith('W/"')
+    assert "Last-Modified" in first
+    assert "private" in first["Cache-Control"] and "no-cache" in first["Cache-Control"]
+
+    with django_assert_num_queries(3):  # session, user and table versions
+        again = signed_in.get(path, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert again.status_code == 304
+    assert again.content == b""
+    assert signed_in.get(path, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]).status_code == 304
+
+
+def test_writes_change_the_validators(signed_in, appointment, django_capture_on_commit_callbacks):
+    first = signed_in.get("/appointments/")
+    appointment.status = "completed"
+    with django_capture_on_commit_callbacks(execute=True):
+        appointment.save()
+    again = signed_in.get("/appointments/", HTTP_IF_NONE_MATCH=first["ETag"])
+    assert again.status_code == 200
+    assert again["ETag"] != first["ETag"]
+
+    first = signed_in.get("/patients/")
+    with django_capture_on_commit_callbacks(execute=True):
+        Service.objects.create(name="Dermatology")
+    assert signed_in.get("/patients/", HTTP_IF_NONE_MATCH=first["ETag"]).status_code == 304
+    with django_capture_on_commit_callbacks(execute=True):
+        Patient.objects.filter(pk=appointment.patient_id).delete()
+    assert signed_in.get("/patients/", HTTP_IF_NONE_MATCH=first["ETag"]).status_code == 200
+
+
+def test_cascades_bump_each_table_once_on_commit(appointment, django_capture_on_commit_callbacks):
+    for days in range(3, 6):
+        Appointment.objects.create(
+            patient=appointment.patient,
+            service=appointment.service,
+            scheduled_for=appointment.scheduled_for + timedelta(days=days),
+            location="Room 101",
+        )
+    with CaptureQueriesContext(connection) as queries:
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            appointment.patient.delete()
+            assert not TableVersion.objects.filter(table="patient", version__gt=0).exists()
+    assert callbacks
+    bumps = [query["sql"] for query in queries if query["sql"].startswith("UPDATE") and "tableversion" in query["sql"]]
+    assert sum("'patient'" in sql for sql in bumps) == 1
+    assert sum("'appointment'" in sql for sql in bumps) == 1
+
+
+def test_validators_differ_per_user_and_query(signed_in, appointment):
+    first = signed_in.get("/appointments/")
+    assert signed_in.get("/appointments/", {"status": "scheduled"}, HTTP_IF_NONE_MATCH=first["ETag"]).status_code == 200
+
+    nurse = User.objects.create_user(username="nurse@example.nhs.uk", password="ChangeMe123!")
+    other = Client()
+    other.force_login(nurse)
+    # Last-Modified has one-second resolution; a real second sign-in is never that close.
+    User.objects.filter(pk=nurse.pk).update(last_login=datetime.now(timezone.utc) + timedelta(seconds=2))
+    response = other.get(
+        "/appointments/", HTTP_IF_NONE_MATCH=first["ETag"], HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]
+    )
+    assert response.status_code == 200
+    assert other.get("/appointments/", HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]).status_code == 200
+
+
+def test_pending_messages_are_never_answered_from_cache(signed_in, appointment):
+    signed_in.post(f"/appointments/{appointment.pk}/delete/")
+
+    # "*" matches any current ETag, so only a page without validators is re-rendered.
+    response = signed_in.get("/appointments/", HTTP_IF_NONE_MATCH="*")
+    assert response.status_code == 200
+    assert b"Appointment deleted." in response.content
+    assert "ETag" not in response
+    assert signed_in.get("/appointments/", HTTP_IF_NONE_MATCH="*").status_code == 304
+
+
+def test_conditional_get_can_be_disabled(signed_in, appointment, settings):
+    settings.CONDITIONAL_GET = False
+    response = signed_in.get("/appointments/")
+    assert "ETag" not in response
@@ -0,0 +1,67 @@
+from datetime import date, timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from tracker.counters import patient_counts
+from tracker.models import Appointment, AppointmentDayCounter, Patient, PatientCounter, Service
+
+
+def _patient(nhs_number, **kwargs):
+    return Patient.objects.create(
+        nhs_number=nhs_number,
+        first_name="Pat",
+        last_name="Counter",
+        date_of_birth=date(1975, 6, 1),
+        **kwargs,
+    )
+
+
+@pytest.mark.django_db
+def test_patient_counters_follow_create_edit_delete():
+    first = _patient("9430000101", status="active", priority="high")
+    _patient("9430000102", status="active", priority="low")
+    assert patient_counts() == {
+        "status": {"active": 2},
+        "priority": {"low": 1, "high": 1},
+    }
+
+    first.status = "discharged"
+    first.save()
+    assert patient_counts()["status"] == {"active": 1, "discharged": 1}
+
+    first.delete()
+    assert patient_counts() == {"status": {"active": 1}, "priority": {"low": 1}}
+
+
+@pytest.mark.django_db
+def test_appointment_day_counters_follow_reschedule():
+    patient = _patient("9430000103")
+    service = Service.objects.create(name="Dermatology")
+    when = timezone.now().replace(hour=10, minute=0) + timedelta(days=2)
+    appointment = Appointment.objects.create(
+        patient=patient, service=service, scheduled_for=when, location="Clinic A"
+    )
+    day = timezone.localdate(when)
+    assert AppointmentDayCounter.objects.get(day=day, status="scheduled").count == 1
+
+    appointment.scheduled_for = when + timedelta(days=1)
+    appointment.status = "cancelled"
+    appointment.save()
+    assert AppointmentDayCounter.objects.get(day=day, status="scheduled").count == 0
+    assert AppointmentDayCounter.objects.get(day=day + timedelta(days=1), status="cancelled").count == 1
+
+    patient.delete()
+    assert not AppointmentDayCounter.objects.filter(count__gt=0).exists()
+
+
+@pytest.mark.django_db
+def test_rebuild_counters_repairs_drift():
+    _patient("9430000104", status="inactive", priority="urgent")
+    PatientCounter.objects.filter(field="status").update(count=7)
+    PatientCounter.objects.create(field="status", value="deceased", count=3)
+
+    call_command("rebuild_counters")
+
+    assert patient_counts() == {"status": {"inactive": 1}, "priority": {"urgent": 1}}
@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from tracker import stats
+from tracker.models import Appointment, Patient, Service
+
+
+@pytest.fixture()
+def clinic(db):
+    service = Service.objects.create(name="Cardiology")
+    patients = [
+        Patient.objects.create(
+            nhs_number=f"94300000{i:02d}",
+            first_name="Pat",
+            last_name=f"Test{i}",
+            date_of_birth=date(1980, 1, 1),
+            status=status,
+            priority=priority,
+        )
+        for i, (status, priority) in enumerate(
+            [("active", "urgent"), ("active", "high"), ("inactive", "low"), ("discharged", "high")]
+        )
+    ]
+    Appointment.objects.create(
+        patient=patients[0],
+        service=service,
+        scheduled_for=timezone.now() + timedelta(hours=1),
+        location="Clinic A",
+    )
+    Appointment.objects.create(
+        patient=patients[1],
+        service=service,
+        scheduled_for=timezone.now() + timedelta(days=3),
+        location="Clinic B",
+    )
+    return patients
+
+
+def test_dashboard_stats_figures(clinic):
+    result = stats.compute_dashboard_stats()
+    assert result["total_patients"] == 4
+    assert result["active_patients"] == 2
+    assert result["high_priority_patients"] == 2
+    assert result["urgent_patients"] == 1
+    assert result["total_services"] == 1
+    assert result["total_appointments"] == 2
+    assert result["this_week_appointments"] == 2
+    assert result["status_stats"] == {"active": 2, "inactive": 1, "discharged": 1}
+    assert "deceased" not in result["status_stats"]
+
+
+def test_dashboard_stats_cached_and_invalidated(clinic):
+    stats.reset_cache_info()
+    stats.dashboard_stats()
+    with CaptureQueriesContext(connection) as ctx:
+        cached = stats.dashboard_stats()
+    assert len(ctx.captured_queries) == 0
+    assert stats.cache_info() == {"hits": 1, "misses": 1}
+
+    clinic[2].status = "active"
+    clinic[2].save()
+    assert stats.dashboard_stats()["active_patients"] == cached["active_patients"] + 1
+    assert stats.cache_info() == {"hits": 1, "misses": 2}
+
+
+def test_dashboard_view(client, user, clinic):
+    assert client.login(username=user.username, password="ChangeMe123!")
+    rv = client.get("/")
+    assert rv.status_code == 200
+    assert rv.context["total_patients"] == 4
@@ -0,0 +1,136 @@
+import csv
+import gzip
+import io
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from tracker.exports import APPOINTMENT_FIELDS, PATIENT_FIELDS
+from tracker.models import Appointment, Patient, Service
+
+
+@pytest.fixture()
+def records(db):
+    service = Service.objects.create(name="Radiology")
+    patients = [
+        Patient.objects.create(
+            nhs_number=nhs_number, first_name=first, last_name=last, date_of_birth=date(1980, 1, 1)
+        )
+        for nhs_number, first, last in [
+            ("9430000401", "Ada", "Lovelace"),
+            ("9430000402", "Alan", "Turing"),
+        ]
+    ]
+    start = timezone.make_aware(datetime(2030, 6, 1, 9, 0))
+    appointments = [
+        Appointment.objects.create(
+            patient=patients[day % 2],
+            service=service,
+            scheduled_for=start + timedelta(days=day),
+            location="Clinic A",
+            status="scheduled" if day < 3 else "completed",
+        )
+        for day in range(5)
+    ]
+    return patients, appointments
+
+
+def _body(response):
+    return b"".join(response.streaming_content)
+
+
+def test_patient_export_csv_respects_search(signed_in, records):
+    rv = signed_in.get("/patients/export/", {"q": "lov"})
+    assert rv.streaming
+    assert rv["Content-Type"] == "text/csv"
+    assert rv["Content-Disposition"].startswith('attachment; filename="patients-')
+    rows = list(csv.reader(io.StringIO(_body(rv).decode())))
+    assert rows[0] == list(PATIENT_FIELDS)
+    assert [row[0] for row in rows[1:]] == ["9430000401"]
+
+
+@pytest.mark.parametrize("query", ["asthma", "9434765919"])
+def test_patient_export_matches_the_list_search(signed_in, records, query):
+    Patient.objects.create(
+        nhs_number="943 476 5919",
+        first_name="Gwen",
+        last_name="Morgan",
+        date_of_birth=date(1966, 2, 14),
+        medical_notes="Asthma review",
+    )
+    listed = signed_in.get("/patients/", {"q": query})
+    assert [patient.nhs_number for patient in listed.context["page"]] == ["943 476 5919"]
+
+    rows = list(csv.reader(io.StringIO(_body(signed_in.get("/patients/export/", {"q": query})).decode())))
+    assert [row[0] for row in rows[1:]] == ["943 476 5919"]
+
+
+def test_appointment_export_ndjson_gzip_uses_list_filters(signed_in, records, settings):
+    settings.STREAM_CHUNK_SIZE = 2
+    _, appointments = records
+    rv = signed_in.get(
+        "/appointments/export/",
+        {"status": "scheduled", "date_from": "2030-06-02", "format": "ndjson", "gzip": "1"},
+    )
+    assert rv["Content-Type"] == "application/gzip"
+    assert rv["Content-Disposition"].endswith('.ndjson.gz"')
+    lines = [json.loads(line) for line in gzip.decompress(_body(rv)).decode().splitlines()]
+    assert [line["id"] for line in lines] == [appointments[1].pk, appointments[2].pk]
+    assert set(lines[0]) == set(APPOINTMENT_FIELDS)
+    assert lines[0]["patient__nhs_number"] == "9430000402"
+    assert datetime.fromisoformat(lines[0]["scheduled_for"]) == appointments[1].scheduled_for
+    assert lines[0]["duration_minutes"] == appointments[1].duration_minutes
+
+
+def test_export_rejects_bad_format_and_filters(signed_in, records):
+    assert signed_in.get("/patients/export/", {"format": "xml"}).status_code == 400
+    rv = signed_in.get("/appointments/export/", {"date_from": "2030-06-05", "date_to": "2030-06-01"})
+    assert rv.status_code == 400
+
+
+def test_export_streams_in_constant_queries(signed_in, records, django_assert_max_num_queries):
+    patients, _ = records
+    service = Service.objects.get()
+    Appointment.objects.bulk_create(
+        Appointment(
+            patient=patients[0],
+            service=service,
+            scheduled_for=timezone.make_aware(datetime(2031, 1, 1, 9, 0)) + timedelta(minutes=15 * i),
+            location="Clinic B",
+        )
+        for i in range(200)
+    )
+    with django_assert_max_num_queries(5):
+        rv = signed_in.get("/appointments/export/")
+        body = _body(rv)
+    assert body.count(b"\n") == 206
+
+
+def test_export_records_command_writes_file(records, tmp_path):
+    target = tmp_path / "appointments.csv.gz"
+    call_command("export_records", "appointments", "--status", "completed", "--gzip", "--output", str(target))
+    rows = list(csv.reader(io.StringIO(gzip.decompress(target.read_bytes()).decode())))
+    assert rows[0] == list(APPOINTMENT_FIELDS)
+    status = APPOINTMENT_FIELDS.index("status")
+    assert [row[status] for row in rows[1:]] == ["completed", "completed"]
+
+
+def test_exported_appointments_import_again(records, tmp_path):
+    _, appointments = records
+    Appointment.objects.filter(pk=appointments[0].pk).update(duration_minutes=45)
+    target = tmp_path / "appointments.csv"
+    call_command("export_records", "appointments", "--output", str(target))
+    Appointment.objects.all().delete()
+
+    out = io.StringIO()
+    call_command("import_records", "appointments", str(target), stdout=out)
+
+    assert "5 created, 0 updated, 0 rejected" in out.getvalue()
+    imported = Appointment.objects.order_by("scheduled_for")
+    assert [a.duration_minutes for a in imported] == [45, 15, 15, 15, 15]
+    assert [(a.patient_id, a.scheduled_for, a.status) for a in imported] == [
+        (a.patient_id, a.scheduled_for, a.status) for a in appointments
+    ]
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta, timezone
+
+from django.core.cache import caches
+
+from tracker.models import Appointment, Patient, Service
+
+
+def test_patient_rows_are_served_from_the_cache_until_the_patient_is_saved(signed_in, appointment):
+    patient = appointment.patient
+    assert b"Ada Lovelace" in signed_in.get("/patients/").content
+
+    # A queryset update bypasses save(), so updated_at and the cached row are unchanged.
+    Patient.objects.filter(pk=patient.pk).update(first_name="Augusta")
+    assert b"Ada Lovelace" in signed_in.get("/patients/").content
+
+    patient.refresh_from_db()
+    patient.save()
+    assert b"Augusta Lovelace" in signed_in.get("/patients/").content
+
+
+def test_patient_rows_follow_appointment_changes(signed_in, appointment):
+    assert b"<td>1</td>" in signed_in.get("/patients/").content
+
+    Appointment.objects.create(
+        patient=appointment.patient,
+        service=appointment.service,
+        scheduled_for=datetime.now(timezone.utc) + timedelta(days=1),
+        location="Room 102",
+    )
+    content = signed_in.get("/patients/").content
+    assert b"<td>2</td>" in content
+    detail = signed_in.get(f"/patients/{appointment.patient.pk}/").content
+    assert b"Total Appointments: 2" in detail and b"Room 102" in detail
+
+
+def test_appointment_rows_are_keyed_on_what_they_render(signed_in, appointment):
+    assert b"<td>Scheduled</td>" in signed_in.get("/appointments/").content
+
+    # Nothing is invalidated, so writes that skip the signals (and edits made by
+    # other workers) show up on the next request too.
+    Appointment.objects.filter(pk=appointment.pk).update(status="completed")
+    assert b"<td>Completed</td>" in signed_in.get("/appointments/").content
+
+    Service.objects.filter(pk=appointment.service_id).update(name="Cardiac Clinic")
+    assert b"Cardiac Clinic" in signed_in.get("/appointments/").content
+    streamed = signed_in.get("/appointments/", {"stream": "1"})
+    assert b"Cardiac Clinic" in b"".join(streamed.streaming_content)
+
+
+def test_file_backed_fragment_cache(signed_in, appointment, settings, tmp_path):
+    settings.CACHES = {
+        **settings.CACHES,
+        "fragments": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path),
+        },
+    }
+    first = signed_in.get("/appointments/").content
+    assert any(tmp_path.iterdir())
+    assert signed_in.get("/appointments/").content == first
+    caches["fragments"].clear()
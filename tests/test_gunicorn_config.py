@@ -0,0 +1,39 @@
+import gc
+import runpy
+from pathlib import Path
+from types import SimpleNamespace
+
+CONFIG = str(Path(__file__).resolve().parent.parent / "gunicorn.conf.py")
+
+
+def test_worker_settings_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv("GUNICORN_THREADS", "4")
+    monkeypatch.setenv("GUNICORN_MAX_REQUESTS_JITTER", "50")
+    monkeypatch.setenv("GUNICORN_PRELOAD", "0")
+
+    config = runpy.run_path(CONFIG)
+
+    assert "workers" not in config  # gunicorn reads WEB_CONCURRENCY itself
+    assert config["threads"] == 4
+    assert (config["max_requests"], config["max_requests_jitter"]) == (1000, 50)
+    assert config["preload_app"] is False
+    assert config["wsgi_app"] == "nhs_service_tracker.wsgi:application"
+    assert gc.isenabled()
+
+
+def test_preloaded_master_freezes_objects_before_forking(monkeypatch):
+    monkeypatch.delenv("GUNICORN_PRELOAD", raising=False)
+    server = SimpleNamespace(cfg=SimpleNamespace(preload_app=True))
+    try:
+        config = runpy.run_path(CONFIG)
+        assert config["preload_app"] is True
+        assert not gc.isenabled()
+
+        config["when_ready"](server)
+        assert gc.get_freeze_count() > 0
+
+        config["post_fork"](server, None)
+        assert gc.isenabled()
+    finally:
+        gc.unfreeze()
+        gc.enable()
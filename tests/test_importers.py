@@ -0,0 +1,113 @@
+import json
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+
+from tracker.counters import patient_counts, rebuild_counters
+from tracker.models import Appointment, Patient, Service
+from tracker.search import search_patients
+
+PATIENTS_CSV = """nhs_number,first_name,last_name,date_of_birth,status,priority,medical_notes
+9434765919,Gwen,Morgan,1966-02-14,active,high,Asthma review
+9434765870,Idris,Lloyd,1955-09-30,inactive,low,
+9434765919,Gwen,Morgan-Hughes,1966-02-14,discharged,medium,Asthma review
+,No,Number,1970-01-01,active,low,
+9434765862,Bad,Date,not-a-date,active,low,
+"""
+
+
+@pytest.mark.django_db
+def test_import_patients_upserts_and_rejects(tmp_path):
+    Patient.objects.create(
+        nhs_number="9434765870",
+        first_name="Idris",
+        last_name="Lloyd",
+        date_of_birth=date(1955, 9, 30),
+        status="active",
+    )
+    source = tmp_path / "patients.csv"
+    source.write_text(PATIENTS_CSV)
+
+    call_command("import_records", "patients", str(source), batch_size=2)
+
+    assert Patient.objects.count() == 2
+    gwen = Patient.objects.get(nhs_number="9434765919")
+    assert gwen.last_name == "Morgan-Hughes"
+    assert gwen.status == "discharged"
+    assert Patient.objects.get(nhs_number="9434765870").status == "inactive"
+    assert patient_counts()["status"] == {"inactive": 1, "discharged": 1}
+    assert rebuild_counters() == {"patient": 0, "appointment": 0}
+    assert search_patients("hughes") == [gwen]
+
+    rejects = (tmp_path / "patients.csv.rejects.csv").read_text().splitlines()
+    assert len(rejects) == 3
+    assert rejects[1].startswith("5,") and "nhs_number" in rejects[1]
+    assert "date_of_birth" in rejects[2]
+
+
+@pytest.mark.django_db
+def test_import_patients_rejects_duplicates_in_a_batch_and_touches_updated_at(tmp_path):
+    existing = Patient.objects.create(
+        nhs_number="9434765870", first_name="Idris", last_name="Lloyd", date_of_birth=date(1955, 9, 30)
+    )
+    source = tmp_path / "patients.csv"
+    source.write_text(PATIENTS_CSV)
+    out = StringIO()
+
+    call_command("import_records", "patients", str(source), stdout=out)
+
+    assert "1 created, 1 updated, 3 rejected" in out.getvalue()
+    assert Patient.objects.get(nhs_number="9434765919").last_name == "Morgan-Hughes"
+    assert Patient.objects.get(pk=existing.pk).updated_at > existing.updated_at
+    rejects = (tmp_path / "patients.csv.rejects.csv").read_text().splitlines()
+    assert rejects[1].startswith("2,") and "Replaced by line 4" in rejects[1]
+
+
+@pytest.mark.django_db
+def test_import_appointments_resolves_lookups(tmp_path):
+    Service.objects.create(name="Cardiology")
+    Patient.objects.create(
+        nhs_number="9434765919", first_name="Gwen", last_name="Morgan", date_of_birth=date(1966, 2, 14)
+    )
+    rows = [
+        {"nhs_number": "9434765919", "service": "cardiology", "scheduled_for": "2030-03-01 09:00",
+         "duration_minutes": 45, "location": "Clinic A", "status": "scheduled"},
+        {"nhs_number": "0000000000", "service": "Cardiology", "scheduled_for": "2030-03-01 10:00",
+         "location": "Clinic A", "status": "scheduled"},
+        {"nhs_number": "9434765919", "service": "Podiatry", "scheduled_for": "2030-03-01 11:00",
+         "location": "Clinic A", "status": "scheduled"},
+    ]
+    source = tmp_path / "appointments.ndjson"
+    source.write_text("\n".join(json.dumps(row) for row in rows) + "\n{broken\n")
+
+    call_command("import_records", "appointments", str(source))
+
+    appointment = Appointment.objects.get()
+    assert appointment.service.name == "Cardiology"
+    assert appointment.duration_minutes == 45
+    assert rebuild_counters() == {"patient": 0, "appointment": 0}
+    rejects = {
+        reject["line"]: reject["errors"]
+        for reject in map(json.loads, (tmp_path / "appointments.ndjson.rejects.ndjson").open())
+    }
+    assert sorted(rejects) == [2, 3, 4]
+    assert "Unknown patient" in rejects[2]
+    assert "Unknown service" in rejects[3]
+    assert "Invalid JSON" in rejects[4]
+
+
+@pytest.mark.django_db
+def test_admin_import_upload(client):
+    admin = User.objects.create_superuser("root@example.nhs.uk", "root@example.nhs.uk", "ChangeMe123!")
+    client.force_login(admin)
+    assert b"/admin/tracker/patient/import/" in client.get("/admin/tracker/patient/").content
+
+    upload = SimpleUploadedFile("patients.csv", PATIENTS_CSV.encode())
+    rv = client.post("/admin/tracker/patient/import/", {"file": upload})
+
+    assert rv["Content-Disposition"] == 'attachment; filename="patients-rejects.csv"'
+    assert Patient.objects.count() == 2
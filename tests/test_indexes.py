@@ -0,0 +1,23 @@
+from datetime import date
+
+import pytest
+from django.core.management import call_command
+
+from tracker.management.commands.check_indexes import _full_scans
+from tracker.models import Patient
+
+
+@pytest.mark.django_db
+def test_check_indexes_passes_for_view_queries():
+    Patient.objects.create(
+        nhs_number="9430000401", first_name="Ian", last_name="Index", date_of_birth=date(1960, 1, 1)
+    )
+    call_command("check_indexes")
+
+
+@pytest.mark.django_db
+def test_full_scan_detected_for_unindexed_filter():
+    assert _full_scans("SELECT id FROM tracker_appointment WHERE notes = 'x'", set()) == [
+        "tracker_appointment"
+    ]
+    assert _full_scans("SELECT id FROM tracker_patient WHERE status = 'active'", set()) == []
@@ -0,0 +1,99 @@
+import runpy
+from datetime import date, datetime, timezone
+
+import pytest
+
+from tracker.models import Appointment, Patient, Service
+
+
+@pytest.fixture()
+def patients(db):
+    return [
+        Patient.objects.create(
+            nhs_number=f"94300005{i:02d}", first_name=first, last_name=last, date_of_birth=date(1975, 1, 1)
+        )
+        for i, (first, last) in enumerate(
+            [("Sam", "Smith"), ("Ann", "Smithers"), ("Bea", "Jones"), ("Cal", "Smythe")]
+        )
+    ]
+
+
+def test_lookup_requires_login(client, db):
+    rv = client.get("/lookup/patients/", {"q": "smi"})
+    assert rv.status_code == 302
+
+
+def test_patient_lookup_prefix_and_limit(signed_in, patients, settings):
+    rv = signed_in.get("/lookup/patients/", {"q": "SMI"})
+    assert rv.json() == {
+        "results": [
+            {"id": patients[0].pk, "label": "Smith, Sam (9430000500)"},
+            {"id": patients[1].pk, "label": "Smithers, Ann (9430000501)"},
+        ]
+    }
+    settings.LOOKUP_LIMIT = 1
+    rv = signed_in.get("/lookup/patients/", {"q": "sm", "limit": "50"})
+    assert [r["id"] for r in rv.json()["results"]] == [patients[0].pk]
+    assert signed_in.get("/lookup/patients/").json() == {"results": []}
+
+
+def test_service_lookup_lists_services(signed_in, db):
+    radiology = Service.objects.create(name="Radiology")
+    Service.objects.create(name="Cardiology")
+    assert signed_in.get("/lookup/services/", {"q": "rad"}).json() == {
+        "results": [{"id": radiology.pk, "label": "Radiology"}]
+    }
+    assert len(signed_in.get("/lookup/services/").json()["results"]) == 2
+
+
+def test_lookup_is_cached_until_patients_change(signed_in, patients, django_assert_num_queries):
+    signed_in.get("/lookup/patients/", {"q": "jon"})
+    with django_assert_num_queries(2):  # session and user; the results are cached
+        rv = signed_in.get("/lookup/patients/", {"q": "jon"})
+    assert len(rv.json()["results"]) == 1
+
+    Patient.objects.create(
+        nhs_number="9430000599", first_name="Dee", last_name="Jonas", date_of_birth=date(1990, 1, 1)
+    )
+    rv = signed_in.get("/lookup/patients/", {"q": "jon"})
+    assert len(rv.json()["results"]) == 2
+
+
+def test_appointment_form_uses_autocomplete(signed_in, patients):
+    service = Service.objects.create(name="Radiology")
+    rv = signed_in.get("/appointments/add/")
+    assert b'<select name="patient"' not in rv.content
+    assert b'data-autocomplete-url="/lookup/patients/"' in rv.content
+    assert b"Smithers" not in rv.content
+
+    appointment = Appointment.objects.create(
+        patient=patients[1], service=service, scheduled_for=datetime(2030, 1, 1, 9, tzinfo=timezone.utc), location="Clinic A"
+    )
+    rv = signed_in.get(f"/appointments/{appointment.pk}/edit/")
+    assert b'value="Smithers, Ann (9430000501)"' in rv.content
+    assert b"Jones" not in rv.content
+
+
+def test_appointment_form_rejects_unknown_patient(signed_in, patients):
+    service = Service.objects.create(name="Radiology")
+    rv = signed_in.post(
+        "/appointments/add/",
+        {
+            "patient": "999999",
+            "service": service.pk,
+            "scheduled_for": "2030-01-01T09:00",
+            "location": "Clinic A",
+            "status": "scheduled",
+        },
+    )
+    assert rv.status_code == 200
+    assert "patient" in rv.context["form"].errors
+    assert not Appointment.objects.exists()
+
+
+def test_default_cache_can_be_shared_between_workers(monkeypatch, tmp_path):
+    monkeypatch.setenv("DEFAULT_CACHE_BACKEND", "file")
+    monkeypatch.setenv("DEFAULT_CACHE_LOCATION", str(tmp_path))
+    default = runpy.run_module("nhs_service_tracker.settings")["CACHES"]["default"]
+    assert default["BACKEND"] == "django.core.cache.backends.filebased.FileBasedCache"
+    assert default["LOCATION"] == str(tmp_path)
@@ -0,0 +1,97 @@
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse
+from django.urls import ResolverMatch
+
+from tracker.metrics import fingerprint, reset_metrics, snapshot
+from tracker.middleware import QueryMetricsMiddleware
+from tracker.models import Service
+
+
+@pytest.fixture(autouse=True)
+def _fresh_metrics():
+    reset_metrics()
+    yield
+    reset_metrics()
+
+
+def test_requests_are_recorded_per_view(signed_in):
+    Service.objects.create(name="Radiology")
+    reset_metrics()
+    signed_in.get("/services/")
+    signed_in.get("/services/")
+    signed_in.get("/no-such-page/")
+
+    stats = snapshot()
+    assert stats["services_list"]["count"] == 2
+    assert stats["services_list"]["queries"] == 6  # session, user and services, twice
+    assert stats["services_list"]["db_seconds"] > 0
+    assert sum(stats["services_list"]["buckets"]) == 2
+    assert stats["<unmatched>"]["count"] == 1
+
+
+def test_async_views_record_queries(rf, db):
+    async def view(request):
+        await Service.objects.acount()
+        return HttpResponse()
+
+    request = rf.get("/probe/")
+    request.resolver_match = ResolverMatch(view, (), {}, url_name="probe")
+    async_to_sync(QueryMetricsMiddleware(view))(request)
+    assert snapshot()["probe"]["queries"] == 1
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_is_staff_only(client, user, settings):
+    assert client.get("/metrics/").status_code == 403
+    client.force_login(user)
+    assert client.get("/metrics/").status_code == 403
+
+    user.is_staff = True
+    user.save()
+    rv = client.get("/metrics/")
+    assert rv.status_code == 200
+    assert rv["Content-Type"].startswith("text/plain; version=0.0.4")
+    body = rv.content.decode()
+    assert "# TYPE tracker_request_duration_seconds histogram" in body
+    assert 'tracker_request_duration_seconds_bucket{view="metrics",le="+Inf"} 2' in body
+
+    client.logout()
+    settings.METRICS_TOKEN = "scrape-me"
+    assert client.get("/metrics/", HTTP_AUTHORIZATION="Bearer wrong").status_code == 403
+    assert client.get("/metrics/", HTTP_AUTHORIZATION="Bearer scrape-me").status_code == 200
+
+
+def test_cache_hits_and_misses_are_exported(signed_in, settings):
+    settings.METRICS_TOKEN = "scrape-me"
+    signed_in.get("/")
+    signed_in.get("/")
+    signed_in.get("/lookup/patients/", {"q": "ada"})
+
+    body = signed_in.get("/metrics/", HTTP_AUTHORIZATION="Bearer scrape-me").content.decode()
+    assert "# TYPE tracker_cache_requests_total counter" in body
+    assert 'tracker_cache_requests_total{cache="dashboard",result="hit"} 1' in body
+    assert 'tracker_cache_requests_total{cache="dashboard",result="miss"} 1' in body
+    assert 'tracker_cache_requests_total{cache="lookups",result="miss"} 1' in body
+
+
+def test_slow_requests_log_sql_fingerprints(signed_in, settings, caplog):
+    settings.SLOW_REQUEST_MS = 0
+    logger = logging.getLogger("tracker.slow_requests")
+    logger.addHandler(caplog.handler)
+    try:
+        signed_in.get("/services/")
+    finally:
+        logger.removeHandler(caplog.handler)
+    message = caplog.records[-1].getMessage()
+    assert message.startswith("GET /services/ view=services_list")
+    assert 'FROM "tracker_service"' in message
+
+
+def test_fingerprint_normalises_values():
+    first, normalised = fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = \'x\'  LIMIT 21')
+    second, _ = fingerprint("SELECT * FROM t WHERE id IN (%s, %s) AND name = 'y' LIMIT 5")
+    assert first == second
+    assert normalised == "SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?"
@@ -32,3 +32,42 @@ def test_appointment_relations():
     )
     assert a.patient.last_name == "Smith"
     assert a.service.name == "Cardiology"
+
+
+@pytest.mark.django_db
+def test_appointment_summary_annotations_match_properties(django_assert_num_queries):
+    s = Service.objects.create(name="Neurology")
+    p = Patient.objects.create(
+        nhs_number="1234567892",
+        first_name="Nia",
+        last_name="Jones",
+        date_of_birth=timezone.datetime(1979, 4, 4).date(),
+    )
+    now = timezone.now()
+    Appointment.objects.create(
+        patient=p, service=s, scheduled_for=now - timezone.timedelta(days=2), location="Ward 3"
+    )
+    Appointment.objects.create(
+        patient=p, service=s, scheduled_for=now + timezone.timedelta(days=5), location="Clinic B"
+    )
+    soonest = Appointment.objects.create(
+        patient=p, service=s, scheduled_for=now + timezone.timedelta(days=1), location="Clinic A"
+    )
+    Patient.objects.create(
+        nhs_number="1234567893",
+        first_name="Owen",
+        last_name="Price",
+        date_of_birth=timezone.datetime(1982, 8, 8).date(),
+    )
+
+    with django_assert_num_queries(1):
+        annotated = {patient.pk: patient for patient in Patient.objects.with_appointment_summary()}
+        summary = [
+            (patient.total_appointments, patient.next_appointment and patient.next_appointment.pk)
+            for patient in annotated.values()
+        ]
+
+    assert sorted(summary, key=str) == sorted([(3, soonest.pk), (0, None)], key=str)
+    assert annotated[p.pk].next_appointment.location == "Clinic A"
+    assert p.next_appointment == soonest
+    assert p.total_appointments == 3
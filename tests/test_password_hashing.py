@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.middleware import SessionMiddleware
+
+from tracker import views
+from tracker.hashers import TunedPBKDF2PasswordHasher
+
+CREDENTIALS = {"username": "Admin@Example.nhs.uk", "password": "ChangeMe123!"}
+
+
+@pytest.fixture()
+def verified(monkeypatch):
+    threads = []
+    verify = TunedPBKDF2PasswordHasher.verify
+
+    def counting(self, password, encoded):
+        threads.append(threading.current_thread().name)
+        return verify(self, password, encoded)
+
+    monkeypatch.setattr(TunedPBKDF2PasswordHasher, "verify", counting)
+    return threads
+
+
+def test_login_hashes_password_once(client, user, verified):
+    assert client.post("/login/", data=CREDENTIALS).status_code == 302
+    assert len(verified) == 1
+
+
+def test_login_rehashes_when_cost_changes(client, settings, db):
+    settings.PASSWORD_PBKDF2_ITERATIONS = 1000
+    user = User.objects.create_user(username="admin@example.nhs.uk", password="ChangeMe123!")
+    assert user.password.startswith("pbkdf2_sha256$1000$")
+
+    settings.PASSWORD_PBKDF2_ITERATIONS = 2000
+    assert client.post("/login/", data=CREDENTIALS).status_code == 302
+    user.refresh_from_db()
+    assert user.password.startswith("pbkdf2_sha256$2000$")
+
+
+def test_login_rehashes_with_preferred_algorithm(client, settings, db):
+    settings.PASSWORD_PBKDF2_ITERATIONS = 1000
+    user = User.objects.create_user(username="admin@example.nhs.uk", password="ChangeMe123!")
+
+    settings.PASSWORD_HASHERS = [
+        "tracker.hashers.TunedScryptPasswordHasher",
+        "tracker.hashers.TunedPBKDF2PasswordHasher",
+    ]
+    settings.PASSWORD_SCRYPT_WORK_FACTOR = 2**10
+    assert client.post("/login/", data=CREDENTIALS).status_code == 302
+    user.refresh_from_db()
+    assert user.password.startswith("scrypt$1024$")
+    assert user.check_password("ChangeMe123!")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_login_verifies_on_auth_pool(user, rf, verified):
+    request = rf.post("/login/", data=CREDENTIALS)
+    SessionMiddleware(lambda r: None).process_request(request)
+    request._messages = FallbackStorage(request)
+    request.user = AnonymousUser()
+
+    async def auser():
+        return request.user
+
+    request.auser = auser
+    response = async_to_sync(views.login_view_async)(request)
+    assert response.status_code == 302
+    assert request.session["_auth_user_id"] == str(user.pk)
+    assert len(verified) == 1
+    assert verified[0].startswith("auth-hash")
@@ -0,0 +1,99 @@
+from datetime import date
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from tracker.models import Patient
+from tracker.search import get_search_backend, search_patients
+
+
+@pytest.fixture()
+def patients(db):
+    names = [("Alice", "Brown"), ("Bob", "Brown"), ("Cara", "Adams"), ("Dan", "O'Neil"), ("Eve", "browning")]
+    return [
+        Patient.objects.create(
+            nhs_number=f"94300002{i:02d}",
+            first_name=first,
+            last_name=last,
+            date_of_birth=date(1990, 1, 1),
+        )
+        for i, (first, last) in enumerate(names)
+    ]
+
+
+def test_matching_uses_normalised_prefixes(patients):
+    assert set(Patient.objects.matching("BROWN")) == {patients[0], patients[1], patients[4]}
+    assert list(Patient.objects.matching("alice brown")) == [patients[0]]
+    assert list(Patient.objects.matching("9430000203")) == [patients[3]]
+    assert not Patient.objects.matching("rown").exists()
+
+
+def test_patients_list_keyset_pages(client, user, patients, settings):
+    settings.LIST_PAGE_SIZE = 2
+    assert client.login(username=user.username, password="ChangeMe123!")
+
+    seen = []
+    url = "/patients/"
+    while url:
+        rv = client.get(url)
+        page = rv.context["page"]
+        seen.extend(patient.last_name for patient in page)
+        url = f"/patients/?cursor={page.next_cursor}" if page.has_next else None
+
+    assert seen == ["Adams", "Brown", "Brown", "O'Neil", "browning"]
+
+
+def test_patients_list_ignores_bad_cursor(client, user, patients):
+    assert client.login(username=user.username, password="ChangeMe123!")
+    rv = client.get("/patients/?cursor=not-a-cursor")
+    assert rv.status_code == 200
+    assert len(rv.context["page"]) == len(patients)
+
+
+def test_full_text_search_ranks_names_above_notes(patients):
+    assert get_search_backend().name == "fts5"
+    noted = patients[2]
+    noted.medical_notes = "Referred by Dr Brown for follow-up"
+    noted.save()
+
+    results = search_patients("brown")
+    assert results[-1] == noted
+    assert set(results[:-1]) == {patients[0], patients[1], patients[4]}
+    assert search_patients("follow") == [noted]
+    assert search_patients("alice bro") == [patients[0]]
+
+
+def test_full_text_index_tracks_edits_and_deletes(patients):
+    patient = patients[3]
+    patient.last_name = "Okafor"
+    patient.save()
+    assert search_patients("oneil") == []
+    assert search_patients("okaf") == [patient]
+
+    patient.delete()
+    assert search_patients("okafor") == []
+
+
+def test_rebuild_search_index(patients):
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM tracker_patient_fts")
+    assert search_patients("adams") == []
+
+    call_command("rebuild_search_index")
+    assert search_patients("adams") == [patients[2]]
+
+
+def test_search_says_when_results_are_cut_off(client, user, patients, settings):
+    assert client.login(username=user.username, password="ChangeMe123!")
+    settings.PATIENT_SEARCH_LIMIT = 2
+    rv = client.get("/patients/", {"q": "brown"})
+    assert len(rv.context["page"]) == 2
+    assert rv.context["truncated"]
+    assert b"Showing the 2 best matches" in rv.content
+
+    settings.PATIENT_SEARCH_LIMIT = 3
+    rv = client.get("/patients/", {"q": "brown"})
+    assert len(rv.context["page"]) == 3
+    assert not rv.context["truncated"]
+    assert b"best matches" not in rv.content
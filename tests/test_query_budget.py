@@ -0,0 +1,180 @@
+from datetime import date, timedelta
+
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+import tracker.urls
+from tracker.metrics import fingerprint
+from tracker.models import Appointment, Patient, Service
+from tracker.search import get_search_backend
+
+N = 3
+
+# GET requests for every named view in tracker.urls. Path kwargs are built from
+# the records created by the first seed, which the larger seed leaves in place.
+VIEW_REQUESTS = {
+    "dashboard": {},
+    "login": {"anonymous": True},
+    "register": {"anonymous": True},
+    "logout": {},
+    "patients_list": {},
+    "patients_create": {},
+    "patients_export": {},
+    "patients_detail": {"kwargs": lambda target: {"pk": target["patient"].pk}},
+    "patients_edit": {"kwargs": lambda target: {"pk": target["patient"].pk}},
+    "patients_delete": {"kwargs": lambda target: {"pk": target["patient"].pk}},
+    "services_list": {},
+    "services_create": {},
+    "services_edit": {"kwargs": lambda target: {"pk": target["service"].pk}},
+    "services_delete": {"kwargs": lambda target: {"pk": target["service"].pk}},
+    "appointments_list": {},
+    "appointments_create": {},
+    "appointments_export": {},
+    "appointments_calendar": {"params": {"view": "week"}},
+    "appointments_availability": {"params": {"location": "Clinic A", "patient": "{patient}", "days": "7"}},
+    "appointments_edit": {"kwargs": lambda target: {"pk": target["appointment"].pk}},
+    "appointments_delete": {"kwargs": lambda target: {"pk": target["appointment"].pk}},
+    "lookup_patients": {"params": {"q": "budget"}},
+    "lookup_services": {},
+    "metrics": {},
+}
+
+# Extra variants of views whose query plan depends on the parameters.
+EXTRA_REQUESTS = [
+    ("patients_list", {"params": {"q": "budget"}}),
+    ("patients_export", {"params": {"q": "budget"}}),
+    ("appointments_list", {"params": {"status": "scheduled", "date_from": "2000-01-01"}}),
+    ("appointments_list", {"params": {"stream": "1"}}),
+    ("appointments_list", {"params": {"patient": "{patient}"}}),
+    ("appointments_export", {"params": {"format": "ndjson", "status": "scheduled"}}),
+]
+
+
+def seed(count, offset, target=None):
+    services = Service.objects.bulk_create(
+        Service(name=f"Budget service {offset + i}") for i in range(count)
+    )
+    patients = []
+    for i in range(count):
+        patient = Patient(
+            nhs_number=f"{9000000000 + offset + i}",
+            first_name=f"Patient{offset + i}",
+            last_name="Budget",
+            date_of_birth=date(1970, 1, 1),
+        )
+        patient.refresh_search_keys()
+        patients.append(patient)
+    patients = Patient.objects.bulk_create(patients)
+    target = target or {"patient": patients[0], "service": services[0]}
+    now = timezone.now()
+    appointments = []
+    for i, patient in enumerate(patients):
+        for owner in (patient, target["patient"]):
+            appointments.append(
+                Appointment(
+                    patient=owner,
+                    service=services[i],
+                    scheduled_for=now + timedelta(days=i + 1, hours=len(appointments)),
+                    location="Clinic A",
+                    status="scheduled" if i % 2 else "completed",
+                )
+            )
+        appointments.append(
+            Appointment(
+                patient=patient,
+                service=target["service"],
+                scheduled_for=now - timedelta(days=i + 1),
+                location="Clinic B",
+                status="completed",
+            )
+        )
+    appointments = Appointment.objects.bulk_create(appointments)
+    target.setdefault("appointment", appointments[0])
+    get_search_backend().rebuild()
+    return target
+
+
+def _request(client, name, spec, target):
+    kwargs = spec.get("kwargs", lambda target: {})(target)
+    params = {
+        key: value.format(patient=target["patient"].pk) for key, value in spec.get("params", {}).items()
+    }
+    for cache in caches.all():
+        cache.clear()
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(reverse(name, kwargs=kwargs), params)
+        if response.streaming:
+            b"".join(response.streaming_content)
+    assert response.status_code in (200, 302), f"{name} returned {response.status_code}"
+    return [query["sql"] for query in captured.captured_queries]
+
+
+def _describe(queries):
+    counts = {}
+    for sql in queries:
+        key, normalised = fingerprint(sql)
+        counts.setdefault(key, [normalised, 0])[1] += 1
+    return "\n".join(
+        f"  x{count} {normalised}" for normalised, count in sorted(counts.values(), key=lambda item: -item[1])
+    )
+
+
+@pytest.fixture()
+def staff(user):
+    user.is_staff = True
+    user.save()
+    return user
+
+
+@pytest.fixture()
+def clients(client, staff):
+    client.force_login(staff)
+    return {False: client, True: Client()}
+
+
+@pytest.fixture()
+def budget_settings(settings):
+    # Render every row so that per-row queries scale with the data.
+    settings.LIST_PAGE_SIZE = 10_000
+    settings.PATIENT_SEARCH_LIMIT = 10_000
+    settings.LOOKUP_LIMIT = 10_000
+    return settings
+
+
+def test_every_tracker_view_has_a_budget_check():
+    names = {pattern.name for pattern in tracker.urls.urlpatterns}
+    assert names == set(VIEW_REQUESTS)
+
+
+def test_query_counts_do_not_grow_with_data(clients, budget_settings):
+    requests = list(VIEW_REQUESTS.items()) + EXTRA_REQUESTS
+    target = seed(N, offset=0)
+    small = {
+        index: _request(clients[spec.get("anonymous", False)], name, spec, target)
+        for index, (name, spec) in enumerate(requests)
+        if name != "logout"
+    }
+    seed(9 * N, offset=N, target=target)
+
+    failures = []
+    for index, (name, spec) in enumerate(requests):
+        if name == "logout":
+            continue
+        large = _request(clients[spec.get("anonymous", False)], name, spec, target)
+        if len(large) != len(small[index]):
+            failures.append(
+                f"{name} {spec.get('params', {})}: {len(small[index])} queries with {N} rows, "
+                f"{len(large)} with {10 * N}\n{_describe(large)}"
+            )
+    assert not failures, "Query count grows with the data:\n" + "\n\n".join(failures)
+
+
+def test_logout_query_budget(clients, budget_settings, django_assert_max_num_queries):
+    seed(N, offset=0)
+    with django_assert_max_num_queries(4):
+        clients[False].get("/logout/")
@@ -0,0 +1,42 @@
+import random
+
+import pytest
+from django.core.management import call_command
+
+from tracker.counters import rebuild_counters
+from tracker.models import Appointment, Patient
+from tracker.nhs import generate_nhs_numbers, is_valid_nhs_number
+from tracker.search import search_patients
+
+
+def test_nhs_number_checksum():
+    assert is_valid_nhs_number("943 476 5919")
+    assert not is_valid_nhs_number("9434765918")
+    assert not is_valid_nhs_number("12345")
+    numbers = generate_nhs_numbers(random.Random(3), 200, exclude={"9434765919"})
+    assert len(set(numbers)) == 200
+    assert all(is_valid_nhs_number(number) for number in numbers)
+
+
+@pytest.mark.django_db
+def test_seed_data_bulk_loads_consistent_rows():
+    call_command("seed_data", patients=40, appointments=300, days=30, seed=7, batch_size=64)
+
+    assert Patient.objects.count() == 40
+    assert Appointment.objects.count() == 300
+    assert all(is_valid_nhs_number(number) for number in Patient.objects.values_list("nhs_number", flat=True))
+    assert rebuild_counters() == {"patient": 0, "appointment": 0}
+
+    patient = Patient.objects.order_by("id").first()
+    assert patient.last_name_key == patient.last_name.casefold()
+    assert patient in search_patients(patient.nhs_number)
+
+
+@pytest.mark.django_db
+def test_seed_data_skips_populated_databases_unless_appending():
+    call_command("seed_data", patients=5, appointments=10, seed=1)
+    call_command("seed_data", patients=5, appointments=10, seed=2)
+    assert (Patient.objects.count(), Appointment.objects.count()) == (5, 10)
+
+    call_command("seed_data", patients=5, appointments=10, seed=2, append=True)
+    assert (Patient.objects.count(), Appointment.objects.count()) == (10, 20)
@@ -0,0 +1,75 @@
+import runpy
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.sessions.models import Session
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+
+def _session_queries(queries):
+    return [query["sql"] for query in queries if "django_session" in query["sql"]]
+
+
+def _settings(monkeypatch, **environ):
+    for name in ("DEBUG", "SESSION_BACKEND", "SESSION_CACHE_BACKEND"):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in environ.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_module("nhs_service_tracker.settings")
+
+
+def test_sessions_stay_in_the_database_without_a_shared_cache(monkeypatch):
+    config = _settings(monkeypatch)
+    assert config["SESSION_ENGINE"] == "django.contrib.sessions.backends.db"
+    assert config["CACHES"]["sessions"]["BACKEND"].endswith("LocMemCache")
+
+
+def test_cached_db_sessions_need_redis_outside_debug(monkeypatch):
+    with pytest.raises(ImproperlyConfigured, match="SESSION_CACHE_BACKEND=redis"):
+        _settings(monkeypatch, SESSION_BACKEND="cached_db", SESSION_CACHE_BACKEND="file")
+    config = _settings(monkeypatch, SESSION_BACKEND="cached_db", DEBUG="1")
+    assert config["SESSION_ENGINE"] == "django.contrib.sessions.backends.cached_db"
+
+
+def test_cached_sessions_and_messages_skip_the_session_table(client, user, settings):
+    settings.SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+    client.force_login(user)
+    with CaptureQueriesContext(connection) as queries:
+        client.get("/patients/")
+        response = client.post("/services/add/", {"name": "Radiology"}, follow=True)
+    assert b"Service created." in response.content
+    assert _session_queries(queries) == []
+
+
+def test_signed_cookie_sessions(client, user, settings):
+    settings.SESSION_ENGINE = "django.contrib.sessions.backends.signed_cookies"
+    client.force_login(user)
+    with CaptureQueriesContext(connection) as queries:
+        assert client.get("/patients/").status_code == 200
+    assert _session_queries(queries) == []
+    assert not Session.objects.exists()
+
+
+@pytest.mark.django_db
+def test_purge_sessions_deletes_expired_rows_in_batches():
+    now = timezone.now()
+    Session.objects.bulk_create(
+        [Session(session_key=f"expired{i:03d}", session_data="", expire_date=now - timedelta(days=1)) for i in range(5)]
+        + [Session(session_key="current", session_data="", expire_date=now + timedelta(days=1))]
+    )
+    out = StringIO()
+    call_command("purge_sessions", batch_size=2, stdout=out)
+    assert "Deleted 5 expired sessions in 3 batches" in out.getvalue()
+    assert list(Session.objects.values_list("session_key", flat=True)) == ["current"]
+
+
+def test_purge_sessions_with_cookie_sessions(settings):
+    settings.SESSION_ENGINE = "django.contrib.sessions.backends.signed_cookies"
+    out = StringIO()
+    call_command("purge_sessions", stdout=out)
+    assert "nothing to purge" in out.getvalue()
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.template import engines
+
+from tracker.warmup import template_names, warm_up
+
+
+def test_templates_use_the_cached_loader():
+    (loader, loaders), *_ = settings.TEMPLATES[0]["OPTIONS"]["loaders"]
+    assert loader == "django.template.loaders.cached.Loader"
+    assert "django.template.loaders.app_directories.Loader" in loaders
+
+
+def test_warm_up_compiles_every_project_template(caplog):
+    cached = engines["django"].engine.template_loaders[0]
+    cached.reset()
+
+    with caplog.at_level("INFO", logger="tracker.warmup"):
+        result = warm_up()
+
+    names = template_names()
+    assert {"base.html", "index.html", "patients/list.html", "appointments/_row.html"} <= set(names)
+    assert result["templates"] == len(names)
+    assert set(names) <= set(cached.get_template_cache)
+    assert "Worker warm-up" in caplog.text
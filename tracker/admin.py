@@ -1,12 +1,85 @@
-from django.contrib import admin
+import io
+
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from .forms import ImportRecordsForm
 from .models import Patient, Service, Appointment
 
 
+class ImportRecordsMixin:
+    import_kind = None
+    change_list_template = "admin/tracker/change_list_import.html"
+
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path(
+                "import/",
+                self.admin_site.admin_view(self.import_view),
+                name=f"{opts.app_label}_{opts.model_name}_import",
+            ),
+        ] + super().get_urls()
+
+    def import_view(self, request):
+        # Imported here so web workers only load the importers when an import is run.
+        from .importers import IMPORTERS, RejectWriter, detect_format, read_records
+
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        opts = self.model._meta
+        form = ImportRecordsForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            upload = form.cleaned_data["file"]
+            fmt = detect_format(upload.name)
+            rejects = io.StringIO()
+            importer = IMPORTERS[self.import_kind](rejects=RejectWriter(rejects, fmt))
+            source = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+            result = importer.run(read_records(source, fmt))
+            self.message_user(request, f"Imported {self.import_kind}: {result}.", messages.SUCCESS)
+            if result.rejected:
+                response = HttpResponse(rejects.getvalue(), content_type="text/plain; charset=utf-8")
+                response["Content-Disposition"] = f'attachment; filename="{self.import_kind}-rejects.{fmt}"'
+                return response
+            return redirect(f"admin:{opts.app_label}_{opts.model_name}_changelist")
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": opts,
+            "form": form,
+            "title": f"Import {opts.verbose_name_plural}",
+        }
+        return TemplateResponse(request, "admin/tracker/import_records.html", context)
+
+
 @admin.register(Patient)
-class PatientAdmin(admin.ModelAdmin):
-    list_display = ("nhs_number", "first_name", "last_name", "status", "priority")
+class PatientAdmin(ImportRecordsMixin, admin.ModelAdmin):
+    import_kind = "patients"
+    list_display = (
+        "nhs_number",
+        "first_name",
+        "last_name",
+        "status",
+        "priority",
+        "total_appointments",
+        "next_appointment_at",
+    )
     search_fields = ("nhs_number", "first_name", "last_name")
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_appointment_summary()
+
+    @admin.display(description="Appointments", ordering="appointment_count")
+    def total_appointments(self, obj):
+        return obj.total_appointments
+
+    @admin.display(description="Next appointment", ordering="next_appointment_at")
+    def next_appointment_at(self, obj):
+        return obj.next_appointment_at
+
 
 @admin.register(Service)
 class ServiceAdmin(admin.ModelAdmin):
@@ -15,6 +88,7 @@ class ServiceAdmin(admin.ModelAdmin):
 
 
 @admin.register(Appointment)
-class AppointmentAdmin(admin.ModelAdmin):
+class AppointmentAdmin(ImportRecordsMixin, admin.ModelAdmin):
+    import_kind = "appointments"
     list_display = ("patient", "service", "scheduled_for", "status")
     list_filter = ("status", "service")
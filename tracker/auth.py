@@ -0,0 +1,29 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor = None
+
+
+def auth_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.AUTH_HASH_WORKERS, thread_name_prefix="auth-hash")
+    return _executor
+
+
+def _call(func, args):
+    # Pool threads hold their own database connections, so recycle them the way
+    # the request cycle would.
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+
+async def run_in_auth_pool(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(auth_executor(), _call, func, args)
@@ -0,0 +1,134 @@
+from bisect import bisect_right
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Appointment, BookingLock
+
+Booking = namedtuple("Booking", "pk patient_id location start end")
+
+
+def clinic_hours():
+    try:
+        opens = time.fromisoformat(settings.CLINIC_OPENS)
+        closes = time.fromisoformat(settings.CLINIC_CLOSES)
+    except ValueError as exc:
+        raise ImproperlyConfigured(f"CLINIC_OPENS and CLINIC_CLOSES must be HH:MM times: {exc}") from exc
+    if opens >= closes:
+        raise ImproperlyConfigured("CLINIC_OPENS must be earlier than CLINIC_CLOSES.")
+    return opens, closes
+
+
+def at_local(day, moment):
+    return timezone.make_aware(datetime.combine(day, moment))
+
+
+def bookings(start, end, location=None, patient=None, exclude=None):
+    """Busy appointments overlapping [start, end) in ``location`` or for ``patient``."""
+    if not (location or patient):
+        raise ValueError("bookings() needs a location or a patient.")
+    owners = Q()
+    if location:
+        owners |= Q(location=location)
+    if patient:
+        owners |= Q(patient_id=patient)
+    # Durations are capped, so anything overlapping the window starts at most one
+    # maximum duration before it: a range over the (location, scheduled_for) and
+    # (patient, scheduled_for) indexes instead of a pass over the table.
+    lookback = timedelta(minutes=Appointment.MAX_DURATION_MINUTES)
+    rows = Appointment.objects.filter(
+        owners,
+        status__in=Appointment.BUSY_STATUSES,
+        scheduled_for__gte=start - lookback,
+        scheduled_for__lt=end,
+    )
+    if exclude:
+        rows = rows.exclude(pk=exclude)
+    found = []
+    for pk, patient_id, where, scheduled_for, minutes in rows.order_by("scheduled_for").values_list(
+        "pk", "patient_id", "location", "scheduled_for", "duration_minutes"
+    ):
+        ends = scheduled_for + timedelta(minutes=minutes)
+        if ends > start:
+            found.append(Booking(pk, patient_id, where, scheduled_for, ends))
+    return found
+
+
+def conflicts(start, duration, location, patient=None, exclude=None):
+    return bookings(start, start + timedelta(minutes=duration), location=location, patient=patient, exclude=exclude)
+
+
+def hold_booking_locks(location, patient=None):
+    """Lock ``location`` and ``patient`` for bookings until the current transaction ends."""
+    now = timezone.now()
+    keys = [f"location:{location}"] + ([f"patient:{patient}"] if patient else [])
+    # Always in the same order, so two bookings cannot each hold the other's lock.
+    for key in sorted(keys):
+        if BookingLock.objects.filter(key=key).update(updated_at=now):
+            continue
+        try:
+            with transaction.atomic():
+                BookingLock.objects.create(key=key, updated_at=now)
+        except IntegrityError:
+            BookingLock.objects.filter(key=key).update(updated_at=now)
+
+
+class Timeline:
+    # Busy time as sorted, merged [start, end) offsets in seconds from origin, so
+    # probing a candidate slot is a bisect rather than a pass over the bookings.
+    def __init__(self, origin, busy):
+        self.origin = origin
+        self.starts = []
+        self.ends = []
+        for start, end in sorted((self.offset(item.start), self.offset(item.end)) for item in busy):
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def offset(self, moment):
+        return int((moment - self.origin).total_seconds())
+
+    def moment(self, offset):
+        return timezone.localtime(self.origin + timedelta(seconds=offset))
+
+    def is_free(self, start, end):
+        index = bisect_right(self.starts, start) - 1
+        if index >= 0 and self.ends[index] > start:
+            return False
+        return index + 1 == len(self.starts) or self.starts[index + 1] >= end
+
+
+def free_slots(location, first_day, days=1, duration=15, patient=None, exclude=None, now=None):
+    """Return ``(day, [slot starts])`` for each day, on the slot grid within clinic hours."""
+    opens, closes = clinic_hours()
+    step = settings.APPOINTMENT_SLOT_MINUTES * 60
+    length = duration * 60
+    origin = at_local(first_day, time.min)
+    busy = bookings(
+        origin,
+        at_local(first_day + timedelta(days=days), time.min),
+        location=location,
+        patient=patient,
+        exclude=exclude,
+    )
+    timeline = Timeline(origin, busy)
+    earliest = timeline.offset(now or timezone.now())
+    result = []
+    for index in range(days):
+        day = first_day + timedelta(days=index)
+        start = timeline.offset(at_local(day, opens))
+        close = timeline.offset(at_local(day, closes))
+        slots = []
+        while start + length <= close:
+            if start >= earliest and timeline.is_free(start, start + length):
+                slots.append(timeline.moment(start))
+            start += step
+        result.append((day, slots))
+    return result
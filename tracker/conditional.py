@@ -0,0 +1,110 @@
+import hashlib
+import time
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from .deferred import on_commit_once
+from .models import TableVersion
+
+
+def bump_table_versions(*tables):
+    now = timezone.now()
+    for table in tables:
+        with transaction.atomic():
+            if TableVersion.objects.filter(table=table).update(version=F("version") + 1, updated_at=now):
+                continue
+            try:
+                with transaction.atomic():
+                    TableVersion.objects.create(table=table, version=1, updated_at=now)
+            except IntegrityError:
+                TableVersion.objects.filter(table=table).update(version=F("version") + 1, updated_at=now)
+
+
+def _bump_collected(tables):
+    bump_table_versions(*sorted(tables))
+
+
+def bump_table_versions_on_commit(*tables):
+    # Model signals fire once per row, and a cascade fires once per child; the
+    # shared version rows are updated once per table when the transaction commits.
+    on_commit_once(_bump_collected, tables)
+
+
+def page_validators(request, tables, clock=False):
+    # Pending messages are rendered into the page, so it must not be answered from cache.
+    if get_messages(request):
+        return None, None
+    rows = sorted(TableVersion.objects.filter(table__in=tables).values_list("table", "version", "updated_at"))
+    # The ETag covers the user and session so one browser never revalidates another
+    # account's copy; last_login plays the same part for If-Modified-Since.
+    session = getattr(request, "session", None)
+    parts = [request.user.pk, session and session.session_key, request.get_full_path(), rows]
+    stamps = [updated_at for _, _, updated_at in rows]
+    if request.user.last_login:
+        stamps.append(request.user.last_login)
+    if clock:
+        # Pages that depend on the current time are re-rendered at least once a window.
+        window = settings.CONDITIONAL_GET_WINDOW
+        started = int(time.time()) // window * window
+        parts.append(started)
+        stamps.append(datetime.fromtimestamp(started, tz=dt_timezone.utc))
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"', max(stamps) if stamps else None
+
+
+def _conditional_response(request, etag, last_modified):
+    return get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp()) if last_modified else None
+    )
+
+
+def _finish(request, response, etag, last_modified):
+    if request.method in ("GET", "HEAD"):
+        if etag:
+            response.headers.setdefault("ETag", etag)
+        if last_modified:
+            response.headers.setdefault("Last-Modified", http_date(last_modified.timestamp()))
+    # Browsers keep a private copy but must ask before reusing it.
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ("Cookie",))
+    return response
+
+
+def conditional_page(*tables, clock=False):
+    def decorator(view):
+        if iscoroutinefunction(view):
+
+            @wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                if not settings.CONDITIONAL_GET:
+                    return await view(request, *args, **kwargs)
+                etag, last_modified = await sync_to_async(page_validators)(request, tables, clock)
+                response = _conditional_response(request, etag, last_modified)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _finish(request, response, etag, last_modified)
+
+        else:
+
+            @wraps(view)
+            def wrapper(request, *args, **kwargs):
+                if not settings.CONDITIONAL_GET:
+                    return view(request, *args, **kwargs)
+                etag, last_modified = page_validators(request, tables, clock)
+                response = _conditional_response(request, etag, last_modified)
+                if response is None:
+                    response = view(request, *args, **kwargs)
+                return _finish(request, response, etag, last_modified)
+
+        return wrapper
+
+    return decorator
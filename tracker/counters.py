@@ -0,0 +1,159 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import Appointment, AppointmentDayCounter, Patient, PatientCounter
+
+PATIENT_COUNTER_FIELDS = ("status", "priority")
+
+
+def _adjust(model, delta, **lookup):
+    if not delta:
+        return
+    with transaction.atomic():
+        if model.objects.filter(**lookup).update(count=F("count") + delta):
+            return
+        try:
+            with transaction.atomic():
+                model.objects.create(count=delta, **lookup)
+        except IntegrityError:
+            model.objects.filter(**lookup).update(count=F("count") + delta)
+
+
+def patient_counter_values(patient):
+    return {field: getattr(patient, field) for field in PATIENT_COUNTER_FIELDS}
+
+
+def appointment_counter_key(appointment):
+    scheduled_for = appointment.scheduled_for
+    if timezone.is_aware(scheduled_for):
+        return (timezone.localdate(scheduled_for), appointment.status)
+    return (scheduled_for.date(), appointment.status)
+
+
+def update_patient_counters(old=None, new=None):
+    with transaction.atomic():
+        for field in PATIENT_COUNTER_FIELDS:
+            old_value = old[field] if old else None
+            new_value = new[field] if new else None
+            if old_value == new_value:
+                continue
+            if old_value is not None:
+                _adjust(PatientCounter, -1, field=field, value=old_value)
+            if new_value is not None:
+                _adjust(PatientCounter, 1, field=field, value=new_value)
+
+
+def update_appointment_counters(old=None, new=None):
+    if old == new:
+        return
+    with transaction.atomic():
+        if old is not None:
+            _adjust(AppointmentDayCounter, -1, day=old[0], status=old[1])
+        if new is not None:
+            _adjust(AppointmentDayCounter, 1, day=new[0], status=new[1])
+
+
+def apply_patient_deltas(deltas):
+    with transaction.atomic():
+        for (field, value), delta in deltas.items():
+            _adjust(PatientCounter, delta, field=field, value=value)
+
+
+def apply_appointment_deltas(deltas):
+    with transaction.atomic():
+        for (day, status), delta in deltas.items():
+            _adjust(AppointmentDayCounter, delta, day=day, status=status)
+
+
+def _appointment_totals(today, this_week):
+    return {
+        "total_appointments": Coalesce(Sum("count"), 0),
+        "today_appointments": Coalesce(Sum("count", filter=Q(day=today, status="scheduled")), 0),
+        "this_week_appointments": Coalesce(
+            Sum("count", filter=Q(day__gte=today, day__lte=this_week, status="scheduled")), 0
+        ),
+    }
+
+
+def appointment_counts(today, this_week):
+    return AppointmentDayCounter.objects.aggregate(**_appointment_totals(today, this_week))
+
+
+async def aappointment_counts(today, this_week):
+    return await AppointmentDayCounter.objects.aaggregate(**_appointment_totals(today, this_week))
+
+
+def _patient_counter_rows():
+    return PatientCounter.objects.filter(count__gt=0).values_list("field", "value", "count")
+
+
+def _group_patient_counts(rows):
+    rows = {(field, value): count for field, value, count in rows}
+    choices = {"status": Patient.STATUS_CHOICES, "priority": Patient.PRIORITY_CHOICES}
+    return {
+        field: {
+            value: rows[(field, value)]
+            for value, _ in choices[field]
+            if (field, value) in rows
+        }
+        for field in PATIENT_COUNTER_FIELDS
+    }
+
+
+def patient_counts():
+    return _group_patient_counts(_patient_counter_rows())
+
+
+async def apatient_counts():
+    return _group_patient_counts([row async for row in _patient_counter_rows()])
+
+
+def _expected_patient_counters():
+    expected = {}
+    for field in PATIENT_COUNTER_FIELDS:
+        for value, count in Patient.objects.values_list(field).annotate(count=Count("id")).order_by():
+            expected[(field, value)] = count
+    return expected
+
+
+def _expected_appointment_counters():
+    rows = (
+        Appointment.objects.annotate(day=TruncDate("scheduled_for"))
+        .values_list("day", "status")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    return {(day, status): count for day, status, count in rows}
+
+
+def _reconcile(model, key_fields, expected):
+    drift = 0
+    current = {
+        tuple(row[:-1]): (row[-1], pk)
+        for pk, *row in model.objects.values_list("pk", *key_fields, "count")
+    }
+    stale = [pk for key, (_, pk) in current.items() if key not in expected]
+    if stale:
+        drift += model.objects.filter(pk__in=stale).exclude(count=0).count()
+        model.objects.filter(pk__in=stale).delete()
+    missing = []
+    for key, count in expected.items():
+        if key not in current:
+            missing.append(model(count=count, **dict(zip(key_fields, key))))
+        elif current[key][0] != count:
+            model.objects.filter(pk=current[key][1]).update(count=count)
+            drift += 1
+    model.objects.bulk_create(missing, batch_size=1000)
+    return drift + len(missing)
+
+
+def rebuild_counters():
+    with transaction.atomic():
+        return {
+            "patient": _reconcile(PatientCounter, ("field", "value"), _expected_patient_counters()),
+            "appointment": _reconcile(
+                AppointmentDayCounter, ("day", "status"), _expected_appointment_counters()
+            ),
+        }
@@ -0,0 +1,17 @@
+from functools import wraps
+
+from django.contrib.auth.views import redirect_to_login
+
+
+def alogin_required(view):
+    # django.contrib.auth's login_required only wraps sync views before Django 5.1.
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        # Templates read request.user; resolving it here keeps that off the event loop.
+        request.user = user
+        return await view(request, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,22 @@
+from threading import local
+
+from django.db import transaction
+
+_state = local()
+
+
+def on_commit_once(flush, items):
+    """Collect ``items`` and hand everything collected to ``flush`` once, on commit.
+
+    Each call registers a callback, so items from a rolled-back transaction are
+    not lost for good; they ride along with the next commit instead.
+    """
+    queues = _state.__dict__.setdefault("queues", {})
+    queues.setdefault(flush, set()).update(items)
+    transaction.on_commit(lambda: _run(flush))
+
+
+def _run(flush):
+    items = _state.__dict__.get("queues", {}).pop(flush, None)
+    if items:
+        flush(items)
@@ -0,0 +1,86 @@
+import csv
+import json
+import zlib
+
+from .models import Appointment, Patient
+
+PATIENT_FIELDS = (
+    "nhs_number",
+    "first_name",
+    "last_name",
+    "date_of_birth",
+    "contact_phone",
+    "contact_email",
+    "status",
+    "priority",
+    "created_at",
+    "updated_at",
+)
+APPOINTMENT_FIELDS = (
+    "id",
+    "patient__nhs_number",
+    "patient__first_name",
+    "patient__last_name",
+    "service__name",
+    "scheduled_for",
+    "duration_minutes",
+    "location",
+    "status",
+    "notes",
+)
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+FLUSH_BYTES = 64 * 1024
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _plain(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def patient_rows(queryset=None):
+    queryset = Patient.objects.all() if queryset is None else queryset
+    return PATIENT_FIELDS, queryset.order_by("id").values_list(*PATIENT_FIELDS)
+
+
+def appointment_rows(queryset=None):
+    queryset = Appointment.objects.all() if queryset is None else queryset
+    return APPOINTMENT_FIELDS, queryset.order_by("scheduled_for", "id").values_list(*APPOINTMENT_FIELDS)
+
+
+def encode(header, rows, fmt, chunk_size=2000):
+    rows = rows.iterator(chunk_size=chunk_size)
+    buffer = []
+    size = 0
+    if fmt == "csv":
+        writer = csv.writer(_Echo())
+        buffer.append(writer.writerow(header))
+        lines = (writer.writerow([_plain(value) for value in row]) for row in rows)
+    else:
+        lines = (
+            json.dumps(dict(zip(header, map(_plain, row))), separators=(",", ":")) + "\n"
+            for row in rows
+        )
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= FLUSH_BYTES:
+            yield "".join(buffer).encode()
+            buffer = []
+            size = 0
+    yield "".join(buffer).encode()
+
+
+def gzip_stream(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -1,12 +1,25 @@
+from datetime import datetime, time, timedelta
+
 from django import forms
+from django.conf import settings
 from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import format_html
+
+from . import availability
+from .lookups import label_for
 from .models import Patient, Service, Appointment
 
 
 class LoginForm(AuthenticationForm):
     username = forms.EmailField(label="Email")
 
+    def clean_username(self):
+        return self.cleaned_data["username"].lower()
+
 
 class RegisterForm(UserCreationForm):
     email = forms.EmailField(label="Email")
@@ -51,6 +64,42 @@ class ServiceForm(forms.ModelForm):
         fields = ["name", "description"]
 
 
+class AutocompleteWidget(forms.Widget):
+    def __init__(self, kind, attrs=None):
+        super().__init__(attrs)
+        self.kind = kind
+
+    def id_for_label(self, id_):
+        return f"{id_}_search" if id_ else id_
+
+    def value_from_datadict(self, data, files, name):
+        return data.get(name)
+
+    def render(self, name, value, attrs=None, renderer=None):
+        attrs = self.build_attrs(self.attrs, attrs)
+        field_id = attrs.get("id", f"id_{name}")
+        value = self.format_value(value)
+        label = label_for(self.kind, value) if value and str(value).isdigit() else ""
+        return format_html(
+            '<span class="autocomplete">'
+            '<input type="hidden" name="{}" id="{}" value="{}">'
+            '<input type="search" id="{}_search" value="{}" autocomplete="off" role="combobox" '
+            'aria-autocomplete="list" aria-expanded="false" aria-controls="{}_results" '
+            'data-autocomplete-url="{}" data-autocomplete-target="{}" placeholder="Start typing to search">'
+            '<ul class="autocomplete-results" id="{}_results" role="listbox" hidden></ul>'
+            "</span>",
+            name,
+            field_id,
+            value or "",
+            field_id,
+            label,
+            field_id,
+            reverse(f"lookup_{self.kind}"),
+            field_id,
+            field_id,
+        )
+
+
 class AppointmentForm(forms.ModelForm):
     class Meta:
         model = Appointment
@@ -58,10 +107,167 @@ class AppointmentForm(forms.ModelForm):
             "patient",
             "service",
             "scheduled_for",
+            "duration_minutes",
             "location",
             "status",
             "notes",
         ]
         widgets = {
+            # Autocomplete keeps the full patient and service tables out of the page;
+            # ModelChoiceField still validates the submitted id with a single pk lookup.
+            "patient": AutocompleteWidget("patients"),
+            "service": AutocompleteWidget("services"),
             "scheduled_for": forms.DateTimeInput(attrs={"type": "datetime-local"}),
         }
+
+    # Imports replay history that may legitimately overlap, so they turn this off.
+    check_availability = True
+    BOOKING_FIELDS = {"patient", "scheduled_for", "duration_minutes", "location", "status"}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Clients that predate durations keep the instance's (default) duration.
+        if "duration_minutes" in self.fields:
+            self.fields["duration_minutes"].required = False
+
+    def clean_duration_minutes(self):
+        return self.cleaned_data["duration_minutes"] or self.instance.duration_minutes
+
+    def books_time(self):
+        data = self.cleaned_data
+        return (
+            self.check_availability
+            and data.get("scheduled_for")
+            and data.get("duration_minutes")
+            and data.get("location")
+            and data.get("status") in Appointment.BUSY_STATUSES
+            and (not self.instance.pk or self.BOOKING_FIELDS.intersection(self.changed_data))
+        )
+
+    def add_conflicts(self):
+        data = self.cleaned_data
+        location = data["location"]
+        patient = data.get("patient")
+        clashes = availability.conflicts(
+            data["scheduled_for"],
+            data["duration_minutes"],
+            location,
+            patient=patient and patient.pk,
+            exclude=self.instance.pk,
+        )
+        for booking in clashes:
+            when = f"{timezone.localtime(booking.start):%H:%M} to {timezone.localtime(booking.end):%H:%M}"
+            if booking.location == location:
+                self.add_error("location", f"{location} is already booked from {when}.")
+            if patient and booking.patient_id == patient.pk:
+                self.add_error("patient", f"The patient already has an appointment from {when}.")
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.books_time():
+            self.add_conflicts()
+        return cleaned_data
+
+    def save_booking(self):
+        """Save a valid form unless a clash was booked since it was cleaned; None if one was."""
+        with transaction.atomic():
+            if self.books_time():
+                # clean() checked outside any transaction. Concurrent bookings of
+                # the same location or patient queue on these locks, then look again.
+                patient = self.cleaned_data.get("patient")
+                availability.hold_booking_locks(self.cleaned_data["location"], patient and patient.pk)
+                self.add_conflicts()
+                if self.errors:
+                    return None
+            return self.save()
+
+
+class AvailabilityForm(forms.Form):
+    location = forms.CharField(max_length=120)
+    date = forms.DateField(required=False)
+    days = forms.IntegerField(required=False, min_value=1)
+    duration = forms.IntegerField(
+        required=False, min_value=5, max_value=Appointment.MAX_DURATION_MINUTES
+    )
+    patient = forms.IntegerField(required=False, min_value=1)
+    exclude = forms.IntegerField(required=False, min_value=1)
+
+    def clean_date(self):
+        return self.cleaned_data["date"] or timezone.localdate()
+
+    def clean_days(self):
+        days = self.cleaned_data["days"] or 1
+        if days > settings.AVAILABILITY_MAX_DAYS:
+            raise forms.ValidationError(f"Search at most {settings.AVAILABILITY_MAX_DAYS} days at a time.")
+        return days
+
+    def clean_duration(self):
+        return self.cleaned_data["duration"] or Appointment._meta.get_field("duration_minutes").default
+
+
+class CalendarForm(forms.Form):
+    VIEW_CHOICES = [("day", "Day"), ("week", "Week")]
+
+    date = forms.DateField(required=False, widget=forms.DateInput(attrs={"type": "date"}))
+    view = forms.ChoiceField(choices=VIEW_CHOICES, required=False)
+    location = forms.CharField(required=False, max_length=120)
+
+    def clean_date(self):
+        return self.cleaned_data["date"] or timezone.localdate()
+
+    def clean_view(self):
+        return self.cleaned_data["view"] or "day"
+
+    def window(self):
+        day = self.cleaned_data["date"]
+        if self.cleaned_data["view"] == "week":
+            return day - timedelta(days=day.weekday()), 7
+        return day, 1
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class AppointmentFilterForm(forms.Form):
+    date_from = forms.DateField(
+        label="From", required=False, widget=forms.DateInput(attrs={"type": "date"})
+    )
+    date_to = forms.DateField(
+        label="To", required=False, widget=forms.DateInput(attrs={"type": "date"})
+    )
+    status = forms.ChoiceField(
+        choices=[("", "Any status")] + Appointment.STATUS_CHOICES, required=False
+    )
+    service = forms.ModelChoiceField(
+        queryset=Service.objects.order_by("name"), required=False, empty_label="Any service"
+    )
+    patient = forms.IntegerField(required=False, min_value=1, widget=forms.HiddenInput)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from = cleaned_data.get("date_from")
+        date_to = cleaned_data.get("date_to")
+        if date_from and date_to and date_from > date_to:
+            raise forms.ValidationError("The start date must be on or before the end date.")
+        return cleaned_data
+
+    def filter_queryset(self, queryset):
+        data = self.cleaned_data
+        if data.get("date_from"):
+            queryset = queryset.filter(scheduled_for__gte=_start_of_day(data["date_from"]))
+        if data.get("date_to"):
+            queryset = queryset.filter(
+                scheduled_for__lt=_start_of_day(data["date_to"] + timedelta(days=1))
+            )
+        if data.get("status"):
+            queryset = queryset.filter(status=data["status"])
+        if data.get("service"):
+            queryset = queryset.filter(service=data["service"])
+        if data.get("patient"):
+            queryset = queryset.filter(patient_id=data["patient"])
+        return queryset
+
+
+class ImportRecordsForm(forms.Form):
+    file = forms.FileField(help_text="CSV or NDJSON (.ndjson/.jsonl) file.")
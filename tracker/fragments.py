@@ -0,0 +1,62 @@
+import hashlib
+
+from django.core.cache import caches
+from django.utils import timezone
+
+
+def fragment_cache():
+    return caches["fragments"]
+
+
+def _prepare(name, objects, parts):
+    # Keys are built only from the values each fragment renders, so an edit makes
+    # a new key in every worker at once; nothing has to be invalidated, and old
+    # fragments simply age out of the cache.
+    objects = list(objects)
+    if not objects:
+        return {}
+    for obj in objects:
+        digest = hashlib.md5(repr(parts(obj)).encode(), usedforsecurity=False).hexdigest()
+        obj.fragment_key = f"tracker:fragment:{name}:{digest}"
+    return fragment_cache().get_many([obj.fragment_key for obj in objects])
+
+
+def _summary(patient):
+    return (
+        patient.pk,
+        patient.updated_at,
+        patient.appointment_count,
+        patient.next_appointment_pk,
+        patient.next_appointment_at,
+    )
+
+
+def patient_rows(patients):
+    return _prepare("patient-row", patients, _summary)
+
+
+def patient_detail(patient):
+    # Age is derived from today's date, so the body is re-rendered daily.
+    return _prepare(
+        "patient-detail",
+        [patient],
+        lambda patient: (*_summary(patient), patient.next_appointment_location, timezone.localdate()),
+    )
+
+
+def appointment_rows(appointments):
+    return _prepare(
+        "appointment-row",
+        appointments,
+        lambda appointment: (
+            appointment.pk,
+            appointment.scheduled_for,
+            appointment.duration_minutes,
+            appointment.location,
+            appointment.status,
+            appointment.patient_id,
+            appointment.patient.updated_at,
+            appointment.service_id,
+            appointment.service.name,
+        ),
+    )
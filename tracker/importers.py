@@ -0,0 +1,242 @@
+import csv
+import json
+import time
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from .conditional import bump_table_versions
+from .counters import apply_appointment_deltas, apply_patient_deltas, appointment_counter_key
+from .forms import AppointmentForm, PatientForm
+from .lookups import invalidate_lookups
+from .models import Appointment, Patient, Service
+from .search import get_search_backend
+from .stats import invalidate_dashboard_stats
+
+FORMATS = ("csv", "ndjson")
+
+
+class PatientImportForm(PatientForm):
+    def validate_unique(self):
+        # Rows are upserted on nhs_number, so an existing number is not an error.
+        pass
+
+
+class AppointmentImportForm(AppointmentForm):
+    check_availability = False
+
+    class Meta(AppointmentForm.Meta):
+        fields = ["scheduled_for", "duration_minutes", "location", "status", "notes"]
+
+
+def detect_format(filename):
+    return "ndjson" if filename.lower().endswith((".ndjson", ".jsonl")) else "csv"
+
+
+def read_records(stream, fmt):
+    if fmt == "csv":
+        for line, row in enumerate(csv.DictReader(stream), start=2):
+            yield line, row
+        return
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError as exc:
+            yield line, {"_error": f"Invalid JSON: {exc}"}
+            continue
+        yield line, row if isinstance(row, dict) else {"_error": "Expected a JSON object"}
+
+
+class RejectWriter:
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.fmt = fmt
+        self.count = 0
+        self._csv = None
+
+    def write(self, line, row, errors):
+        self.count += 1
+        record = {"line": line, "errors": errors, **{k: v for k, v in row.items() if k != "_error"}}
+        if self.fmt == "ndjson":
+            self.stream.write(json.dumps(record, default=str) + "\n")
+            return
+        if self._csv is None:
+            self._csv = csv.DictWriter(self.stream, fieldnames=list(record), extrasaction="ignore")
+            self._csv.writeheader()
+        self._csv.writerow(record)
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.rejected = 0
+        self.elapsed = 0.0
+
+    @property
+    def rows(self):
+        return self.created + self.updated + self.rejected
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.created} created, {self.updated} updated, {self.rejected} rejected "
+            f"in {self.elapsed:.1f}s ({self.rows_per_second:.0f} rows/sec)"
+        )
+
+
+def _column(row, *names):
+    # Exports name the lookup columns after the query (patient__nhs_number,
+    # service__name), so an exported file can be imported again as it is.
+    for name in names:
+        if row.get(name):
+            return str(row[name]).strip()
+    return ""
+
+
+def _form_errors(form):
+    return "; ".join(
+        f"{field}: {' '.join(messages)}" if field != "__all__" else " ".join(messages)
+        for field, messages in form.errors.items()
+    )
+
+
+class BaseImporter:
+    form_class = None
+
+    def __init__(self, batch_size=1000, rejects=None):
+        self.batch_size = batch_size
+        self.rejects = rejects
+
+    def validate(self, row):
+        form = self.form_class(data=row)
+        form.is_valid()
+        return form
+
+    def reject(self, result, line, row, errors):
+        result.rejected += 1
+        if self.rejects is not None:
+            self.rejects.write(line, row, errors)
+
+    def run(self, records):
+        result = ImportResult()
+        started = time.perf_counter()
+        batch = []
+        for line, row in records:
+            if "_error" in row:
+                self.reject(result, line, row, row["_error"])
+                continue
+            batch.append((line, row))
+            if len(batch) >= self.batch_size:
+                self.import_batch(batch, result)
+                batch = []
+        if batch:
+            self.import_batch(batch, result)
+        invalidate_dashboard_stats()
+        invalidate_lookups("patients")
+        bump_table_versions("patient", "appointment")
+        result.elapsed = time.perf_counter() - started
+        return result
+
+
+class PatientImporter(BaseImporter):
+    form_class = PatientImportForm
+    update_fields = PatientForm.Meta.fields + ["first_name_key", "last_name_key", "updated_at"]
+
+    def import_batch(self, batch, result):
+        valid = {}
+        sources = {}
+        now = timezone.now()
+        for line, row in batch:
+            form = self.validate(row)
+            if form.errors:
+                self.reject(result, line, row, _form_errors(form))
+                continue
+            patient = form.save(commit=False)
+            patient.refresh_search_keys()
+            # bulk_create only writes update_fields on conflict, so auto_now is not enough.
+            patient.updated_at = now
+            if patient.nhs_number in sources:
+                earlier, earlier_row = sources[patient.nhs_number]
+                self.reject(result, earlier, earlier_row, f"nhs_number: Replaced by line {line} of the same batch.")
+            valid[patient.nhs_number] = patient
+            sources[patient.nhs_number] = line, row
+        if not valid:
+            return
+
+        with transaction.atomic():
+            existing = {
+                row["nhs_number"]: row
+                for row in Patient.objects.filter(nhs_number__in=valid).values("nhs_number", "status", "priority")
+            }
+            Patient.objects.bulk_create(
+                valid.values(),
+                update_conflicts=True,
+                unique_fields=["nhs_number"],
+                update_fields=self.update_fields,
+            )
+            ids = dict(Patient.objects.filter(nhs_number__in=valid).values_list("nhs_number", "id"))
+            deltas = Counter()
+            for nhs_number, patient in valid.items():
+                patient.pk = ids[nhs_number]
+                previous = existing.get(nhs_number)
+                for field in ("status", "priority"):
+                    if previous:
+                        deltas[field, previous[field]] -= 1
+                    deltas[field, getattr(patient, field)] += 1
+            apply_patient_deltas(deltas)
+            get_search_backend().index_many(valid.values())
+
+        result.updated += len(existing)
+        result.created += len(valid) - len(existing)
+
+
+class AppointmentImporter(BaseImporter):
+    form_class = AppointmentImportForm
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.services = {name.casefold(): pk for pk, name in Service.objects.values_list("id", "name")}
+
+    def import_batch(self, batch, result):
+        nhs_numbers = {_column(row, "nhs_number", "patient__nhs_number") for _, row in batch}
+        patients = dict(Patient.objects.filter(nhs_number__in=nhs_numbers).values_list("nhs_number", "id"))
+
+        appointments = []
+        deltas = Counter()
+        for line, row in batch:
+            patient_id = patients.get(_column(row, "nhs_number", "patient__nhs_number"))
+            service_id = self.services.get(_column(row, "service", "service__name").casefold())
+            errors = []
+            if patient_id is None:
+                errors.append("nhs_number: Unknown patient.")
+            if service_id is None:
+                errors.append("service: Unknown service.")
+            form = self.validate(row)
+            if form.errors:
+                errors.append(_form_errors(form))
+            if errors:
+                self.reject(result, line, row, "; ".join(errors))
+                continue
+            appointment = form.save(commit=False)
+            appointment.patient_id = patient_id
+            appointment.service_id = service_id
+            appointments.append(appointment)
+            deltas[appointment_counter_key(appointment)] += 1
+
+        with transaction.atomic():
+            Appointment.objects.bulk_create(appointments)
+            apply_appointment_deltas(deltas)
+        result.created += len(appointments)
+
+
+IMPORTERS = {
+    "patients": PatientImporter,
+    "appointments": AppointmentImporter,
+}
@@ -0,0 +1,76 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .metrics import record_cache
+from .models import Patient, Service, normalise_search_key
+
+LOOKUP_KINDS = ("patients", "services")
+
+
+def patient_label(first_name, last_name, nhs_number):
+    return f"{last_name}, {first_name} ({nhs_number})"
+
+
+def service_label(name):
+    return name
+
+
+def _patient_results(query, limit):
+    if not query:
+        return []
+    rows = (
+        Patient.objects.matching(query)
+        .order_by("last_name", "id")
+        .values_list("id", "first_name", "last_name", "nhs_number")[:limit]
+    )
+    return [{"id": pk, "label": patient_label(*fields)} for pk, *fields in rows]
+
+
+def _service_results(query, limit):
+    services = Service.objects.order_by("name", "id")
+    if query:
+        services = services.filter(name__istartswith=query)
+    return [{"id": pk, "label": service_label(name)} for pk, name in services.values_list("id", "name")[:limit]]
+
+
+RESULTS = {
+    "patients": _patient_results,
+    "services": _service_results,
+}
+
+
+def _version_key(kind):
+    return f"tracker:lookup-version:{kind}"
+
+
+def lookup_version(kind):
+    return cache.get_or_set(_version_key(kind), time.time_ns, None)
+
+
+def invalidate_lookups(kind):
+    # A fresh version orphans every cached result for the kind, which then expires on its own.
+    cache.set(_version_key(kind), time.time_ns(), None)
+
+
+def lookup(kind, query, limit=None):
+    limit = min(limit or settings.LOOKUP_LIMIT, settings.LOOKUP_LIMIT)
+    query = normalise_search_key(query)[:64]
+    digest = hashlib.md5(query.encode(), usedforsecurity=False).hexdigest()
+    key = f"tracker:lookup:{kind}:{lookup_version(kind)}:{limit}:{digest}"
+    results = cache.get(key)
+    record_cache("lookups", results is not None)
+    if results is None:
+        results = RESULTS[kind](query, limit)
+        cache.set(key, results, settings.LOOKUP_CACHE_TTL)
+    return results
+
+
+def label_for(kind, pk):
+    if kind == "patients":
+        row = Patient.objects.filter(pk=pk).values_list("first_name", "last_name", "nhs_number").first()
+        return patient_label(*row) if row else ""
+    name = Service.objects.filter(pk=pk).values_list("name", flat=True).first()
+    return service_label(name) if name else ""
@@ -0,0 +1,120 @@
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from tracker.lookups import LOOKUP_KINDS, invalidate_lookups
+from tracker.models import Patient
+from tracker.stats import invalidate_dashboard_stats
+
+# Lookup and summary tables that are small by design and may be read in full.
+ALLOWED_SCANS = {
+    "tracker_service",
+    "tracker_patientcounter",
+    "tracker_appointmentdaycounter",
+}
+
+SQLITE_SCAN_RE = re.compile(r"^SCAN (?P<table>\w+)(?P<rest>.*)$")
+POSTGRES_SCAN_RE = re.compile(r"Seq Scan on (?P<table>\w+)")
+
+
+def _view_requests():
+    today = timezone.localdate()
+    first_patient = Patient.objects.order_by("pk").values_list("pk", flat=True).first()
+    requests = [
+        ("dashboard", {}, {}),
+        ("patients_list", {}, {}),
+        ("patients_list", {}, {"q": "smith"}),
+        ("services_list", {}, {}),
+        ("appointments_list", {}, {}),
+        (
+            "appointments_list",
+            {},
+            {"date_from": today.isoformat(), "date_to": today.isoformat(), "status": "scheduled"},
+        ),
+        ("appointments_availability", {}, {"location": "Clinic A", "days": "7"}),
+        ("appointments_calendar", {}, {"view": "week"}),
+        ("lookup_patients", {}, {"q": "smi"}),
+        ("lookup_services", {}, {"q": "ra"}),
+    ]
+    if first_patient is not None:
+        requests.append(("patients_detail", {"pk": first_patient}, {}))
+        requests.append(
+            ("appointments_availability", {}, {"location": "Clinic A", "patient": str(first_patient)})
+        )
+    return requests
+
+
+def _full_scans(sql, allowed):
+    scans = []
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            for row in cursor.fetchall():
+                match = SQLITE_SCAN_RE.match(row[-1])
+                if match and "USING" not in match["rest"] and "VIRTUAL TABLE" not in match["rest"]:
+                    scans.append(match["table"])
+        else:
+            cursor.execute(f"EXPLAIN {sql}")
+            for (line,) in cursor.fetchall():
+                match = POSTGRES_SCAN_RE.search(line)
+                if match:
+                    scans.append(match["table"])
+    return [table for table in scans if table not in allowed]
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the queries issued by the read views and fail on full table scans."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--allow",
+            action="append",
+            default=[],
+            metavar="TABLE",
+            help="Additional table that may be scanned in full.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ("sqlite", "postgresql"):
+            raise CommandError(f"check_indexes does not support the {connection.vendor} backend.")
+        allowed = ALLOWED_SCANS | set(options["allow"])
+        factory = RequestFactory()
+        user = User(username="check-indexes", is_staff=True)
+        failures = []
+
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+            for name, kwargs, params in _view_requests():
+                invalidate_dashboard_stats()
+                for kind in LOOKUP_KINDS:
+                    invalidate_lookups(kind)
+                request = factory.get(reverse(name, kwargs=kwargs), params)
+                request.user = user
+                match = resolve(request.path_info)
+                with CaptureQueriesContext(connection) as captured:
+                    response = match.func(request, *match.args, **match.kwargs)
+                    if response.streaming:
+                        b"".join(response.streaming_content)
+                for query in captured.captured_queries:
+                    sql = query["sql"]
+                    if not sql.lstrip().upper().startswith("SELECT"):
+                        continue
+                    for table in _full_scans(sql, allowed):
+                        failures.append((name, table, sql))
+                    if options["verbosity"] >= 2:
+                        self.stdout.write(f"  {name}: {sql}", self.style.SQL_KEYWORD)
+            transaction.set_rollback(True)
+
+        if failures:
+            for name, table, sql in failures:
+                self.stderr.write(f"{name}: full scan of {table}\n    {sql}")
+            raise CommandError(f"{len(failures)} queries fall back to a full table scan.")
+        self.stdout.write(self.style.SUCCESS("All view queries use an index."))
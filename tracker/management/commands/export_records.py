@@ -0,0 +1,53 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker import exports
+from tracker.forms import AppointmentFilterForm
+from tracker.models import Appointment, Patient
+from tracker.search import filter_patients
+
+
+class Command(BaseCommand):
+    help = "Stream patients or appointments to CSV or NDJSON in constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=["patients", "appointments"])
+        parser.add_argument("--output", default="-", help="File to write, or - for stdout.")
+        parser.add_argument("--format", choices=sorted(exports.FORMATS), default="csv")
+        parser.add_argument("--gzip", action="store_true", help="Gzip-compress the output.")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows fetched per database round trip.")
+        parser.add_argument("--q", default="", help="Patient search, as on the patient list.")
+        parser.add_argument("--date-from", help="Appointments on or after this date (YYYY-MM-DD).")
+        parser.add_argument("--date-to", help="Appointments on or before this date (YYYY-MM-DD).")
+        parser.add_argument("--status", help="Appointment status.")
+        parser.add_argument("--service", help="Appointment service id.")
+        parser.add_argument("--patient", help="Appointment patient id.")
+
+    def handle(self, *args, **options):
+        if options["kind"] == "patients":
+            patients = filter_patients(options["q"]) if options["q"] else Patient.objects.all()
+            header, rows = exports.patient_rows(patients)
+        else:
+            filters = AppointmentFilterForm(
+                {
+                    name: options[name]
+                    for name in ("date_from", "date_to", "status", "service", "patient")
+                    if options[name]
+                }
+            )
+            if not filters.is_valid():
+                raise CommandError(f"Invalid filters: {filters.errors.as_text()}")
+            header, rows = exports.appointment_rows(filters.filter_queryset(Appointment.objects.all()))
+
+        chunks = exports.encode(header, rows, options["format"], chunk_size=options["chunk_size"])
+        if options["gzip"]:
+            chunks = exports.gzip_stream(chunks)
+
+        output = sys.stdout.buffer if options["output"] == "-" else open(options["output"], "wb")
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout.buffer:
+                output.close()
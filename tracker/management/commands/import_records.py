@@ -0,0 +1,38 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.importers import FORMATS, IMPORTERS, RejectWriter, detect_format, read_records
+
+
+class Command(BaseCommand):
+    help = "Bulk import patients or appointments from a CSV or NDJSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(IMPORTERS))
+        parser.add_argument("path", help="CSV or NDJSON file to import.")
+        parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows validated and written per batch.")
+        parser.add_argument("--rejects", help="Where to write rejected rows (default: <path>.rejects.<format>).")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.is_file():
+            raise CommandError(f"{path} does not exist.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+        fmt = options["format"] or detect_format(path.name)
+        rejects_path = Path(options["rejects"] or f"{path}.rejects.{fmt}")
+
+        with path.open(newline="", encoding="utf-8-sig") as source, rejects_path.open(
+            "w", newline="", encoding="utf-8"
+        ) as rejects_file:
+            rejects = RejectWriter(rejects_file, fmt)
+            importer = IMPORTERS[options["kind"]](batch_size=options["batch_size"], rejects=rejects)
+            result = importer.run(read_records(source, fmt))
+
+        if result.rejected:
+            self.stdout.write(self.style.WARNING(f"Rejected rows written to {rejects_path}."))
+        else:
+            rejects_path.unlink()
+        self.stdout.write(self.style.SUCCESS(f"Imported {options['kind']}: {result}."))
@@ -0,0 +1,41 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DatabaseSessionStore
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = "Delete expired sessions in small batches; run it from a scheduler."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000, help="Sessions deleted per statement.")
+        parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1 or options["pause"] < 0:
+            raise CommandError("--batch-size must be positive and --pause must not be negative.")
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not issubclass(store, DatabaseSessionStore):
+            self.stdout.write(f"{settings.SESSION_ENGINE} keeps no session rows; nothing to purge.")
+            return
+
+        # One DELETE over the whole expired range holds its locks for as long as
+        # it runs, so keys are fetched and deleted a batch at a time instead.
+        model = store.get_model_class()
+        expired = model.objects.filter(expire_date__lt=timezone.now()).values_list("session_key", flat=True)
+        deleted = batches = 0
+        started = time.perf_counter()
+        while keys := list(expired[: options["batch_size"]]):
+            deleted += model.objects.filter(session_key__in=keys).delete()[0]
+            batches += 1
+            if options["pause"]:
+                time.sleep(options["pause"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {deleted} expired sessions in {batches} batches "
+                f"({time.perf_counter() - started:.1f}s)."
+            )
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from tracker.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = "Recalculate the patient and appointment counter tables from source rows."
+
+    def handle(self, *args, **options):
+        drift = rebuild_counters()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Counters rebuilt: {drift['patient']} patient and "
+                f"{drift['appointment']} appointment counters corrected."
+            )
+        )
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from tracker.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the patient full-text search index from the patient table."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        indexed = backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {backend.name} search index ({indexed} patients)."))
@@ -0,0 +1,166 @@
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from benchmarks.load import run_load
+from benchmarks.scenarios import SCENARIOS, prepare_context
+from tracker.models import Appointment, Patient
+
+SCENARIO_NAMES = [scenario.name for scenario in SCENARIOS]
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _sizes(value):
+    try:
+        sizes = [int(size) for size in value.split(",") if size.strip()]
+    except ValueError:
+        raise CommandError("--sizes must be a comma-separated list of patient counts.")
+    if not sizes or min(sizes) < 1:
+        raise CommandError("--sizes must be a comma-separated list of patient counts.")
+    return sizes
+
+
+class Command(BaseCommand):
+    help = "Seed datasets at several sizes and load-test the tracker views in-process; prints JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="1000,10000", help="Comma-separated patient counts to seed.")
+        parser.add_argument(
+            "--appointments-per-patient", type=int, default=5, help="Appointments seeded per patient."
+        )
+        parser.add_argument("--threads", type=int, default=4, help="Concurrent in-process clients.")
+        parser.add_argument("--requests", type=int, default=200, help="Timed requests per scenario.")
+        parser.add_argument("--warmup", type=int, default=5, help="Untimed requests per client first.")
+        parser.add_argument(
+            "--scenario", action="append", choices=SCENARIO_NAMES, help="Run only these scenarios."
+        )
+        parser.add_argument("--seed", type=int, default=1, help="Random seed for data and request mix.")
+        parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+        parser.add_argument(
+            "--use-current-db",
+            action="store_true",
+            help="Seed into the configured database instead of a throwaway test database.",
+        )
+
+    def handle(self, *args, **options):
+        sizes = _sizes(options["sizes"])
+        if options["threads"] < 1 or options["requests"] < 1:
+            raise CommandError("--threads and --requests must be positive.")
+        scenarios = [s for s in SCENARIOS if not options["scenario"] or s.name in options["scenario"]]
+        report = {
+            "revision": _git_revision(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "cpu_count": os.cpu_count(),
+            "threads": options["threads"],
+            "requests": options["requests"],
+            "runs": [],
+        }
+        for size in sizes:
+            self.stderr.write(f"Benchmarking {size} patients...")
+            if options["use_current_db"]:
+                report["runs"].append(self._run(size, scenarios, options))
+            else:
+                report["runs"].append(self._run_isolated(size, scenarios, options))
+
+        payload = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                handle.write(payload + "\n")
+            self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        else:
+            self.stdout.write(payload)
+
+    def _run_isolated(self, size, scenarios, options):
+        old_name = connection.settings_dict["NAME"]
+        with tempfile.TemporaryDirectory() as directory:
+            if connection.vendor == "sqlite":
+                # A file rather than shared-cache memory, so each client thread gets a real connection.
+                connection.settings_dict["TEST"]["NAME"] = os.path.join(directory, "benchmark.sqlite3")
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                return self._run(size, scenarios, options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def _seed(self, size, options):
+        # With --use-current-db the database may already hold an earlier, smaller
+        # run (plus the patients its write scenarios added), so top it up to size.
+        patients = Patient.objects.count()
+        if patients > size:
+            raise CommandError(
+                f"The database already has {patients} patients, more than {size}; "
+                "list --sizes in ascending order or drop --use-current-db."
+            )
+        if patients < size:
+            call_command(
+                "seed_data",
+                patients=size - patients,
+                appointments=max(size * options["appointments_per_patient"] - Appointment.objects.count(), 0),
+                seed=options["seed"],
+                append=True,
+                stdout=io.StringIO(),
+            )
+        if Patient.objects.count() != size:
+            raise CommandError(f"Seeding left {Patient.objects.count()} patients instead of {size}.")
+        return Appointment.objects.count()
+
+    def _run(self, size, scenarios, options):
+        rng = random.Random(options["seed"])
+        started = time.perf_counter()
+        appointments = self._seed(size, options)
+        seed_seconds = time.perf_counter() - started
+        user, _ = User.objects.get_or_create(
+            username="benchmark@example.nhs.uk", defaults={"is_staff": True, "email": "benchmark@example.nhs.uk"}
+        )
+        context = prepare_context(rng, options["requests"])
+
+        results = {}
+        for scenario in scenarios:
+            scenario.setup(context)
+            results[scenario.name] = run_load(
+                scenario,
+                context,
+                user,
+                threads=options["threads"],
+                requests=options["requests"],
+                warmup=options["warmup"],
+                seed=options["seed"],
+            )
+            summary = results[scenario.name]
+            self.stderr.write(
+                f"  {scenario.name}: {summary['throughput_rps']} req/s, "
+                f"p50 {summary.get('p50_ms')}ms, p95 {summary.get('p95_ms')}ms, errors {summary['errors']}"
+            )
+        return {
+            "patients": size,
+            "appointments": appointments,
+            "seed_seconds": round(seed_seconds, 2),
+            "scenarios": results,
+        }
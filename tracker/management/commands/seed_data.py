@@ -1,100 +1,214 @@
-from django.core.management.base import BaseCommand
-from django.utils import timezone
-from tracker.models import Patient, Service, Appointment
-from datetime import datetime, timedelta
 import random
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from tracker.conditional import bump_table_versions
+from tracker.counters import apply_appointment_deltas, apply_patient_deltas
+from tracker.lookups import invalidate_lookups
+from tracker.models import Appointment, Patient, Service
+from tracker.nhs import generate_nhs_numbers
+from tracker.search import get_search_backend
+from tracker.stats import invalidate_dashboard_stats
+
+SERVICES = [
+    {"name": "General Practice", "description": "Primary care consultation with GP"},
+    {"name": "Cardiology", "description": "Heart and cardiovascular system specialist care"},
+    {"name": "Dermatology", "description": "Skin, hair, and nail conditions treatment"},
+    {"name": "Orthopedics", "description": "Bone, joint, and muscle disorders treatment"},
+    {"name": "Mental Health", "description": "Psychological and psychiatric care services"},
+    {"name": "Physiotherapy", "description": "Physical rehabilitation and movement therapy"},
+    {"name": "Radiology", "description": "Medical imaging and diagnostic scans"},
+    {"name": "Blood Tests", "description": "Laboratory testing and blood work"},
+    {"name": "Vaccination", "description": "Immunization and preventive care"},
+    {"name": "Diabetes Care", "description": "Diabetes management and monitoring"},
+    {"name": "Respiratory Care", "description": "Lung and breathing disorders treatment"},
+    {"name": "Ophthalmology", "description": "Eye care and vision services"},
+]
+
+FIRST_NAMES = [
+    "James", "Emily", "Michael", "Sarah", "David", "Emma", "Robert", "Lisa", "Christopher",
+    "Amanda", "Thomas", "Rachel", "Daniel", "Jennifer", "Matthew", "Aisha", "Mohammed", "Priya",
+    "Oliver", "Amelia", "Harry", "Isla", "Jack", "Ava", "Noah", "Mia", "Rhys", "Siobhan",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Davis", "Miller", "Wilson", "Moore",
+    "Taylor", "Anderson", "Thompson", "White", "Harris", "Clark", "Patel", "Khan", "Evans",
+    "Roberts", "Walker", "Wright", "Hughes", "Green", "Hall", "Wood", "O'Brien", "Singh",
+]
+LOCATIONS = ["Room 101", "Room 102", "Room 201", "Clinic A", "Clinic B", "Ward 3", "Radiology Dept", "Lab"]
+STATUSES = ["scheduled", "completed", "cancelled", "no-show"]
+PAST_WEIGHTS = [10, 80, 95, 100]
+FUTURE_WEIGHTS = [85, 90, 98, 100]
+
+
+def _batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert_rows(model, columns, rows):
+    # Appointments are written with executemany rather than bulk_create: the
+    # per-field insert compilation in bulk_create dominates at millions of rows.
+    fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+    defaults = [
+        field.get_db_prep_save(field.get_default(), connection)
+        for field in fields
+        if field.attname not in columns
+    ]
+    names = list(columns) + [field.attname for field in fields if field.attname not in columns]
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        connection.ops.quote_name(model._meta.db_table),
+        ", ".join(connection.ops.quote_name(model._meta.get_field(name).column) for name in names),
+        ", ".join(["%s"] * len(names)),
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [(*row, *defaults) for row in rows])
 
 
 class Command(BaseCommand):
-    help = "Seed dummy data for patients, services, and appointments."
+    help = "Seed synthetic patients, services, and appointments in bulk."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--patients", type=int, default=15, help="Patients to create.")
+        parser.add_argument("--appointments", type=int, default=250, help="Appointments to create.")
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=90,
+            help="Width of the appointment window; a third lies in the past.",
+        )
+        parser.add_argument("--seed", type=int, default=None, help="Random seed for repeatable data.")
+        parser.add_argument("--batch-size", type=int, default=10000, help="Rows per insert transaction.")
+        parser.add_argument(
+            "--append",
+            action="store_true",
+            help="Add another batch of patients and appointments to a database that already has some.",
+        )
 
     def handle(self, *args, **options):
-        services_data = [
-            {"name": "General Practice", "description": "Primary care consultation with GP"},
-            {"name": "Cardiology", "description": "Heart and cardiovascular system specialist care"},
-            {"name": "Dermatology", "description": "Skin, hair, and nail conditions treatment"},
-            {"name": "Orthopedics", "description": "Bone, joint, and muscle disorders treatment"},
-            {"name": "Mental Health", "description": "Psychological and psychiatric care services"},
-            {"name": "Physiotherapy", "description": "Physical rehabilitation and movement therapy"},
-            {"name": "Radiology", "description": "Medical imaging and diagnostic scans"},
-            {"name": "Blood Tests", "description": "Laboratory testing and blood work"},
-            {"name": "Vaccination", "description": "Immunization and preventive care"},
-            {"name": "Diabetes Care", "description": "Diabetes management and monitoring"},
-            {"name": "Respiratory Care", "description": "Lung and breathing disorders treatment"},
-            {"name": "Ophthalmology", "description": "Eye care and vision services"},
-        ]
-
-        for data in services_data:
+        for name in ("patients", "appointments", "days", "batch_size"):
+            if options[name] < (1 if name in ("days", "batch_size") else 0):
+                raise CommandError(f"--{name.replace('_', '-')} must be positive.")
+        if not options["append"] and Patient.objects.exists():
+            self.stdout.write(self.style.WARNING("Patients already exist; nothing seeded. Pass --append to add more."))
+            return
+        rng = random.Random(options["seed"])
+        batch_size = options["batch_size"]
+        started = time.perf_counter()
+
+        for data in SERVICES:
             Service.objects.get_or_create(name=data["name"], defaults={"description": data["description"]})
-        self.stdout.write(self.style.SUCCESS(f"Ensured {len(services_data)} services."))
-
-        patients_data = [
-            {"nhs_number": "485-777-1234", "first_name": "James", "last_name": "Smith", "dob": "1985-03-15", "phone": "07700 900123", "email": "james.smith@email.com"},
-            {"nhs_number": "485-777-2345", "first_name": "Emily", "last_name": "Johnson", "dob": "1992-07-22", "phone": "07700 900234", "email": "emily.johnson@email.com"},
-            {"nhs_number": "485-777-3456", "first_name": "Michael", "last_name": "Williams", "dob": "1978-11-08", "phone": "07700 900345", "email": "michael.williams@email.com"},
-            {"nhs_number": "485-777-4567", "first_name": "Sarah", "last_name": "Brown", "dob": "1990-01-30", "phone": "07700 900456", "email": "sarah.brown@email.com"},
-            {"nhs_number": "485-777-5678", "first_name": "David", "last_name": "Jones", "dob": "1983-09-12", "phone": "07700 900567", "email": "david.jones@email.com"},
-            {"nhs_number": "485-777-6789", "first_name": "Emma", "last_name": "Davis", "dob": "1995-05-18", "phone": "07700 900678", "email": "emma.davis@email.com"},
-            {"nhs_number": "485-777-7890", "first_name": "Robert", "last_name": "Miller", "dob": "1970-12-03", "phone": "07700 900789", "email": "robert.miller@email.com"},
-            {"nhs_number": "485-777-8901", "first_name": "Lisa", "last_name": "Wilson", "dob": "1988-04-25", "phone": "07700 900890", "email": "lisa.wilson@email.com"},
-            {"nhs_number": "485-777-9012", "first_name": "Christopher", "last_name": "Moore", "dob": "1976-08-14", "phone": "07700 900901", "email": "chris.moore@email.com"},
-            {"nhs_number": "485-777-0123", "first_name": "Amanda", "last_name": "Taylor", "dob": "1993-10-07", "phone": "07700 900012", "email": "amanda.taylor@email.com"},
-            {"nhs_number": "485-777-1357", "first_name": "Thomas", "last_name": "Anderson", "dob": "1981-06-20", "phone": "07700 900135", "email": "thomas.anderson@email.com"},
-            {"nhs_number": "485-777-2468", "first_name": "Rachel", "last_name": "Thompson", "dob": "1987-02-14", "phone": "07700 900246", "email": "rachel.thompson@email.com"},
-            {"nhs_number": "485-777-3691", "first_name": "Daniel", "last_name": "White", "dob": "1979-09-28", "phone": "07700 900369", "email": "daniel.white@email.com"},
-            {"nhs_number": "485-777-4825", "first_name": "Jennifer", "last_name": "Harris", "dob": "1991-12-11", "phone": "07700 900482", "email": "jennifer.harris@email.com"},
-            {"nhs_number": "485-777-5936", "first_name": "Matthew", "last_name": "Clark", "dob": "1984-03-05", "phone": "07700 900593", "email": "matthew.clark@email.com"},
-        ]
-
-        for data in patients_data:
-            Patient.objects.get_or_create(
-                nhs_number=data["nhs_number"],
-                defaults={
-                    "first_name": data["first_name"],
-                    "last_name": data["last_name"],
-                    "date_of_birth": datetime.strptime(data["dob"], "%Y-%m-%d").date(),
-                    "contact_phone": data["phone"],
-                    "contact_email": data["email"],
-                },
-            )
-        self.stdout.write(self.style.SUCCESS(f"Ensured {len(patients_data)} patients."))
+        self.stdout.write(self.style.SUCCESS(f"Ensured {len(SERVICES)} services."))
+
+        created = self._create_patients(rng, options["patients"], batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Created {created} patients."))
 
-        patients = list(Patient.objects.all())
-        services = list(Service.objects.all())
-        if not patients or not services:
+        patient_ids = list(Patient.objects.values_list("id", flat=True))
+        service_ids = list(Service.objects.values_list("id", flat=True))
+        if not patient_ids or not service_ids:
             self.stdout.write(self.style.WARNING("No patients or services found; skipping appointments."))
             return
 
-        locations = ["Room 101", "Room 102", "Room 201", "Clinic A", "Clinic B", "Ward 3", "Radiology Dept", "Lab"]
-        statuses = ["scheduled", "completed", "cancelled", "no-show"]
-
-        base_date = timezone.now()
-        appointments_created = 0
-
-        for days_offset in range(-30, 61):
-            appointment_date = base_date + timedelta(days=days_offset)
-            daily_appointments = random.randint(1, 4)
-            for _ in range(daily_appointments):
-                patient = random.choice(patients)
-                service = random.choice(services)
-
-                hour = random.randint(9, 17)
-                minute = random.choice([0, 15, 30, 45])
-                scheduled_time = appointment_date.replace(hour=hour, minute=minute, second=0, microsecond=0)
-
-                if days_offset < 0:
-                    status = random.choices(statuses, weights=[10, 70, 15, 5])[0]
-                else:
-                    status = random.choices(statuses, weights=[85, 5, 8, 2])[0]
-
-                Appointment.objects.create(
-                    patient=patient,
-                    service=service,
-                    scheduled_for=scheduled_time,
-                    location=random.choice(locations),
-                    status=status,
-                    notes=f"Patient appointment for {service.name}",
+        created = self._create_appointments(
+            rng, options["appointments"], options["days"], patient_ids, service_ids, batch_size
+        )
+        self.stdout.write(self.style.SUCCESS(f"Created {created} appointments."))
+
+        invalidate_dashboard_stats()
+        invalidate_lookups("patients")
+        bump_table_versions("patient", "appointment")
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Seeding finished in {elapsed:.1f}s."))
+
+    def _create_patients(self, rng, count, batch_size):
+        existing = Patient.objects.values_list("nhs_number", flat=True).iterator(chunk_size=batch_size)
+        numbers = generate_nhs_numbers(rng, count, exclude=existing)
+        today = date.today()
+
+        def patients():
+            for nhs_number in numbers:
+                patient = Patient(
+                    nhs_number=nhs_number,
+                    first_name=rng.choice(FIRST_NAMES),
+                    last_name=rng.choice(LAST_NAMES),
+                    date_of_birth=today - timedelta(days=rng.randint(18 * 365, 95 * 365)),
+                    contact_phone=f"07700 9{rng.randint(0, 99999):05d}",
+                    status=rng.choices(["active", "inactive", "discharged", "deceased"], [80, 10, 8, 2])[0],
+                    priority=rng.choices(["low", "medium", "high", "urgent"], [30, 45, 18, 7])[0],
+                )
+                patient.contact_email = (
+                    f"{patient.first_name}.{patient.last_name}.{nhs_number[-4:]}@example.com".lower()
+                )
+                patient.refresh_search_keys()
+                yield patient
+
+        search = get_search_backend()
+        created = 0
+        for batch in _batches(patients(), batch_size):
+            deltas = Counter()
+            for patient in batch:
+                deltas["status", patient.status] += 1
+                deltas["priority", patient.priority] += 1
+            with transaction.atomic():
+                Patient.objects.bulk_create(batch)
+                search.index_many(batch)
+                apply_patient_deltas(deltas)
+            created += len(batch)
+        return created
+
+    def _create_appointments(self, rng, count, days, patient_ids, service_ids, batch_size):
+        now = timezone.now()
+        first_day = -(days // 3)
+        adapt = connection.ops.adapt_datetimefield_value
+        columns = ("patient_id", "service_id", "scheduled_for", "location", "status", "notes")
+
+        slots = []
+        for offset in range(first_day, first_day + days):
+            day = now + timedelta(days=offset)
+            times = [
+                day.replace(hour=hour, minute=minute, second=0, microsecond=0)
+                for hour in range(9, 18)
+                for minute in (0, 15, 30, 45)
+            ]
+            slots.append(
+                (
+                    timezone.localdate(times[0]),
+                    PAST_WEIGHTS if offset < 0 else FUTURE_WEIGHTS,
+                    [adapt(value) for value in times],
+                )
+            )
+
+        def appointments(size, deltas):
+            for _ in range(size):
+                day, weights, times = rng.choice(slots)
+                status = rng.choices(STATUSES, cum_weights=weights)[0]
+                deltas[day, status] += 1
+                yield (
+                    rng.choice(patient_ids),
+                    rng.choice(service_ids),
+                    rng.choice(times),
+                    rng.choice(LOCATIONS),
+                    status,
+                    "Synthetic appointment",
                 )
-                appointments_created += 1
 
-        self.stdout.write(self.style.SUCCESS(f"Created {appointments_created} appointments."))
+        created = 0
+        while created < count:
+            deltas = Counter()
+            batch = list(appointments(min(batch_size, count - created), deltas))
+            with transaction.atomic():
+                _insert_rows(Appointment, columns, batch)
+                apply_appointment_deltas(deltas)
+            created += len(batch)
+        return created
@@ -0,0 +1,174 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from django.conf import settings
+
+slow_logger = logging.getLogger("tracker.slow_requests")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_VIEW = "<unmatched>"
+
+_collector = ContextVar("tracker_query_collector", default=None)
+
+_IN_LIST_RE = re.compile(r"\(\s*%s(?:\s*,\s*%s)+\s*\)")
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACE_RE = re.compile(r"\s+")
+
+
+class ViewStats:
+    __slots__ = ("buckets", "count", "seconds", "queries", "db_seconds")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.seconds = 0.0
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_stats = {}
+_cache_results = {}
+_lock = threading.Lock()
+
+
+def reset_metrics():
+    with _lock:
+        _stats.clear()
+        _cache_results.clear()
+
+
+def reset_cache_results():
+    with _lock:
+        _cache_results.clear()
+
+
+def record_cache(name, hit):
+    key = (name, "hit" if hit else "miss")
+    with _lock:
+        _cache_results[key] = _cache_results.get(key, 0) + 1
+
+
+def cache_snapshot():
+    with _lock:
+        return dict(_cache_results)
+
+
+def snapshot():
+    with _lock:
+        return {
+            view: {
+                "buckets": list(stats.buckets),
+                "count": stats.count,
+                "seconds": stats.seconds,
+                "queries": stats.queries,
+                "db_seconds": stats.db_seconds,
+            }
+            for view, stats in _stats.items()
+        }
+
+
+def record_query(execute, sql, params, many, context):
+    queries = _collector.get()
+    if queries is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        queries.append((sql, time.perf_counter() - started))
+
+
+def install_query_recorder(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def begin_request():
+    queries = []
+    return queries, _collector.set(queries), time.perf_counter()
+
+
+def finish_request(request, queries, token, started):
+    elapsed = time.perf_counter() - started
+    _collector.reset(token)
+    match = getattr(request, "resolver_match", None)
+    view = match.view_name if match is not None else UNMATCHED_VIEW
+    db_seconds = sum(duration for _, duration in queries)
+    with _lock:
+        stats = _stats.get(view)
+        if stats is None:
+            stats = _stats[view] = ViewStats()
+        stats.buckets[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+        stats.count += 1
+        stats.seconds += elapsed
+        stats.queries += len(queries)
+        stats.db_seconds += db_seconds
+    if elapsed * 1000 >= settings.SLOW_REQUEST_MS:
+        log_slow_request(request, view, elapsed, queries, db_seconds)
+
+
+def fingerprint(sql):
+    normalised = _SPACE_RE.sub(" ", _LITERAL_RE.sub("?", _IN_LIST_RE.sub("(...)", sql))).strip()
+    return hashlib.md5(normalised.encode(), usedforsecurity=False).hexdigest()[:12], normalised
+
+
+def log_slow_request(request, view, elapsed, queries, db_seconds):
+    grouped = {}
+    for sql, duration in queries:
+        key, normalised = fingerprint(sql)
+        entry = grouped.setdefault(key, [normalised, 0, 0.0])
+        entry[1] += 1
+        entry[2] += duration
+    lines = [
+        f"{request.method} {request.path} view={view} {elapsed * 1000:.0f}ms "
+        f"queries={len(queries)} db={db_seconds * 1000:.0f}ms"
+    ]
+    for key, (normalised, count, duration) in sorted(grouped.items(), key=lambda item: -item[1][2]):
+        lines.append(f"  {key} x{count} {duration * 1000:.1f}ms {normalised}")
+    slow_logger.warning("\n".join(lines))
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def render_prometheus():
+    lines = [
+        "# HELP tracker_request_duration_seconds Request latency by view.",
+        "# TYPE tracker_request_duration_seconds histogram",
+    ]
+    views = sorted(snapshot().items())
+    for view, stats in views:
+        label = _label(view)
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), stats["buckets"]):
+            cumulative += count
+            lines.append(f'tracker_request_duration_seconds_bucket{{view="{label}",le="{bound}"}} {cumulative}')
+        lines.append(f'tracker_request_duration_seconds_sum{{view="{label}"}} {stats["seconds"]:.6f}')
+        lines.append(f'tracker_request_duration_seconds_count{{view="{label}"}} {stats["count"]}')
+    lines += [
+        "# HELP tracker_db_queries_total Database queries issued by view.",
+        "# TYPE tracker_db_queries_total counter",
+    ]
+    lines += [f'tracker_db_queries_total{{view="{_label(view)}"}} {stats["queries"]}' for view, stats in views]
+    lines += [
+        "# HELP tracker_db_query_seconds_total Time spent in database queries by view.",
+        "# TYPE tracker_db_query_seconds_total counter",
+    ]
+    lines += [
+        f'tracker_db_query_seconds_total{{view="{_label(view)}"}} {stats["db_seconds"]:.6f}' for view, stats in views
+    ]
+    lines += [
+        "# HELP tracker_cache_requests_total Dashboard and lookup cache reads by result.",
+        "# TYPE tracker_cache_requests_total counter",
+    ]
+    lines += [
+        f'tracker_cache_requests_total{{cache="{_label(name)}",result="{result}"}} {count}'
+        for (name, result), count in sorted(cache_snapshot().items())
+    ]
+    return "\n".join(lines) + "\n"
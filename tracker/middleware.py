@@ -0,0 +1,29 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .metrics import begin_request, finish_request
+
+
+class QueryMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        queries, token, started = begin_request()
+        try:
+            return self.get_response(request)
+        finally:
+            finish_request(request, queries, token, started)
+
+    async def __acall__(self, request):
+        queries, token, started = begin_request()
+        try:
+            return await self.get_response(request)
+        finally:
+            finish_request(request, queries, token, started)
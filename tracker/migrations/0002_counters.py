@@ -0,0 +1,60 @@
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def populate_counters(apps, schema_editor):
+    Patient = apps.get_model("tracker", "Patient")
+    Appointment = apps.get_model("tracker", "Appointment")
+    PatientCounter = apps.get_model("tracker", "PatientCounter")
+    AppointmentDayCounter = apps.get_model("tracker", "AppointmentDayCounter")
+
+    PatientCounter.objects.bulk_create(
+        PatientCounter(field=field, value=value, count=count)
+        for field in ("status", "priority")
+        for value, count in Patient.objects.values_list(field).annotate(count=Count("id")).order_by()
+    )
+    AppointmentDayCounter.objects.bulk_create(
+        AppointmentDayCounter(day=day, status=status, count=count)
+        for day, status, count in Appointment.objects.annotate(day=TruncDate("scheduled_for"))
+        .values_list("day", "status")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tracker", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AppointmentDayCounter",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField()),
+                ("status", models.CharField(choices=[("scheduled", "Scheduled"), ("completed", "Completed"), ("cancelled", "Cancelled"), ("no-show", "No Show")], max_length=20)),
+                ("count", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="PatientCounter",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("field", models.CharField(choices=[("status", "Status"), ("priority", "Priority")], max_length=20)),
+                ("value", models.CharField(max_length=20)),
+                ("count", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="appointmentdaycounter",
+            constraint=models.UniqueConstraint(fields=("day", "status"), name="unique_appointment_day_counter"),
+        ),
+        migrations.AddConstraint(
+            model_name="patientcounter",
+            constraint=models.UniqueConstraint(fields=("field", "value"), name="unique_patient_counter"),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations, models
+
+
+def populate_search_keys(apps, schema_editor):
+    Patient = apps.get_model("tracker", "Patient")
+    batch = []
+    for patient in Patient.objects.only("id", "first_name", "last_name").iterator(chunk_size=2000):
+        patient.first_name_key = " ".join(patient.first_name.split()).casefold()
+        patient.last_name_key = " ".join(patient.last_name.split()).casefold()
+        batch.append(patient)
+        if len(batch) >= 2000:
+            Patient.objects.bulk_update(batch, ["first_name_key", "last_name_key"])
+            batch = []
+    Patient.objects.bulk_update(batch, ["first_name_key", "last_name_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tracker", "0002_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="patient",
+            name="first_name_key",
+            field=models.CharField(db_index=True, default="", editable=False, max_length=80),
+        ),
+        migrations.AddField(
+            model_name="patient",
+            name="last_name_key",
+            field=models.CharField(db_index=True, default="", editable=False, max_length=80),
+        ),
+        migrations.AddIndex(
+            model_name="patient",
+            index=models.Index(fields=["last_name", "id"], name="patient_last_name_id_idx"),
+        ),
+        migrations.RunPython(populate_search_keys, migrations.RunPython.noop),
+    ]
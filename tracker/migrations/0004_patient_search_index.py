@@ -0,0 +1,68 @@
+import sqlite3
+
+from django.db import migrations
+
+
+def _fts5_available():
+    try:
+        probe = sqlite3.connect(":memory:")
+        probe.execute("CREATE VIRTUAL TABLE probe USING fts5(body)")
+        probe.close()
+    except sqlite3.Error:
+        return False
+    return True
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite" and _fts5_available():
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE tracker_patient_fts USING fts5("
+            "first_name, last_name, nhs_number, medical_notes, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            "INSERT INTO tracker_patient_fts (rowid, first_name, last_name, nhs_number, medical_notes) "
+            "SELECT id, first_name, last_name, "
+            "nhs_number || ' ' || replace(replace(nhs_number, '-', ''), ' ', ''), medical_notes "
+            "FROM tracker_patient"
+        )
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE TABLE tracker_patient_search ("
+            "patient_id bigint PRIMARY KEY REFERENCES tracker_patient (id) ON DELETE CASCADE, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX tracker_patient_search_document_idx "
+            "ON tracker_patient_search USING GIN (document)"
+        )
+        schema_editor.execute(
+            "INSERT INTO tracker_patient_search (patient_id, document) "
+            "SELECT id, "
+            "setweight(to_tsvector('simple', first_name), 'A') || "
+            "setweight(to_tsvector('simple', last_name), 'A') || "
+            "setweight(to_tsvector('simple', nhs_number || ' ' || "
+            "replace(replace(nhs_number, '-', ''), ' ', '')), 'B') || "
+            "setweight(to_tsvector('simple', medical_notes), 'C') "
+            "FROM tracker_patient"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS tracker_patient_fts")
+    elif vendor == "postgresql":
+        schema_editor.execute("DROP TABLE IF EXISTS tracker_patient_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tracker", "0003_patient_search_keys"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tracker", "0005_appointment_when_status_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="appointment",
+            index=models.Index(fields=["scheduled_for", "id"], name="appointment_when_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="appointment",
+            index=models.Index(fields=["patient", "scheduled_for"], name="appointment_patient_when_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="appointment",
+            index=models.Index(
+                condition=models.Q(("status", "scheduled")),
+                fields=["scheduled_for"],
+                name="appointment_upcoming_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="patient",
+            index=models.Index(fields=["status"], name="patient_status_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="patient",
+            index=models.Index(fields=["priority"], name="patient_priority_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="patient",
+            index=models.Index(fields=["created_at"], name="patient_created_at_idx"),
+        ),
+    ]
@@ -1,6 +1,65 @@
+from datetime import timedelta
+
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Count, F, FilteredRelation, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
+PREFIX_UPPER_BOUND = "\uffff"
+
+
+def normalise_search_key(value):
+    return " ".join(value.split()).casefold()
+
+
+def prefix_filter(field, prefix):
+    return Q(**{f"{field}__gte": prefix, f"{field}__lt": prefix + PREFIX_UPPER_BOUND})
+
+
+class PatientQuerySet(models.QuerySet):
+    def matching(self, query):
+        terms = normalise_search_key(query).split()
+        if not terms:
+            return self
+        if len(terms) == 1:
+            return self.filter(
+                prefix_filter("last_name_key", terms[0])
+                | prefix_filter("first_name_key", terms[0])
+                | prefix_filter("nhs_number", query.strip())
+            )
+        queryset = self
+        for term in terms:
+            queryset = queryset.filter(
+                prefix_filter("last_name_key", term) | prefix_filter("first_name_key", term)
+            )
+        return queryset
+
+    def with_appointment_summary(self):
+        upcoming = Appointment.objects.filter(
+            patient=OuterRef("pk"), scheduled_for__gt=timezone.now(), status="scheduled"
+        ).order_by("scheduled_for")
+        counts = (
+            Appointment.objects.filter(patient=OuterRef("pk"))
+            .order_by()
+            .values("patient")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        # The ordered lookup runs once per patient, picking the pk that the
+        # join reads the next appointment's other columns from.
+        return self.annotate(
+            appointment_count=Coalesce(Subquery(counts), 0),
+            upcoming_appointment=FilteredRelation(
+                "appointments", condition=Q(appointments__pk=Subquery(upcoming.values("pk")[:1]))
+            ),
+        ).annotate(
+            next_appointment_pk=F("upcoming_appointment__pk"),
+            next_appointment_at=F("upcoming_appointment__scheduled_for"),
+            next_appointment_service_id=F("upcoming_appointment__service_id"),
+            next_appointment_location=F("upcoming_appointment__location"),
+        )
+
 
 class Patient(models.Model):
     STATUS_CHOICES = [
@@ -27,6 +86,29 @@ class Patient(models.Model):
     medical_notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    first_name_key = models.CharField(max_length=80, db_index=True, editable=False, default="")
+    last_name_key = models.CharField(max_length=80, db_index=True, editable=False, default="")
+
+    objects = PatientQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["last_name", "id"], name="patient_last_name_id_idx"),
+            models.Index(fields=["status"], name="patient_status_idx"),
+            models.Index(fields=["priority"], name="patient_priority_idx"),
+            models.Index(fields=["created_at"], name="patient_created_at_idx"),
+        ]
+
+    def refresh_search_keys(self):
+        self.first_name_key = normalise_search_key(self.first_name)
+        self.last_name_key = normalise_search_key(self.last_name)
+
+    def save(self, *args, **kwargs):
+        self.refresh_search_keys()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "first_name_key", "last_name_key"}
+        super().save(*args, **kwargs)
 
     @property
     def age(self):
@@ -37,6 +119,17 @@ class Patient(models.Model):
 
     @property
     def next_appointment(self):
+        if hasattr(self, "next_appointment_pk"):
+            if self.next_appointment_pk is None:
+                return None
+            return Appointment(
+                pk=self.next_appointment_pk,
+                patient=self,
+                service_id=self.next_appointment_service_id,
+                scheduled_for=self.next_appointment_at,
+                location=self.next_appointment_location,
+                status="scheduled",
+            )
         return (
             self.appointments.filter(scheduled_for__gt=timezone.now(), status="scheduled")
             .order_by("scheduled_for")
@@ -45,6 +138,8 @@ class Patient(models.Model):
 
     @property
     def total_appointments(self):
+        if hasattr(self, "appointment_count"):
+            return self.appointment_count
         return self.appointments.count()
 
     def __str__(self):
@@ -66,13 +161,94 @@ class Appointment(models.Model):
         ("cancelled", "Cancelled"),
         ("no-show", "No Show"),
     ]
+    # Statuses that occupy the room and the patient for the appointment's duration.
+    BUSY_STATUSES = ("scheduled", "completed")
+    # Overlap queries look back this far from the start of a window, so an
+    # appointment may not run longer than a clinic day.
+    MAX_DURATION_MINUTES = 12 * 60
 
     patient = models.ForeignKey(Patient, related_name="appointments", on_delete=models.CASCADE)
     service = models.ForeignKey(Service, on_delete=models.CASCADE)
     scheduled_for = models.DateTimeField()
+    duration_minutes = models.PositiveSmallIntegerField(
+        "Duration (minutes)",
+        default=15,
+        validators=[MinValueValidator(5), MaxValueValidator(MAX_DURATION_MINUTES)],
+    )
     location = models.CharField(max_length=120)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="scheduled")
     notes = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["scheduled_for", "status"], name="appointment_when_status_idx"),
+            models.Index(fields=["scheduled_for", "id"], name="appointment_when_id_idx"),
+            models.Index(fields=["patient", "scheduled_for"], name="appointment_patient_when_idx"),
+            models.Index(fields=["location", "scheduled_for"], name="appointment_location_when_idx"),
+            models.Index(
+                fields=["scheduled_for"],
+                condition=Q(status="scheduled"),
+                name="appointment_upcoming_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.patient} - {self.service}"
+
+    @property
+    def ends_at(self):
+        return self.scheduled_for + timedelta(minutes=self.duration_minutes)
+
+
+class PatientCounter(models.Model):
+    FIELD_CHOICES = [
+        ("status", "Status"),
+        ("priority", "Priority"),
+    ]
+
+    field = models.CharField(max_length=20, choices=FIELD_CHOICES)
+    value = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["field", "value"], name="unique_patient_counter"),
+        ]
+
+    def __str__(self):
+        return f"{self.field}={self.value}: {self.count}"
+
+
+class AppointmentDayCounter(models.Model):
+    day = models.DateField()
+    status = models.CharField(max_length=20, choices=Appointment.STATUS_CHOICES)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "status"], name="unique_appointment_day_counter"),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.status}: {self.count}"
+
+
+class BookingLock(models.Model):
+    # One row per location and per patient. Bookings update the rows they need
+    # before checking for clashes, so concurrent bookings of the same location or
+    # patient queue on the row lock (the write lock on SQLite) instead of both
+    # passing the check.
+    key = models.CharField(max_length=160, unique=True)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return self.key
+
+
+class TableVersion(models.Model):
+    table = models.CharField(max_length=40, unique=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.table} v{self.version}"
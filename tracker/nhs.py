@@ -0,0 +1,38 @@
+NHS_NUMBER_WEIGHTS = range(10, 1, -1)
+
+
+def nhs_check_digit(first_nine):
+    remainder = sum(int(digit) * weight for digit, weight in zip(first_nine, NHS_NUMBER_WEIGHTS)) % 11
+    check = 11 - remainder
+    if check == 11:
+        return 0
+    if check == 10:
+        return None
+    return check
+
+
+def normalise_nhs_number(value):
+    return value.replace(" ", "").replace("-", "")
+
+
+def is_valid_nhs_number(value):
+    digits = normalise_nhs_number(value)
+    if len(digits) != 10 or not digits.isdigit():
+        return False
+    return nhs_check_digit(digits[:9]) == int(digits[9])
+
+
+def generate_nhs_numbers(rng, count, exclude=()):
+    exclude = set(exclude)
+    numbers = []
+    while len(numbers) < count:
+        first_nine = str(rng.randrange(100_000_000, 1_000_000_000))
+        check = nhs_check_digit(first_nine)
+        if check is None:
+            continue
+        number = f"{first_nine}{check}"
+        if number in exclude:
+            continue
+        exclude.add(number)
+        numbers.append(number)
+    return numbers
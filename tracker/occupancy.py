@@ -0,0 +1,93 @@
+import math
+from array import array
+from bisect import bisect_right
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+
+from .availability import at_local, clinic_hours
+from .models import Appointment
+
+
+class OccupancyGrid:
+    # Bookings per location and slot, for each day's clinic hours. Every location
+    # has one flat array of days * width unsigned shorts; cell (day, slot) lives at
+    # day * width + slot.
+    def __init__(self, first_day, days, opens, closes, step):
+        self.first_day = first_day
+        self.days = days
+        self.step = step
+        self.opens = opens
+        self.width = int(
+            (datetime.combine(first_day, closes) - datetime.combine(first_day, opens)).total_seconds()
+        ) // step
+        self.day_opens = [
+            at_local(first_day + timedelta(days=index), opens).timestamp() for index in range(days)
+        ]
+        self.cells = {}
+
+    def row(self, location):
+        cells = self.cells.get(location)
+        if cells is None:
+            cells = self.cells[location] = array("H", [0]) * (self.days * self.width)
+        return cells
+
+    def add(self, location, start, minutes):
+        cells = self.row(location)
+        begin = start.timestamp()
+        end = begin + minutes * 60
+        day = max(bisect_right(self.day_opens, begin) - 1, 0)
+        while day < self.days and self.day_opens[day] < end:
+            offset = day * self.width
+            first = max(math.floor((begin - self.day_opens[day]) / self.step), 0)
+            last = min(math.ceil((end - self.day_opens[day]) / self.step), self.width)
+            for index in range(offset + first, offset + last):
+                cells[index] += 1
+            day += 1
+
+    def locations(self):
+        return sorted(self.cells)
+
+    def slot_labels(self):
+        start = datetime.combine(self.first_day, self.opens)
+        return [f"{start + timedelta(seconds=self.step * index):%H:%M}" for index in range(self.width)]
+
+    def day(self, index):
+        offset = index * self.width
+        return [(location, self.cells[location][offset : offset + self.width]) for location in self.locations()]
+
+    def by_day(self):
+        return [(self.first_day + timedelta(days=index), self.day(index)) for index in range(self.days)]
+
+    def as_dict(self):
+        return {
+            "start": self.first_day.isoformat(),
+            "slot_minutes": self.step // 60,
+            "slots": self.slot_labels(),
+            "days": [
+                {"date": day.isoformat(), "locations": {location: cells.tolist() for location, cells in rows}}
+                for day, rows in self.by_day()
+            ],
+        }
+
+
+def occupancy(first_day, days=1, locations=None):
+    """Count busy appointments per location in each slot of ``days`` clinic days."""
+    opens, closes = clinic_hours()
+    grid = OccupancyGrid(first_day, days, opens, closes, settings.APPOINTMENT_SLOT_MINUTES * 60)
+    for location in locations or ():
+        grid.row(location)
+    # One range over the (scheduled_for, status) index; the lookback catches
+    # appointments that start before the first day and run into it.
+    lookback = timedelta(minutes=Appointment.MAX_DURATION_MINUTES)
+    rows = Appointment.objects.filter(
+        status__in=Appointment.BUSY_STATUSES,
+        scheduled_for__gte=at_local(first_day, time.min) - lookback,
+        scheduled_for__lt=at_local(first_day + timedelta(days=days), time.min),
+    )
+    if locations:
+        rows = rows.filter(location__in=locations)
+    rows = rows.values_list("location", "scheduled_for", "duration_minutes")
+    for location, start, minutes in rows.iterator(chunk_size=2000):
+        grid.add(location, start, minutes)
+    return grid
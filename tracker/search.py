@@ -0,0 +1,235 @@
+import re
+import sqlite3
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .models import Patient
+
+SQLITE_TABLE = "tracker_patient_fts"
+POSTGRES_TABLE = "tracker_patient_search"
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def search_terms(query):
+    return _TOKEN_RE.findall(query.casefold())
+
+
+def nhs_search_text(nhs_number):
+    return f"{nhs_number} {nhs_number.replace('-', '').replace(' ', '')}"
+
+
+@lru_cache(maxsize=None)
+def sqlite_fts5_available():
+    try:
+        probe = sqlite3.connect(":memory:")
+        probe.execute("CREATE VIRTUAL TABLE probe USING fts5(body)")
+        probe.close()
+    except sqlite3.Error:
+        return False
+    return True
+
+
+class PrefixSearchBackend:
+    name = "prefix"
+
+    def index(self, patient):
+        pass
+
+    def index_many(self, patients):
+        pass
+
+    def remove(self, patient_id):
+        pass
+
+    def rebuild(self):
+        return 0
+
+    def search(self, query, limit):
+        return list(
+            Patient.objects.matching(query).order_by("last_name", "id").values_list("id", flat=True)[:limit]
+        )
+
+    def filter(self, queryset, query):
+        return queryset.filter(pk__in=Patient.objects.matching(query).values("pk"))
+
+
+class SQLiteFTSBackend:
+    name = "fts5"
+
+    def index(self, patient):
+        self.index_many([patient])
+
+    def index_many(self, patients):
+        rows = [
+            (
+                patient.pk,
+                patient.first_name,
+                patient.last_name,
+                nhs_search_text(patient.nhs_number),
+                patient.medical_notes,
+            )
+            for patient in patients
+        ]
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s", [row[:1] for row in rows])
+            cursor.executemany(
+                f"INSERT INTO {SQLITE_TABLE} (rowid, first_name, last_name, nhs_number, medical_notes) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                rows,
+            )
+
+    def remove(self, patient_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s", [patient_id])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SQLITE_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {SQLITE_TABLE} (rowid, first_name, last_name, nhs_number, medical_notes) "
+                "SELECT id, first_name, last_name, "
+                "nhs_number || ' ' || replace(replace(nhs_number, '-', ''), ' ', ''), medical_notes "
+                "FROM tracker_patient"
+            )
+            return cursor.rowcount
+
+    @staticmethod
+    def match(query):
+        return " ".join(f'"{term}"*' for term in search_terms(query))
+
+    def search(self, query, limit):
+        match = self.match(query)
+        if not match:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s "
+                f"ORDER BY bm25({SQLITE_TABLE}, 10.0, 10.0, 5.0, 1.0), rowid LIMIT %s",
+                [match, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def filter(self, queryset, query):
+        match = self.match(query)
+        if not match:
+            return queryset.none()
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s", [match])
+        )
+
+
+class PostgresSearchBackend:
+    name = "postgres"
+
+    document_sql = (
+        "setweight(to_tsvector('simple', %s), 'A') || "
+        "setweight(to_tsvector('simple', %s), 'A') || "
+        "setweight(to_tsvector('simple', %s), 'B') || "
+        "setweight(to_tsvector('simple', %s), 'C')"
+    )
+
+    def index(self, patient):
+        self.index_many([patient])
+
+    def index_many(self, patients):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {POSTGRES_TABLE} (patient_id, document) VALUES (%s, {self.document_sql}) "
+                "ON CONFLICT (patient_id) DO UPDATE SET document = EXCLUDED.document",
+                [
+                    (
+                        patient.pk,
+                        patient.first_name,
+                        patient.last_name,
+                        nhs_search_text(patient.nhs_number),
+                        patient.medical_notes,
+                    )
+                    for patient in patients
+                ],
+            )
+
+    def remove(self, patient_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {POSTGRES_TABLE} WHERE patient_id = %s", [patient_id])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {POSTGRES_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {POSTGRES_TABLE} (patient_id, document) "
+                "SELECT id, "
+                "setweight(to_tsvector('simple', first_name), 'A') || "
+                "setweight(to_tsvector('simple', last_name), 'A') || "
+                "setweight(to_tsvector('simple', nhs_number || ' ' || "
+                "replace(replace(nhs_number, '-', ''), ' ', '')), 'B') || "
+                "setweight(to_tsvector('simple', medical_notes), 'C') "
+                "FROM tracker_patient"
+            )
+            return cursor.rowcount
+
+    @staticmethod
+    def tsquery(query):
+        return " & ".join(f"{term}:*" for term in search_terms(query))
+
+    def search(self, query, limit):
+        tsquery = self.tsquery(query)
+        if not tsquery:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT patient_id FROM {POSTGRES_TABLE}, to_tsquery('simple', %s) query "
+                "WHERE document @@ query ORDER BY ts_rank(document, query) DESC, patient_id LIMIT %s",
+                [tsquery, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def filter(self, queryset, query):
+        tsquery = self.tsquery(query)
+        if not tsquery:
+            return queryset.none()
+        return queryset.filter(
+            pk__in=RawSQL(
+                f"SELECT patient_id FROM {POSTGRES_TABLE} WHERE document @@ to_tsquery('simple', %s)", [tsquery]
+            )
+        )
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (PrefixSearchBackend, SQLiteFTSBackend, PostgresSearchBackend)
+}
+
+
+def get_search_backend():
+    name = settings.PATIENT_SEARCH_BACKEND
+    if name == "auto":
+        if connection.vendor == "postgresql":
+            name = "postgres"
+        elif connection.vendor == "sqlite" and sqlite_fts5_available():
+            name = "fts5"
+        else:
+            name = "prefix"
+    return BACKENDS[name]()
+
+
+def search_patients(query, limit=None, queryset=None):
+    limit = limit or settings.PATIENT_SEARCH_LIMIT
+    ids = get_search_backend().search(query, limit)
+    found = (queryset if queryset is not None else Patient.objects.all()).in_bulk(ids)
+    return [found[pk] for pk in ids if pk in found]
+
+
+def filter_patients(query, queryset=None):
+    """Every patient the list search matches, unranked and unlimited, for exports."""
+    return get_search_backend().filter(queryset if queryset is not None else Patient.objects.all(), query)
+
+
+def search_patients_page(query, queryset=None):
+    """The best PATIENT_SEARCH_LIMIT matches, and whether more were found."""
+    limit = settings.PATIENT_SEARCH_LIMIT
+    results = search_patients(query, limit=limit + 1, queryset=queryset)
+    return results[:limit], len(results) > limit
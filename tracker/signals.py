@@ -0,0 +1,108 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import counters
+from .conditional import bump_table_versions_on_commit
+from .lookups import invalidate_lookups
+from .metrics import install_query_recorder
+from .models import Appointment, Patient, Service
+from .search import get_search_backend
+from .stats import invalidate_dashboard_stats
+
+
+@receiver(pre_save, sender=Patient)
+def remember_patient_counters(sender, instance, raw=False, **kwargs):
+    instance._counter_previous = None
+    if instance.pk and not raw:
+        instance._counter_previous = (
+            Patient.objects.filter(pk=instance.pk).values(*counters.PATIENT_COUNTER_FIELDS).first()
+        )
+
+
+@receiver(post_save, sender=Patient)
+def update_patient_counters(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    counters.update_patient_counters(
+        old=getattr(instance, "_counter_previous", None),
+        new=counters.patient_counter_values(instance),
+    )
+
+
+@receiver(post_delete, sender=Patient)
+def remove_patient_counters(sender, instance, **kwargs):
+    counters.update_patient_counters(old=counters.patient_counter_values(instance))
+
+
+@receiver(post_save, sender=Patient)
+def index_patient(sender, instance, raw=False, **kwargs):
+    if not raw:
+        get_search_backend().index(instance)
+
+
+@receiver(post_delete, sender=Patient)
+def unindex_patient(sender, instance, **kwargs):
+    get_search_backend().remove(instance.pk)
+
+
+@receiver(pre_save, sender=Appointment)
+def remember_appointment_counters(sender, instance, raw=False, **kwargs):
+    instance._counter_previous = None
+    if instance.pk and not raw:
+        previous = Appointment.objects.filter(pk=instance.pk).only("scheduled_for", "status").first()
+        if previous is not None:
+            instance._counter_previous = counters.appointment_counter_key(previous)
+
+
+@receiver(post_save, sender=Appointment)
+def update_appointment_counters(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    counters.update_appointment_counters(
+        old=getattr(instance, "_counter_previous", None),
+        new=counters.appointment_counter_key(instance),
+    )
+
+
+@receiver(post_delete, sender=Appointment)
+def remove_appointment_counters(sender, instance, **kwargs):
+    counters.update_appointment_counters(old=counters.appointment_counter_key(instance))
+
+
+@receiver(post_save, sender=Patient)
+@receiver(post_delete, sender=Patient)
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def invalidate_dashboard(sender, **kwargs):
+    invalidate_dashboard_stats()
+
+
+@receiver(post_save, sender=Patient)
+@receiver(post_delete, sender=Patient)
+def invalidate_patient_lookups(sender, **kwargs):
+    invalidate_lookups("patients")
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def invalidate_service_lookups(sender, **kwargs):
+    invalidate_lookups("services")
+
+
+@receiver(post_save, sender=Patient)
+@receiver(post_delete, sender=Patient)
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def bump_table_version(sender, raw=False, **kwargs):
+    if not raw:
+        bump_table_versions_on_commit(sender._meta.model_name)
+
+
+@receiver(connection_created)
+def record_connection_queries(sender, connection, **kwargs):
+    install_query_recorder(connection)
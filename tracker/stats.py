@@ -0,0 +1,114 @@
+import asyncio
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .counters import aappointment_counts, apatient_counts, appointment_counts, patient_counts
+from .metrics import cache_snapshot, record_cache, reset_cache_results
+from .models import Appointment, Patient, Service
+
+DASHBOARD_CACHE_KEY = "tracker:dashboard-stats"
+
+
+def cache_info():
+    # Per process, like the rest of /metrics/, where these appear as tracker_cache_requests_total.
+    counts = cache_snapshot()
+    return {"hits": counts.get(("dashboard", "hit"), 0), "misses": counts.get(("dashboard", "miss"), 0)}
+
+
+def reset_cache_info():
+    reset_cache_results()
+
+
+def invalidate_dashboard_stats():
+    cache.delete(DASHBOARD_CACHE_KEY)
+
+
+def _dashboard_window():
+    now = timezone.now()
+    today = timezone.localdate(now)
+    return now, today, today + timedelta(days=7)
+
+
+def _recent_patients(now):
+    return Patient.objects.filter(created_at__gte=now - timedelta(days=7)).order_by("-created_at")[:5]
+
+
+def _urgent_appointments(now):
+    return (
+        Appointment.objects.filter(
+            scheduled_for__gte=now,
+            scheduled_for__lte=now + timedelta(days=1),
+            status="scheduled",
+        )
+        .select_related("patient", "service")
+        .order_by("scheduled_for")[:5]
+    )
+
+
+def _dashboard_context(patient_totals, appointment_totals, total_services, recent_patients, urgent_appointments):
+    status_stats = patient_totals["status"]
+    priority_stats = patient_totals["priority"]
+    return {
+        "total_patients": sum(status_stats.values()),
+        "active_patients": status_stats.get("active", 0),
+        "high_priority_patients": priority_stats.get("high", 0),
+        "urgent_patients": priority_stats.get("urgent", 0),
+        "total_services": total_services,
+        "today_appointments": appointment_totals["today_appointments"],
+        "this_week_appointments": appointment_totals["this_week_appointments"],
+        "total_appointments": appointment_totals["total_appointments"],
+        "recent_patients": recent_patients,
+        "urgent_appointments": urgent_appointments,
+        "status_stats": status_stats,
+        "priority_stats": priority_stats,
+    }
+
+
+def compute_dashboard_stats():
+    now, today, this_week = _dashboard_window()
+    return _dashboard_context(
+        patient_counts(),
+        appointment_counts(today, this_week),
+        Service.objects.count(),
+        list(_recent_patients(now)),
+        list(_urgent_appointments(now)),
+    )
+
+
+async def _alist(queryset):
+    return [item async for item in queryset]
+
+
+async def acompute_dashboard_stats():
+    now, today, this_week = _dashboard_window()
+    results = await asyncio.gather(
+        apatient_counts(),
+        aappointment_counts(today, this_week),
+        Service.objects.acount(),
+        _alist(_recent_patients(now)),
+        _alist(_urgent_appointments(now)),
+    )
+    return _dashboard_context(*results)
+
+
+def dashboard_stats():
+    stats = cache.get(DASHBOARD_CACHE_KEY)
+    record_cache("dashboard", stats is not None)
+    if stats is not None:
+        return stats
+    stats = compute_dashboard_stats()
+    cache.set(DASHBOARD_CACHE_KEY, stats, settings.DASHBOARD_CACHE_TTL)
+    return stats
+
+
+async def adashboard_stats():
+    stats = await cache.aget(DASHBOARD_CACHE_KEY)
+    record_cache("dashboard", stats is not None)
+    if stats is not None:
+        return stats
+    stats = await acompute_dashboard_stats()
+    await cache.aset(DASHBOARD_CACHE_KEY, stats, settings.DASHBOARD_CACHE_TTL)
+    return stats
@@ -0,0 +1,33 @@
+from django import template
+from django.conf import settings
+
+from tracker.fragments import fragment_cache
+
+register = template.Library()
+
+
+class FragmentNode(template.Node):
+    def __init__(self, nodelist, key):
+        self.nodelist = nodelist
+        self.key = key
+
+    def render(self, context):
+        key = self.key.resolve(context)
+        if not key:
+            return self.nodelist.render(context)
+        # Views fetch a page's fragments with one get_many and pass them as "fragments".
+        html = context.get("fragments", {}).get(key)
+        if html is None:
+            html = self.nodelist.render(context)
+            fragment_cache().set(key, html, settings.FRAGMENT_CACHE_TTL)
+        return html
+
+
+@register.tag
+def fragment(parser, token):
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError("'fragment' takes one argument: the fragment key.")
+    nodelist = parser.parse(("endfragment",))
+    parser.delete_first_token()
+    return FragmentNode(nodelist, parser.compile_filter(bits[1]))
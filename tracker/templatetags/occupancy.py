@@ -0,0 +1,15 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+CELLS = ("<td></td>", '<td class="booked"></td>')
+
+
+@register.filter
+def occupancy_cells(counts):
+    # A week holds thousands of cells; joining precomputed markup keeps the
+    # calendar from paying a template loop and two comparisons per cell.
+    return mark_safe(
+        "".join(CELLS[count] if count < 2 else f'<td class="clash">{count}</td>' for count in counts)
+    )
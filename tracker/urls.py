@@ -1,15 +1,25 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 urlpatterns = [
-    path("", views.dashboard, name="dashboard"),
-    path("login/", views.login_view, name="login"),
+    path("", views.dashboard_async if settings.ASYNC_VIEWS else views.dashboard, name="dashboard"),
+    path("login/", views.login_view_async if settings.AUTH_HASH_OFFLOAD else views.login_view, name="login"),
     path("register/", views.register_view, name="register"),
     path("logout/", views.logout_view, name="logout"),
 
-    path("patients/", views.patients_list, name="patients_list"),
+    path(
+        "patients/",
+        views.patients_list_async if settings.ASYNC_VIEWS else views.patients_list,
+        name="patients_list",
+    ),
     path("patients/add/", views.patients_create, name="patients_create"),
-    path("patients/<int:pk>/", views.patients_detail, name="patients_detail"),
+    path("patients/export/", views.patients_export, name="patients_export"),
+    path(
+        "patients/<int:pk>/",
+        views.patients_detail_async if settings.ASYNC_VIEWS else views.patients_detail,
+        name="patients_detail",
+    ),
     path("patients/<int:pk>/edit/", views.patients_edit, name="patients_edit"),
     path("patients/<int:pk>/delete/", views.patients_delete, name="patients_delete"),
 
@@ -18,8 +28,24 @@ urlpatterns = [
     path("services/<int:pk>/edit/", views.services_edit, name="services_edit"),
     path("services/<int:pk>/delete/", views.services_delete, name="services_delete"),
 
-    path("appointments/", views.appointments_list, name="appointments_list"),
+    path(
+        "appointments/",
+        views.appointments_list_async if settings.ASYNC_VIEWS else views.appointments_list,
+        name="appointments_list",
+    ),
     path("appointments/add/", views.appointments_create, name="appointments_create"),
+    path("appointments/export/", views.appointments_export, name="appointments_export"),
+    path("appointments/calendar/", views.appointments_calendar, name="appointments_calendar"),
+    path(
+        "appointments/availability/",
+        views.appointments_availability,
+        name="appointments_availability",
+    ),
     path("appointments/<int:pk>/edit/", views.appointments_edit, name="appointments_edit"),
     path("appointments/<int:pk>/delete/", views.appointments_delete, name="appointments_delete"),
+
+    path("lookup/patients/", views.lookup_view, {"kind": "patients"}, name="lookup_patients"),
+    path("lookup/services/", views.lookup_view, {"kind": "services"}, name="lookup_services"),
+
+    path("metrics/", views.metrics_view, name="metrics"),
 ]
@@ -1,98 +1,107 @@
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
-from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.db.models import Count, Q
 from django.db import OperationalError, ProgrammingError, connection
-from django.shortcuts import get_object_or_404, redirect, render
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import aget_object_or_404, get_object_or_404, redirect, render
+from django.template.loader import get_template, render_to_string
 from django.urls import reverse
 from django.utils import timezone
-from datetime import timedelta
-
-from .forms import AppointmentForm, LoginForm, PatientForm, RegisterForm, ServiceForm
+from django.utils.crypto import constant_time_compare
+
+from . import availability, exports, fragments
+from .auth import run_in_auth_pool
+from .conditional import conditional_page
+from .decorators import alogin_required
+from .forms import (
+    AppointmentFilterForm,
+    AppointmentForm,
+    AvailabilityForm,
+    CalendarForm,
+    LoginForm,
+    PatientForm,
+    RegisterForm,
+    ServiceForm,
+)
+from .lookups import lookup
+from .metrics import render_prometheus
 from .models import Appointment, Patient, Service
+from .occupancy import occupancy
+from .pagination import KeysetPage, akeyset_paginate, keyset_paginate
+from .search import filter_patients, search_patients_page
+from .stats import adashboard_stats, dashboard_stats
+
+STREAM_MARKER = "__STREAMED_ROWS__"
+
+# Async variants fetch with the async ORM, then render on a thread because
+# templates may still touch lazy relations, the session or messages.
+arender = sync_to_async(render)
+
+
+AUTH_TABLES = {"auth_user", "django_session"}
+
+# Introspection lists every table in the database, so the result is kept for the
+# life of the process once the auth tables exist. A database error on the auth
+# path clears it so the next attempt checks again.
+_auth_schema = {"ready": False}
 
 
 def _auth_schema_ready():
-    try:
-        tables = set(connection.introspection.table_names())
-        required = {"auth_user", "django_session"}
-        return required.issubset(tables)
-    except (OperationalError, ProgrammingError):
-        return False
+    if not _auth_schema["ready"]:
+        try:
+            _auth_schema["ready"] = AUTH_TABLES.issubset(connection.introspection.table_names())
+        except (OperationalError, ProgrammingError):
+            return False
+    return _auth_schema["ready"]
+
+
+def _auth_schema_failed():
+    _auth_schema["ready"] = False
 
 
 @login_required
+@conditional_page("patient", "appointment", "service", clock=True)
 def dashboard(request):
-    total_patients = Patient.objects.count()
-    active_patients = Patient.objects.filter(status="active").count()
-    high_priority_patients = Patient.objects.filter(priority="high").count()
-    urgent_patients = Patient.objects.filter(priority="urgent").count()
-    total_services = Service.objects.count()
-
-    today = timezone.now().date()
-    this_week = today + timedelta(days=7)
-
-    today_appointments = Appointment.objects.filter(
-        scheduled_for__date=today, status="scheduled"
-    ).count()
-
-    this_week_appointments = Appointment.objects.filter(
-        scheduled_for__date__gte=today,
-        scheduled_for__date__lte=this_week,
-        status="scheduled",
-    ).count()
-
-    total_appointments = Appointment.objects.count()
-
-    week_ago = timezone.now() - timedelta(days=7)
-    recent_patients = (
-        Patient.objects.filter(created_at__gte=week_ago)
-        .order_by("-created_at")
-        .all()[:5]
-    )
+    return render(request, "index.html", dashboard_stats())
 
-    tomorrow_end = timezone.now() + timedelta(days=1)
-    urgent_appointments = (
-        Appointment.objects.filter(
-            scheduled_for__gte=timezone.now(),
-            scheduled_for__lte=tomorrow_end,
-            status="scheduled",
-        )
-        .select_related("patient", "service")
-        .order_by("scheduled_for")
-        .all()[:5]
-    )
 
-    status_stats = dict(
-        Patient.objects.values("status").annotate(count=Count("id")).values_list(
-            "status", "count"
-        )
-    )
-    priority_stats = dict(
-        Patient.objects.values("priority").annotate(count=Count("id")).values_list(
-            "priority", "count"
-        )
-    )
+@alogin_required
+@conditional_page("patient", "appointment", "service", clock=True)
+async def dashboard_async(request):
+    return await arender(request, "index.html", await adashboard_stats())
 
-    return render(
-        request,
-        "index.html",
-        {
-            "total_patients": total_patients,
-            "active_patients": active_patients,
-            "high_priority_patients": high_priority_patients,
-            "urgent_patients": urgent_patients,
-            "total_services": total_services,
-            "today_appointments": today_appointments,
-            "this_week_appointments": this_week_appointments,
-            "total_appointments": total_appointments,
-            "recent_patients": recent_patients,
-            "urgent_appointments": urgent_appointments,
-            "status_stats": status_stats,
-            "priority_stats": priority_stats,
-        },
-    )
+
+def _validate_login(request, form):
+    if not _auth_schema_ready():
+        messages.error(request, "Database is not ready. Run migrations before signing in.")
+        return False
+    try:
+        # AuthenticationForm.clean() authenticates, so this is the only password hash.
+        return form.is_valid()
+    except (OperationalError, ProgrammingError):
+        _auth_schema_failed()
+        messages.error(request, "Database is not ready. Run migrations before signing in.")
+        return False
+
+
+def _login_response(request, form, valid, redirect_to):
+    if valid:
+        login(request, form.get_user())
+        messages.success(request, "Signed in successfully.")
+        return redirect(redirect_to or "dashboard")
+    return render(request, "auth/login.html", {"form": form, "next": redirect_to})
 
 
 def login_view(request):
@@ -100,31 +109,17 @@ def login_view(request):
         return redirect("dashboard")
     form = LoginForm(request, data=request.POST or None)
     redirect_to = request.GET.get("next") or request.POST.get("next")
-    if request.method == "POST" and form.is_valid():
-        if not _auth_schema_ready():
-            messages.error(
-                request,
-                "Database is not ready. Run migrations before signing in.",
-            )
-            return render(
-                request, "auth/login.html", {"form": form, "next": redirect_to}
-            )
-        try:
-            username = form.cleaned_data.get("username").lower()
-            password = form.cleaned_data.get("password")
-            user = authenticate(request, username=username, password=password)
-        except (OperationalError, ProgrammingError):
-            messages.error(
-                request,
-                "Database is not ready. Run migrations before signing in.",
-            )
-        else:
-            if user:
-                login(request, user)
-                messages.success(request, "Signed in successfully.")
-                return redirect(redirect_to or "dashboard")
-            messages.error(request, "Invalid credentials.")
-    return render(request, "auth/login.html", {"form": form, "next": redirect_to})
+    valid = request.method == "POST" and _validate_login(request, form)
+    return _login_response(request, form, valid, redirect_to)
+
+
+async def login_view_async(request):
+    if (await request.auser()).is_authenticated:
+        return redirect("dashboard")
+    form = LoginForm(request, data=request.POST or None)
+    redirect_to = request.GET.get("next") or request.POST.get("next")
+    valid = request.method == "POST" and await run_in_auth_pool(_validate_login, request, form)
+    return await sync_to_async(_login_response)(request, form, valid, redirect_to)
 
 
 def register_view(request):
@@ -147,6 +142,7 @@ def register_view(request):
                 messages.success(request, "Account created.")
                 return redirect("dashboard")
         except (OperationalError, ProgrammingError):
+            _auth_schema_failed()
             messages.error(
                 request,
                 "Database is not ready. Run migrations before creating an account.",
@@ -161,16 +157,88 @@ def logout_view(request):
 
 
 @login_required
+@conditional_page("patient", "appointment", clock=True)
 def patients_list(request):
-    query = request.GET.get("q", "")
-    patients = Patient.objects.all()
+    query = request.GET.get("q", "").strip()
+    cursor = request.GET.get("cursor")
+    patients = Patient.objects.with_appointment_summary()
+    truncated = False
     if query:
-        patients = patients.filter(
-            Q(first_name__icontains=query)
-            | Q(last_name__icontains=query)
-            | Q(nhs_number__icontains=query)
+        matches, truncated = search_patients_page(query, queryset=patients)
+        page = KeysetPage(matches)
+    else:
+        page = keyset_paginate(
+            patients,
+            ("last_name", "id"),
+            cursor=cursor,
+            page_size=settings.LIST_PAGE_SIZE,
         )
-    return render(request, "patients/list.html", {"patients": patients, "query": query})
+    return render(
+        request,
+        "patients/list.html",
+        {
+            "patients": page,
+            "page": page,
+            "query": query,
+            "truncated": truncated,
+            "cursor": cursor,
+            "fragments": fragments.patient_rows(page),
+        },
+    )
+
+
+@alogin_required
+@conditional_page("patient", "appointment", clock=True)
+async def patients_list_async(request):
+    query = request.GET.get("q", "").strip()
+    cursor = request.GET.get("cursor")
+    patients = Patient.objects.with_appointment_summary()
+    truncated = False
+    if query:
+        matches, truncated = await sync_to_async(search_patients_page)(query, queryset=patients)
+        page = KeysetPage(matches)
+    else:
+        page = await akeyset_paginate(
+            patients,
+            ("last_name", "id"),
+            cursor=cursor,
+            page_size=settings.LIST_PAGE_SIZE,
+        )
+    return await arender(
+        request,
+        "patients/list.html",
+        {
+            "patients": page,
+            "page": page,
+            "query": query,
+            "truncated": truncated,
+            "cursor": cursor,
+            "fragments": await sync_to_async(fragments.patient_rows)(page),
+        },
+    )
+
+
+def _export_response(request, name, header, rows):
+    fmt = request.GET.get("format", "csv")
+    if fmt not in exports.FORMATS:
+        return HttpResponseBadRequest("Unsupported export format.")
+    chunks = exports.encode(header, rows, fmt, chunk_size=settings.STREAM_CHUNK_SIZE)
+    filename = f"{name}-{timezone.localdate():%Y%m%d}.{fmt}"
+    content_type = exports.FORMATS[fmt]
+    if request.GET.get("gzip") == "1":
+        chunks = exports.gzip_stream(chunks)
+        filename += ".gz"
+        content_type = "application/gzip"
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+def patients_export(request):
+    query = request.GET.get("q", "").strip()
+    patients = filter_patients(query) if query else Patient.objects.all()
+    return _export_response(request, "patients", *exports.patient_rows(patients))
 
 
 @login_required
@@ -185,8 +253,22 @@ def patients_create(request):
 
 @login_required
 def patients_detail(request, pk):
-    patient = get_object_or_404(Patient, pk=pk)
-    return render(request, "patients/detail.html", {"patient": patient})
+    patient = get_object_or_404(Patient.objects.with_appointment_summary(), pk=pk)
+    return render(
+        request,
+        "patients/detail.html",
+        {"patient": patient, "fragments": fragments.patient_detail(patient)},
+    )
+
+
+@alogin_required
+async def patients_detail_async(request, pk):
+    patient = await aget_object_or_404(Patient.objects.with_appointment_summary(), pk=pk)
+    return await arender(
+        request,
+        "patients/detail.html",
+        {"patient": patient, "fragments": await sync_to_async(fragments.patient_detail)(patient)},
+    )
 
 
 @login_required
@@ -263,19 +345,146 @@ def services_delete(request, pk):
     )
 
 
+EMPTY_APPOINTMENT_ROW = '<tr><td colspan="5">No appointments found.</td></tr>'
+
+
+def _stream_frame(request, context):
+    page = render_to_string(
+        "appointments/list.html", {**context, "stream_marker": STREAM_MARKER}, request=request
+    )
+    head, tail = page.split(STREAM_MARKER, 1)
+    return head, tail
+
+
+def _render_rows(row_template, appointments):
+    cached = fragments.appointment_rows(appointments)
+    return "".join(
+        row_template.render({"appointment": appointment, "fragments": cached}) for appointment in appointments
+    )
+
+
+def _stream_appointments(request, context, appointments):
+    head, tail = _stream_frame(request, context)
+    row_template = get_template("appointments/_row.html")
+
+    def rows():
+        yield head
+        empty = True
+        chunk = []
+        for appointment in appointments.iterator(chunk_size=settings.STREAM_CHUNK_SIZE):
+            empty = False
+            chunk.append(appointment)
+            if len(chunk) >= settings.STREAM_CHUNK_SIZE:
+                yield _render_rows(row_template, chunk)
+                chunk = []
+        yield _render_rows(row_template, chunk) if not empty else EMPTY_APPOINTMENT_ROW
+        yield tail
+
+    return StreamingHttpResponse(rows(), content_type="text/html; charset=utf-8")
+
+
+async def _astream_appointments(request, context, appointments):
+    head, tail = await sync_to_async(_stream_frame)(request, context)
+    row_template = get_template("appointments/_row.html")
+
+    async def rows():
+        yield head
+        empty = True
+        chunk = []
+        async for appointment in appointments.aiterator(chunk_size=settings.STREAM_CHUNK_SIZE):
+            empty = False
+            chunk.append(appointment)
+            if len(chunk) >= settings.STREAM_CHUNK_SIZE:
+                yield await sync_to_async(_render_rows)(row_template, chunk)
+                chunk = []
+        yield await sync_to_async(_render_rows)(row_template, chunk) if not empty else EMPTY_APPOINTMENT_ROW
+        yield tail
+
+    return StreamingHttpResponse(rows(), content_type="text/html; charset=utf-8")
+
+
+def _filtered_appointments(filters):
+    appointments = Appointment.objects.select_related("patient", "service")
+    if not filters.is_bound:
+        return appointments
+    # Invalid filters match nothing rather than everything; the form shows why.
+    return filters.filter_queryset(appointments) if filters.is_valid() else appointments.none()
+
+
+def _appointments_context(request, filters):
+    filter_query = request.GET.copy()
+    for key in ("cursor", "stream"):
+        filter_query.pop(key, None)
+    return {"filters": filters, "filter_query": filter_query.urlencode(), "cursor": request.GET.get("cursor")}
+
+
 @login_required
+@conditional_page("appointment", "patient", "service")
 def appointments_list(request):
-    appointments = Appointment.objects.select_related("patient", "service").order_by(
-        "-scheduled_for"
+    filters = AppointmentFilterForm(request.GET or None)
+    appointments = _filtered_appointments(filters)
+    context = _appointments_context(request, filters)
+
+    if request.GET.get("stream") == "1":
+        return _stream_appointments(request, context, appointments.order_by("-scheduled_for", "-id"))
+
+    page = keyset_paginate(
+        appointments,
+        ("-scheduled_for", "-id"),
+        cursor=context["cursor"],
+        page_size=settings.LIST_PAGE_SIZE,
+    )
+    return render(
+        request,
+        "appointments/list.html",
+        {**context, "appointments": page, "page": page, "fragments": fragments.appointment_rows(page)},
+    )
+
+
+@alogin_required
+@conditional_page("appointment", "patient", "service")
+async def appointments_list_async(request):
+    filters = AppointmentFilterForm(request.GET or None)
+    # Validating the service choice queries the database.
+    appointments = await sync_to_async(_filtered_appointments)(filters)
+    context = _appointments_context(request, filters)
+
+    if request.GET.get("stream") == "1":
+        return await _astream_appointments(request, context, appointments.order_by("-scheduled_for", "-id"))
+
+    page = await akeyset_paginate(
+        appointments,
+        ("-scheduled_for", "-id"),
+        cursor=context["cursor"],
+        page_size=settings.LIST_PAGE_SIZE,
+    )
+    return await arender(
+        request,
+        "appointments/list.html",
+        {
+            **context,
+            "appointments": page,
+            "page": page,
+            "fragments": await sync_to_async(fragments.appointment_rows)(page),
+        },
     )
-    return render(request, "appointments/list.html", {"appointments": appointments})
+
+
+@login_required
+def appointments_export(request):
+    filters = AppointmentFilterForm(request.GET or None)
+    appointments = Appointment.objects.all()
+    if filters.is_bound:
+        if not filters.is_valid():
+            return HttpResponseBadRequest("Invalid appointment filters.")
+        appointments = filters.filter_queryset(appointments)
+    return _export_response(request, "appointments", *exports.appointment_rows(appointments))
 
 
 @login_required
 def appointments_create(request):
     form = AppointmentForm(request.POST or None)
-    if request.method == "POST" and form.is_valid():
-        form.save()
+    if request.method == "POST" and form.is_valid() and form.save_booking():
         messages.success(request, "Appointment created.")
         return redirect("appointments_list")
     return render(request, "appointments/form.html", {"form": form, "title": "Schedule Appointment"})
@@ -285,8 +494,7 @@ def appointments_create(request):
 def appointments_edit(request, pk):
     appointment = get_object_or_404(Appointment, pk=pk)
     form = AppointmentForm(request.POST or None, instance=appointment)
-    if request.method == "POST" and form.is_valid():
-        form.save()
+    if request.method == "POST" and form.is_valid() and form.save_booking():
         messages.success(request, "Appointment updated.")
         return redirect("appointments_list")
     return render(
@@ -296,6 +504,65 @@ def appointments_edit(request, pk):
     )
 
 
+@login_required
+def appointments_availability(request):
+    form = AvailabilityForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest("Invalid availability query.")
+    data = form.cleaned_data
+    days = availability.free_slots(
+        data["location"],
+        data["date"],
+        days=data["days"],
+        duration=data["duration"],
+        patient=data["patient"],
+        exclude=data["exclude"],
+    )
+    return JsonResponse(
+        {
+            "location": data["location"],
+            "duration": data["duration"],
+            "days": [
+                {
+                    "date": day.isoformat(),
+                    "slots": [{"value": f"{slot:%Y-%m-%dT%H:%M}", "label": f"{slot:%H:%M}"} for slot in slots],
+                }
+                for day, slots in days
+            ],
+        }
+    )
+
+
+@login_required
+@conditional_page("appointment", clock=True)
+def appointments_calendar(request):
+    form = CalendarForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest("Invalid calendar query.")
+    first_day, days = form.window()
+    location = form.cleaned_data["location"]
+    grid = occupancy(first_day, days, locations=[location] if location else None)
+    if request.GET.get("format") == "json":
+        return JsonResponse(grid.as_dict())
+
+    def shifted(offset):
+        params = {"date": (first_day + timedelta(days=offset)).isoformat(), "view": form.cleaned_data["view"]}
+        if location:
+            params["location"] = location
+        return urlencode(params)
+
+    return render(
+        request,
+        "appointments/calendar.html",
+        {
+            "form": form,
+            "grid": grid,
+            "previous_query": shifted(-days),
+            "next_query": shifted(days),
+        },
+    )
+
+
 @login_required
 def appointments_delete(request, pk):
     appointment = get_object_or_404(Appointment, pk=pk)
@@ -312,3 +579,20 @@ def appointments_delete(request, pk):
             "cancel_url": reverse("appointments_list"),
         },
     )
+
+
+@login_required
+def lookup_view(request, kind):
+    try:
+        limit = int(request.GET.get("limit", "0"))
+    except ValueError:
+        limit = 0
+    return JsonResponse({"results": lookup(kind, request.GET.get("q", ""), limit=max(limit, 0))})
+
+
+def metrics_view(request):
+    token = settings.METRICS_TOKEN
+    bearer = request.headers.get("Authorization", "")
+    if not (request.user.is_staff or (token and constant_time_compare(bearer, f"Bearer {token}"))):
+        return HttpResponseForbidden("Staff only.")
+    return HttpResponse(render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
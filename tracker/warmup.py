@@ -0,0 +1,46 @@
+import logging
+import time
+from pathlib import Path
+
+from django.template import TemplateSyntaxError, engines
+from django.template.autoreload import get_template_directories
+from django.urls import get_resolver, reverse
+
+logger = logging.getLogger("tracker.warmup")
+
+
+def template_names():
+    names = set()
+    for directory in get_template_directories():
+        names.update(
+            path.relative_to(directory).as_posix() for path in Path(directory).rglob("*") if path.is_file()
+        )
+    return sorted(names)
+
+
+def compile_templates():
+    compiled = 0
+    for engine in engines.all():
+        for name in template_names():
+            try:
+                engine.get_template(name)
+            except TemplateSyntaxError:
+                logger.exception("Template %s failed to compile during warm-up", name)
+            else:
+                compiled += 1
+    return compiled
+
+
+def build_url_resolver():
+    # Resolving imports every URLconf and view module; reversing fills the reverse lookup tables.
+    get_resolver().resolve("/")
+    reverse("dashboard")
+
+
+def warm_up():
+    started = time.perf_counter()
+    build_url_resolver()
+    compiled = compile_templates()
+    elapsed = time.perf_counter() - started
+    logger.info("Worker warm-up: URL resolver built and %d templates compiled in %.0f ms", compiled, elapsed * 1000)
+    return {"templates": compiled, "seconds": elapsed}